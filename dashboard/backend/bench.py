@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Backend benchmarks.
+
+Each benchmark seeds a throwaway SQLite database from a synthetic fixture and
+drives the app in-process through FastAPI's TestClient (needs httpx).
+
+Usage:
+    python bench.py news-projection --companies 5000 --content-chars 8000
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+
+def _load_app(db_path: str):
+    """Import main against a scratch database, with rate limiting out of the way."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["RATE_LIMIT_PER_SECOND"] = "1000000"
+    os.environ["RATE_LIMIT_BURST"] = "1000000"
+    import main
+    return main
+
+
+def _time_requests(client, url: str, repeat: int):
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url)
+        timings.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+        size = len(response.content)
+    timings.sort()
+    return {
+        "median_ms": statistics.median(timings),
+        "p95_ms": timings[int(len(timings) * 0.95) - 1],
+        "bytes": size,
+    }
+
+
+def bench_news_projection(args):
+    from fastapi.testclient import TestClient
+    from fixtures import generate_fixture, load_fixture
+
+    with tempfile.TemporaryDirectory() as tmp:
+        main = _load_app(os.path.join(tmp, "bench.db"))
+
+        fixture = generate_fixture(args.companies, news_per_company=args.news_per_company,
+                                   investments_per_company=0)
+        body = ("Shares rose after the company reported quarterly revenue of $1.2B. " * 200)[:args.content_chars]
+        for row in fixture["news"]["rows"]:
+            row[2] = body
+        with main.engine.begin() as conn:
+            load_fixture(conn, main.Base.metadata, fixture)
+
+        cases = [
+            ("all columns", "/news?page_size=100"),
+            ("headline,source,published_at", "/news?page_size=100&fields=headline,source,published_at"),
+        ]
+        print(f"/news over {len(fixture['news']['rows'])} articles, {args.content_chars} chars of content each")
+        with TestClient(main.app) as client:
+            for label, url in cases:
+                _time_requests(client, url, 3)  # warm up
+                result = _time_requests(client, url, args.repeat)
+                print(f"  {label:32s} median {result['median_ms']:7.2f} ms   "
+                      f"p95 {result['p95_ms']:7.2f} ms   {result['bytes'] / 1024:8.1f} KiB")
+
+
+BENCHMARKS = {
+    "news-projection": bench_news_projection,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run backend benchmarks")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--companies", type=int, default=5000)
+    parser.add_argument("--news-per-company", type=int, default=4)
+    parser.add_argument("--content-chars", type=int, default=8000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
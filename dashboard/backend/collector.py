@@ -0,0 +1,27 @@
+"""
+Shared code from the news collector (nvoydia-1/news).
+
+Definitions the backend must agree on with the collector, such as the
+article store's partition layout, live only in the collector. Backend
+modules import them through import_collector() instead of keeping copies.
+The collector directory defaults to its place in this repository and can be
+moved with NEWS_COLLECTOR_PATH.
+"""
+
+import importlib
+import os
+import sys
+from types import ModuleType
+
+COLLECTOR_PATH = os.path.abspath(os.environ.get(
+    "NEWS_COLLECTOR_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "nvoydia-1", "news"),
+))
+
+
+def import_collector(name: str) -> ModuleType:
+    """Import a collector module by name, e.g. import_collector("article_store")."""
+    # Appended, not prepended, so collector modules never shadow backend ones
+    if COLLECTOR_PATH not in sys.path:
+        sys.path.append(COLLECTOR_PATH)
+    return importlib.import_module(name)
@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+Vector index of news articles for semantic search.
+
+Each article's headline and content are embedded into a fixed-size float32
+vector and appended to a memory-mapped matrix on disk, so the index is never
+read into memory whole and each update only embeds articles added since the
+last one. Two encoders are available:
+
+- hashing (default): a deterministic hashing vectorizer over words and word
+  bigrams; no model to download, and the same text always gets the same vector
+- any sentence-transformers model (e.g. all-MiniLM-L6-v2), when that package
+  is installed
+
+Vectors are L2-normalized, so cosine similarity is a dot product. Up to
+IVF_THRESHOLD articles every vector is scored. Beyond that an inverted-file
+(IVF) index groups the vectors around k-means centroids and a query only
+scores the lists of its `nprobe` nearest centroids. New articles are added to
+the existing lists; the centroids are retrained once the index has doubled
+since they were trained.
+
+Files in the index directory:
+
+    meta.json     encoder, dimension, row count and last embedded news id
+    vectors.f32   float32 matrix, one row per article
+    ids.i64       news id of each row
+    ivf.npz       IVF centroids and each row's list (large indexes only)
+
+Usage:
+    python embeddings.py --update
+    python embeddings.py --rebuild --encoder all-MiniLM-L6-v2
+    python embeddings.py --search "series b funding for radiology ai"
+    python embeddings.py --benchmark 200000
+"""
+
+import argparse
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "embeddings")
+HASHING_ENCODER = "hashing"
+HASHING_DIM = 512
+
+# Exhaustive search up to this many articles, IVF beyond
+IVF_THRESHOLD = 100_000
+DEFAULT_NPROBE = 16
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 50_000
+
+# Article text past this is not embedded; the lead carries the topic
+MAX_TEXT_CHARS = 4000
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9'-]*")
+STOPWORDS = frozenset(
+    "a an and are as at be been by for from has have in into is it its of on or that the their this to was "
+    "were will with which who after over than more about also said says".split()
+)
+
+
+def article_text(headline: Optional[str], content: Optional[str]) -> str:
+    """The text embedded for one article."""
+    return f"{headline or ''}\n{content or ''}"[:MAX_TEXT_CHARS]
+
+
+class HashingEncoder:
+    """
+    Signed feature hashing of words and word bigrams into `dim` slots.
+
+    Words are hashed with crc32 (stable across processes, unlike hash()) and
+    bigram hashes are mixed from their words' hashes in NumPy, so only the
+    vocabulary goes through Python. Term counts are dampened with log1p before
+    normalizing, so a word repeated throughout an article does not drown out
+    the rest.
+    """
+
+    def __init__(self, dim: int = HASHING_DIM, stopwords: frozenset = STOPWORDS):
+        if dim & (dim - 1):
+            raise ValueError("dim must be a power of two")
+        self.name = HASHING_ENCODER
+        self.dim = dim
+        self.stopwords = stopwords
+        self._hashes: Dict[str, int] = {}
+
+    def _hash(self, word: str) -> int:
+        digest = zlib.crc32(word.encode("utf-8"))
+        if len(self._hashes) < 1_000_000:
+            self._hashes[word] = digest
+        return digest
+
+    def term_hashes(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        32-bit hashes of every word and word bigram in `texts`.
+
+        Returns:
+            (rows, hashes): the index in `texts` of each term, and its hash
+        """
+        hashes: List[int] = []
+        lengths: List[int] = []
+        lookup = self._hashes.get
+        for text in texts:
+            words = [word for word in TOKEN_RE.findall(text.lower()) if word not in self.stopwords]
+            hashes.extend([lookup(word) or self._hash(word) for word in words])
+            lengths.append(len(words))
+        words_hashes = np.asarray(hashes, dtype=np.uint64)
+        rows = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+        # Bigrams never span two texts
+        same_row = rows[1:] == rows[:-1]
+        mixed = (words_hashes[:-1] * np.uint64(0x9E3779B1) + words_hashes[1:]) * np.uint64(0x85EBCA6B)
+        bigrams = (mixed ^ (mixed >> np.uint64(29))) & np.uint64(0xFFFFFFFF)
+        return np.concatenate([rows, rows[1:][same_row]]), np.concatenate([words_hashes, bigrams[same_row]])
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        rows, terms = self.term_hashes(texts)
+        # Low bits pick the slot, the top bit the sign
+        slots = (terms & np.uint64(self.dim - 1)).astype(np.int64)
+        signs = 1.0 - 2.0 * (terms >> np.uint64(31)).astype(np.float64)
+        counts = np.bincount(rows * self.dim + slots, weights=signs,
+                             minlength=len(texts) * self.dim).reshape(len(texts), self.dim)
+        vectors = (np.sign(counts) * np.log1p(np.abs(counts))).astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
+
+class SentenceTransformerEncoder:
+    """A local sentence-transformers model, run on CPU."""
+
+    def __init__(self, name: str):
+        # Optional, and imported only when used: it loads torch, which the API does not need for hashing
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise RuntimeError(f"Encoder {name!r} needs sentence-transformers "
+                               f"(pip install sentence-transformers)") from e
+        self.name = name
+        self._model = SentenceTransformer(name, device="cpu")
+        self.dim = self._model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        return self._model.encode(list(texts), batch_size=64, normalize_embeddings=True,
+                                  convert_to_numpy=True).astype(np.float32)
+
+
+def make_encoder(name: str = HASHING_ENCODER, dim: int = HASHING_DIM):
+    """Encoder by name: "hashing" or a sentence-transformers model name."""
+    if name == HASHING_ENCODER:
+        return HashingEncoder(dim)
+    return SentenceTransformerEncoder(name)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the `k` highest scores, best first."""
+    if len(scores) > k:
+        positions = np.argpartition(-scores, k - 1)[:k]
+    else:
+        positions = np.arange(len(scores))
+    return positions[np.argsort(-scores[positions], kind="stable")]
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, block: int = 65536) -> np.ndarray:
+    """Nearest centroid of every vector, in blocks to bound the temporary score matrix."""
+    lists = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), block):
+        lists[start:start + block] = np.argmax(np.asarray(vectors[start:start + block]) @ centroids.T, axis=1)
+    return lists
+
+
+def train_centroids(vectors: np.ndarray, nlist: int, iterations: int = KMEANS_ITERATIONS,
+                    sample: int = KMEANS_SAMPLE, seed: int = 0) -> np.ndarray:
+    """Spherical k-means centroids over a sample of unit vectors."""
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(len(vectors), min(sample, len(vectors)), replace=False))
+    data = np.asarray(vectors[rows])
+    centroids = data[rng.choice(len(data), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        lists = np.argmax(data @ centroids.T, axis=1)
+        order = np.argsort(lists, kind="stable")
+        members, starts = np.unique(lists[order], return_index=True)
+        centroids[members] = np.add.reduceat(data[order], starts, axis=0)
+        # Empty lists restart from random points
+        empty = np.setdiff1d(np.arange(nlist), members)
+        centroids[empty] = data[rng.choice(len(data), len(empty), replace=False)]
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        centroids /= np.where(norms > 0, norms, 1.0)
+    return centroids
+
+
+class SemanticIndex:
+    """
+    Memory-mapped article vectors with exhaustive or IVF top-k search.
+
+    The writer (`update`, or `append` + `commit`) and any number of readers
+    (`search`) may use the same directory from different processes: the
+    metadata is replaced atomically after the data files are written, and
+    readers reopen the index when it changes.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH, ivf_threshold: int = IVF_THRESHOLD,
+                 nprobe: int = DEFAULT_NPROBE):
+        """
+        Args:
+            path: Index directory
+            ivf_threshold: Rows from which searches go through the IVF index
+            nprobe: IVF lists scored per query
+        """
+        self.path = path
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        self._lock = threading.Lock()
+        self._encoder = None
+        self._meta_mtime: Optional[int] = None
+        self._pending: Optional[Dict[str, Any]] = None
+        self._load()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _load(self) -> None:
+        """(Re)open the committed index."""
+        try:
+            with open(self._file("meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            mtime = os.stat(self._file("meta.json")).st_mtime_ns
+        except FileNotFoundError:
+            meta, mtime = {"encoder": HASHING_ENCODER, "dim": HASHING_DIM, "count": 0, "last_news_id": 0}, None
+        dim = meta["dim"]
+        count = meta["count"]
+        if count:
+            # A rebuild in progress may have replaced the files with shorter ones
+            count = min(count, os.path.getsize(self._file("vectors.f32")) // (4 * dim),
+                        os.path.getsize(self._file("ids.i64")) // 8)
+        vectors = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r", shape=(count, dim)) \
+            if count else np.zeros((0, dim), dtype=np.float32)
+        ids = np.fromfile(self._file("ids.i64"), dtype=np.int64, count=count) if count else np.zeros(0, np.int64)
+
+        centroids = order = offsets = None
+        if count and os.path.exists(self._file("ivf.npz")):
+            with np.load(self._file("ivf.npz")) as ivf:
+                if len(ivf["lists"]) >= count:
+                    centroids = ivf["centroids"]
+                    lists = ivf["lists"][:count]
+                    order = np.argsort(lists, kind="stable")
+                    offsets = np.searchsorted(lists[order], np.arange(len(centroids) + 1))
+        if self._encoder is not None and (self._encoder.name, self._encoder.dim) != (meta["encoder"], dim):
+            self._encoder = None
+        self.meta = meta
+        self._meta_mtime = mtime
+        self._vectors = vectors
+        self._ids = ids
+        self._centroids = centroids
+        self._order = order
+        self._offsets = offsets
+
+    def _reload_if_changed(self) -> None:
+        try:
+            mtime = os.stat(self._file("meta.json")).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime != self._meta_mtime:
+            with self._lock:
+                if mtime != self._meta_mtime:
+                    self._load()
+
+    @property
+    def count(self) -> int:
+        return len(self._ids)
+
+    @property
+    def encoder(self):
+        if self._encoder is None:
+            self._encoder = make_encoder(self.meta["encoder"], self.meta["dim"])
+        return self._encoder
+
+    # Writing
+
+    def reset(self, encoder=None) -> None:
+        """Start an empty index, with another encoder if given. Takes effect on commit."""
+        os.makedirs(self.path, exist_ok=True)
+        self._encoder = encoder or self._encoder or make_encoder()
+        # Unlink rather than truncate: readers keep their mappings of the old files until they reopen
+        for name in ("vectors.f32", "ids.i64", "ivf.npz"):
+            if os.path.exists(self._file(name)):
+                os.remove(self._file(name))
+        self._pending = {"encoder": self._encoder.name, "dim": self._encoder.dim, "count": 0, "last_news_id": 0}
+
+    def append(self, ids: Sequence[int], texts: Sequence[str]) -> None:
+        """Embed and write articles. Searches see them after `commit`."""
+        if self._pending is None:
+            os.makedirs(self.path, exist_ok=True)
+            self._pending = dict(self.meta)
+            # Drop anything an interrupted update wrote past the committed rows
+            for name, row_bytes in (("vectors.f32", 4 * self.meta["dim"]), ("ids.i64", 8)):
+                if os.path.exists(self._file(name)) and \
+                        os.path.getsize(self._file(name)) > self.meta["count"] * row_bytes:
+                    os.truncate(self._file(name), self.meta["count"] * row_bytes)
+        if not len(ids):
+            return
+        vectors = self.encoder.encode(texts).astype(np.float32, copy=False)
+        with open(self._file("vectors.f32"), "ab") as f:
+            f.write(vectors.tobytes())
+        with open(self._file("ids.i64"), "ab") as f:
+            f.write(np.asarray(ids, dtype=np.int64).tobytes())
+        self._pending["count"] += len(ids)
+        self._pending["last_news_id"] = max(self._pending["last_news_id"], int(max(ids)))
+
+    def commit(self) -> Dict[str, Any]:
+        """Bring the IVF lists up to date and publish the appended rows."""
+        meta = self._pending or dict(self.meta)
+        self._pending = None
+        count, dim = meta["count"], meta["dim"]
+        vectors = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r", shape=(count, dim)) \
+            if count else None
+
+        if count >= self.ivf_threshold:
+            trained = meta.get("ivf_trained_count", 0)
+            if not os.path.exists(self._file("ivf.npz")) or count >= 2 * trained:
+                # About sqrt(n) lists of about sqrt(n) rows each
+                centroids = train_centroids(vectors, int(np.sqrt(count)))
+                lists = _assign(vectors, centroids)
+                meta["ivf_trained_count"] = count
+            else:
+                with np.load(self._file("ivf.npz")) as ivf:
+                    centroids, lists = ivf["centroids"], ivf["lists"][:self.count]
+                lists = np.concatenate([lists, _assign(vectors[len(lists):], centroids)])
+            self._write_atomic("ivf.npz", lambda f: np.savez(f, centroids=centroids, lists=lists))
+        meta["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        self._write_atomic("meta.json", lambda f: f.write(json.dumps(meta, indent=2).encode("utf-8")))
+        with self._lock:
+            self._load()
+        return meta
+
+    def _write_atomic(self, name: str, write) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.path, prefix=f".{name}.")
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, self._file(name))
+
+    def update(self, db, encoder=None, rebuild: bool = False, batch_size: int = 2048) -> Dict[str, int]:
+        """
+        Embed the news rows added since the last update.
+
+        Args:
+            db: Database session
+            encoder: Encoder for a rebuild (default: the index's current one)
+            rebuild: Re-embed every article from scratch
+            batch_size: Rows per read and embedding batch
+
+        Returns:
+            {"embedded": rows added, "total": rows in the index}
+        """
+        from sqlalchemy import select
+        from main import News
+
+        if rebuild or (encoder is not None and encoder.name != self.meta["encoder"]):
+            self.reset(encoder)
+        watermark = (self._pending or self.meta)["last_news_id"]
+        query = select(News.id, News.headline, News.content).where(News.id > watermark).order_by(News.id)
+        embedded = 0
+        result = db.execute(query.execution_options(yield_per=batch_size))
+        for batch in result.partitions(batch_size):
+            self.append([row.id for row in batch], [article_text(row.headline, row.content) for row in batch])
+            embedded += len(batch)
+        meta = self.commit()
+        return {"embedded": embedded, "total": meta["count"]}
+
+    # Searching
+
+    def search(self, query: str, k: int = 10, nprobe: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Nearest articles to `query` by cosine similarity.
+
+        Returns:
+            Up to `k` (news id, similarity) pairs, most similar first
+        """
+        self._reload_if_changed()
+        vectors, ids, centroids, order, offsets = \
+            self._vectors, self._ids, self._centroids, self._order, self._offsets
+        if not len(ids):
+            return []
+        q = self.encoder.encode([query])[0]
+        if centroids is None or len(ids) < self.ivf_threshold:
+            scores = np.asarray(vectors @ q)
+            best = _top_k(scores, k)
+            return [(int(ids[i]), float(scores[i])) for i in best]
+
+        probe = _top_k(centroids @ q, nprobe or self.nprobe)
+        rows = np.sort(np.concatenate([order[offsets[c]:offsets[c + 1]] for c in probe]))
+        scores = np.asarray(vectors[rows]) @ q
+        best = _top_k(scores, k)
+        return [(int(ids[rows[i]]), float(scores[i])) for i in best]
+
+    def stats(self) -> Dict[str, Any]:
+        self._reload_if_changed()
+        return {
+            "encoder": self.meta["encoder"],
+            "dim": self.meta["dim"],
+            "indexed": self.count,
+            "last_news_id": self.meta["last_news_id"],
+            "ivf_lists": None if self._centroids is None else len(self._centroids),
+            "updated_at": self.meta.get("updated_at"),
+        }
+
+
+def _synthetic_articles(n: int, seed: int = 0) -> List[str]:
+    """Articles drawn from a few hundred topics, so neighbours are meaningful."""
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array([f"term{i}" for i in range(20000)])
+    topics = rng.integers(0, len(vocabulary), size=(400, 40))
+    articles = []
+    for topic in rng.integers(0, len(topics), size=n):
+        words = np.concatenate([vocabulary[rng.choice(topics[topic], 40)],
+                                vocabulary[rng.integers(0, len(vocabulary), 40)]])
+        articles.append(" ".join(words))
+    return articles
+
+
+def benchmark(n: int, queries: int = 200, nprobe: int = DEFAULT_NPROBE) -> None:
+    """Embed `n` synthetic articles, then compare exhaustive and IVF search on speed and recall@10."""
+    texts = _synthetic_articles(n)
+    encoder = HashingEncoder()
+    start = time.perf_counter()
+    for i in range(0, n, 2048):
+        encoder.encode(texts[i:i + 2048])
+    elapsed = time.perf_counter() - start
+    print(f"Embedding: {n:,} articles in {elapsed:.2f}s ({n / elapsed:,.0f} articles/s)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = SemanticIndex(tmp, ivf_threshold=min(IVF_THRESHOLD, n), nprobe=nprobe)
+        index.reset(encoder)
+        start = time.perf_counter()
+        for i in range(0, n, 2048):
+            index.append(range(i + 1, min(i + 2048, n) + 1), texts[i:i + 2048])
+        appended = time.perf_counter() - start
+        index.commit()
+        print(f"Index build: {appended:.2f}s embedding and writing, "
+              f"{time.perf_counter() - start - appended:.2f}s training {len(index._centroids)} IVF lists")
+
+        probes = [texts[i][:200] for i in np.random.default_rng(1).integers(0, n, queries)]
+        exhaustive = SemanticIndex(tmp, ivf_threshold=n + 1)
+        timings = {}
+        results = {}
+        for label, searcher in (("exhaustive", exhaustive), (f"IVF nprobe={nprobe}", index)):
+            searcher.search(probes[0])
+            start = time.perf_counter()
+            results[label] = [{news_id for news_id, _ in searcher.search(probe, 10)} for probe in probes]
+            timings[label] = (time.perf_counter() - start) * 1000 / queries
+        exact, approximate = results.values()
+        recall = np.mean([len(a & b) / len(a) for a, b in zip(exact, approximate)])
+        for label, ms in timings.items():
+            print(f"  {label:20s} {ms:8.2f} ms/query")
+        print(f"  IVF recall@10: {recall:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query the semantic news index")
+    parser.add_argument("--update", action="store_true", help="Embed articles added since the last update")
+    parser.add_argument("--rebuild", action="store_true", help="Re-embed every article")
+    parser.add_argument("--encoder", help=f"'{HASHING_ENCODER}' or a sentence-transformers model name "
+                                          f"(default: the index's current encoder)")
+    parser.add_argument("--path", default=os.getenv("EMBEDDINGS_PATH", DEFAULT_INDEX_PATH))
+    parser.add_argument("--batch-size", type=int, default=2048)
+    parser.add_argument("--search", metavar="QUERY", help="Print the nearest articles to QUERY")
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=DEFAULT_NPROBE)
+    parser.add_argument("--benchmark", type=int, metavar="N", help="Time embedding and search over N synthetic articles")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark, nprobe=args.nprobe)
+        return 0
+    if not (args.update or args.rebuild or args.search):
+        parser.error("nothing to do (use --update, --rebuild, --search or --benchmark)")
+
+    index = SemanticIndex(args.path, nprobe=args.nprobe)
+    if args.update or args.rebuild:
+        from main import SessionLocal
+
+        encoder = make_encoder(args.encoder) if args.encoder else None
+        db = SessionLocal()
+        try:
+            start = time.perf_counter()
+            stats = index.update(db, encoder=encoder, rebuild=args.rebuild, batch_size=args.batch_size)
+        finally:
+            db.close()
+        print(f"Embedded {stats['embedded']} articles in {time.perf_counter() - start:.2f}s; "
+              f"{stats['total']} in the index ({index.meta['encoder']}, {index.meta['dim']} dims)")
+    if args.search:
+        for news_id, score in index.search(args.search, args.k):
+            print(f"{score:.3f}  news {news_id}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
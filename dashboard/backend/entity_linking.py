@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Link news articles to the companies they mention.
+
+Every company name in the companies table is expanded into aliases:
+
+- the full name, and the name without a legal suffix ("Inc.", "Ltd", ...)
+- the name without spaces ("Health Flow" -> "HealthFlow")
+- the name without a descriptor ("MediTech Solutions" -> "MediTech")
+
+All aliases go into one Aho-Corasick automaton (pyahocorasick), so each
+article is scanned once, in time linear in its length, however many
+companies there are. Matches must fall on word boundaries. An alias of a
+single word must also be capitalized in the text, so a company called
+"Pulse" is not found in "pulse rates".
+
+Each matched company is scored on how specific its alias is, with bonuses
+for a mention in the headline and for repeated mentions. When an alias
+belongs to several companies, each candidate also gets a context score from
+its industry terms and its CEO's surname appearing in the article, and from
+being the article's current company. The best candidate is linked only if it
+clearly beats the rest. Companies scoring at least LINK_THRESHOLD are linked.
+
+Links go to the news_companies table. Articles without a company get their
+best link as `company_id`. Runs are incremental: the id of the last linked
+article is kept in pipeline_state.
+
+Usage:
+    python entity_linking.py --link
+    python entity_linking.py --link --relink
+    python entity_linking.py --benchmark 100000 --companies 10000
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+import ahocorasick
+
+STAGE = "entity_linking"
+
+LEGAL_SUFFIXES = frozenset(
+    "inc inc. incorporated corp corp. corporation co co. company ltd ltd. limited llc l.l.c. plc gmbh ag sa "
+    "s.a. bv b.v. nv n.v. holdings group".split()
+)
+DESCRIPTOR_SUFFIXES = frozenset(
+    "solutions technologies technology labs systems software therapeutics biosciences bioscience "
+    "pharmaceuticals pharma health healthcare medical ai analytics".split()
+)
+CONTEXT_STOPWORDS = frozenset("and of the ai other general".split())
+
+# Alias specificity: how sure a bare mention of the alias makes us
+FULL_NAME = 1.0
+COMPACT_NAME = 0.8
+SHORT_NAME = 0.6
+
+HEADLINE_BONUS = 0.3
+REPEAT_BONUS = 0.1
+MAX_REPEAT_BONUS = 0.3
+CONTEXT_TERM_BONUS = 0.1
+MAX_CONTEXT_TERM_BONUS = 0.3
+CEO_BONUS = 0.4
+PRIOR_BONUS = 0.5
+
+LINK_THRESHOLD = 0.7
+# An ambiguous alias is linked only if its best candidate leads the next by this much
+AMBIGUITY_MARGIN = 0.1
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _normalize(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+def company_aliases(name: str) -> List[Tuple[str, float]]:
+    """Normalized aliases of a company name with their specificity, most specific first."""
+    words = _normalize(name).split()
+    while len(words) > 1 and words[-1].rstrip(",") in LEGAL_SUFFIXES:
+        words.pop()
+    words = [word.rstrip(",") for word in words]
+    if not words:
+        return []
+    aliases = {_normalize(name).rstrip(","): FULL_NAME, " ".join(words): FULL_NAME}
+    if len(words) > 1:
+        compact = "".join(words)
+        if len(compact) >= 6:
+            aliases.setdefault(compact, COMPACT_NAME)
+        if words[-1] in DESCRIPTOR_SUFFIXES:
+            short = " ".join(words[:-1])
+            if len(short) >= 4 and not short.isdigit():
+                aliases.setdefault(short, SHORT_NAME)
+    return sorted(aliases.items(), key=lambda item: -item[1])
+
+
+class EntityLinker:
+    """Aho-Corasick automaton over company aliases, with context scoring for ambiguous ones."""
+
+    def __init__(self, companies: Iterable[Mapping]):
+        """
+        Args:
+            companies: Rows with `id` and `name`, and optionally `industry_segment`,
+                `sector` and `ceo_name` for context scoring
+        """
+        self._context: Dict[int, Set[str]] = {}
+        self._ceo: Dict[int, str] = {}
+        candidates: Dict[str, Dict[int, float]] = {}
+        for company in companies:
+            if not company.get("name"):
+                continue
+            company_id = company["id"]
+            for alias, specificity in company_aliases(company["name"]):
+                entry = candidates.setdefault(alias, {})
+                entry[company_id] = max(entry.get(company_id, 0.0), specificity)
+            terms = WORD_RE.findall(f"{company.get('industry_segment') or ''} {company.get('sector') or ''}".lower())
+            self._context[company_id] = {term for term in terms if term not in CONTEXT_STOPWORDS and len(term) > 2}
+            ceo_words = WORD_RE.findall((company.get("ceo_name") or "").lower())
+            if ceo_words and len(ceo_words[-1]) > 2:
+                self._ceo[company_id] = ceo_words[-1]
+
+        self.aliases = len(candidates)
+        self._automaton = ahocorasick.Automaton()
+        for alias, entry in candidates.items():
+            self._automaton.add_word(alias, (len(alias), " " not in alias, tuple(entry.items())))
+        if candidates:
+            self._automaton.make_automaton()
+
+    def link(self, headline: Optional[str], content: Optional[str],
+             prior: Optional[int] = None) -> List[Tuple[int, float, int]]:
+        """
+        Companies mentioned in one article.
+
+        Args:
+            headline: Article headline
+            content: Article body
+            prior: The article's current company_id, if any; favored when a mention is ambiguous
+
+        Returns:
+            (company id, score, mentions) of every linked company, best first
+        """
+        if not self.aliases:
+            return []
+        headline = headline or ""
+        text = f"{headline}\n{content or ''}"
+        lowered = text.lower()
+        # A matched alias's candidates -> [mentions, mentioned in the headline]
+        found: Dict[Tuple, List] = {}
+        for end, (length, single_word, entry) in self._automaton.iter_long(lowered):
+            start = end - length + 1
+            if (start > 0 and lowered[start - 1].isalnum()) or (end + 1 < len(lowered) and lowered[end + 1].isalnum()):
+                continue
+            if single_word and not (text[start].isupper() or text[start].isdigit()):
+                continue
+            hit = found.get(entry)
+            if hit is None:
+                found[entry] = [1, start < len(headline)]
+            else:
+                hit[0] += 1
+                hit[1] = hit[1] or start < len(headline)
+
+        links: Dict[int, Tuple[float, int]] = {}
+        words: Optional[Set[str]] = None
+        for entry, (mentions, in_headline) in found.items():
+            bonus = (HEADLINE_BONUS if in_headline else 0.0) + min(MAX_REPEAT_BONUS, REPEAT_BONUS * (mentions - 1))
+            if len(entry) == 1:
+                company_id, specificity = entry[0]
+                score = specificity + bonus + (PRIOR_BONUS if company_id == prior else 0.0)
+            else:
+                if words is None:
+                    words = set(WORD_RE.findall(lowered))
+                scored = sorted(((specificity + self._context_score(company_id, words, prior), company_id)
+                                 for company_id, specificity in entry), reverse=True)
+                (best, company_id), runner_up = scored[0], scored[1][0]
+                if best - runner_up < AMBIGUITY_MARGIN:
+                    continue
+                score = best + bonus
+            if score >= LINK_THRESHOLD:
+                previous = links.get(company_id)
+                if previous is None or score > previous[0]:
+                    links[company_id] = (score, mentions + (previous[1] if previous else 0))
+                else:
+                    links[company_id] = (previous[0], previous[1] + mentions)
+        return sorted(((company_id, round(score, 3), mentions) for company_id, (score, mentions) in links.items()),
+                      key=lambda link: -link[1])
+
+    def _context_score(self, company_id: int, words: Set[str], prior: Optional[int]) -> float:
+        score = min(MAX_CONTEXT_TERM_BONUS, CONTEXT_TERM_BONUS * len(self._context.get(company_id, ()) & words))
+        if self._ceo.get(company_id) in words:
+            score += CEO_BONUS
+        if company_id == prior:
+            score += PRIOR_BONUS
+        return score
+
+
+def load_linker(db) -> EntityLinker:
+    """EntityLinker over every company in the database."""
+    from sqlalchemy import select
+    from main import Company, Person
+
+    rows = db.execute(
+        select(Company.id, Company.name, Company.industry_segment, Company.sector, Person.name.label("ceo_name"))
+        .outerjoin(Person, Company.ceo_id == Person.id)
+    ).mappings().all()
+    return EntityLinker(rows)
+
+
+def link_news(db, relink: bool = False, batch_size: int = 5000) -> Dict[str, int]:
+    """
+    Link the articles added since the last run to the companies they mention.
+
+    Args:
+        db: Database session
+        relink: Drop all links and start over (after companies were added or renamed)
+        batch_size: Articles per read batch and commit
+
+    Returns:
+        {"articles": articles scanned, "links": links stored, "assigned": articles given a company_id}
+    """
+    from sqlalchemy import delete, insert, select, update
+    from main import News, NewsCompany, PipelineState
+
+    linker = load_linker(db)
+    state = db.get(PipelineState, STAGE)
+    watermark = 0 if relink or state is None else state.watermark
+    if relink:
+        db.execute(delete(NewsCompany))
+
+    stats = {"articles": 0, "links": 0, "assigned": 0}
+    query = (
+        select(News.id, News.headline, News.content, News.company_id)
+        .order_by(News.id)
+        .limit(batch_size)
+    )
+    # Keyset pagination rather than a streaming cursor: each batch is fetched
+    # in full before it is committed, so no read cursor is left open across a
+    # commit (SQLite raises "database is locked", Postgres drops the cursor)
+    while True:
+        batch = db.execute(query.where(News.id > watermark)).all()
+        if not batch:
+            break
+        links, assigned = [], []
+        for news_id, headline, content, company_id in batch:
+            found = linker.link(headline, content, prior=company_id)
+            links.extend({"news_id": news_id, "company_id": linked, "score": score, "mentions": mentions}
+                         for linked, score, mentions in found)
+            if company_id is None and found:
+                assigned.append({"id": news_id, "company_id": found[0][0]})
+        if links:
+            db.execute(insert(NewsCompany), links)
+        if assigned:
+            db.execute(update(News), assigned)
+        watermark = batch[-1].id
+        db.merge(PipelineState(stage=STAGE, watermark=watermark))
+        # Commit per batch, so an interrupted run resumes where it stopped
+        db.commit()
+        stats["articles"] += len(batch)
+        stats["links"] += len(links)
+        stats["assigned"] += len(assigned)
+    db.commit()
+    return stats
+
+
+def _synthetic_companies(n: int, rng: random.Random) -> List[Dict]:
+    prefixes = ["Nova", "Medi", "Bio", "Cardio", "Neuro", "Gen", "Vita", "Onco", "Derma", "Pulmo", "Ortho", "Immu",
+                "Thera", "Radi", "Cyto", "Lumi", "Quant", "Synth", "Path", "Helix"]
+    stems = ["tech", "flow", "sense", "path", "core", "logic", "gen", "vue", "wave", "mind", "link", "scope",
+             "ra", "nex", "ify", "ly", "era", "ion", "ix", "ora"]
+    suffixes = ["", "", " Inc.", " Health", " Labs", " Solutions", " Therapeutics", " AI", " Corp"]
+    segments = ["medical-imaging", "digital-health", "biotech", "drug-discovery", "genomics", "agentic-ai"]
+    companies = []
+    for company_id in range(1, n + 1):
+        # Every fifth company shares its base name with an earlier one
+        if company_id % 5 == 0:
+            base = companies[rng.randrange(len(companies))]["base"]
+        else:
+            base = f"{rng.choice(prefixes)}{rng.choice(stems)}{rng.choice(stems)}{company_id}"
+        companies.append({"id": company_id, "base": base, "name": base + rng.choice(suffixes),
+                          "industry_segment": rng.choice(segments), "sector": "Healthcare",
+                          "ceo_name": f"Ceo Surname{company_id}"})
+    return companies
+
+
+def benchmark(n_articles: int, n_companies: int, seed: int = 0) -> None:
+    """Link `n_articles` synthetic articles against `n_companies` companies; report speed and accuracy."""
+    rng = random.Random(seed)
+    companies = _synthetic_companies(n_companies, rng)
+    filler = ("the company said on tuesday that its platform reached more hospitals this quarter while "
+              "analysts expect further growth in clinical adoption across regional markets").split()
+    articles, truth = [], []
+    for _ in range(n_articles):
+        mentioned = rng.sample(companies, rng.randint(0, 3))
+        sentences = [" ".join(rng.choices(filler, k=12)).capitalize() + "." for _ in range(rng.randint(8, 20))]
+        for company in mentioned:
+            # Context that separates namesakes: the industry and, sometimes, the CEO
+            context = company["industry_segment"].replace("-", " ")
+            if rng.random() < 0.5:
+                context += f" chief executive {company['ceo_name']}"
+            sentences.insert(rng.randrange(len(sentences) + 1), f"{company['name']} is expanding in {context}.")
+        headline = f"{mentioned[0]['name']} announces update" if mentioned else "Healthtech market update"
+        articles.append((headline, " ".join(sentences)))
+        truth.append({company["id"] for company in mentioned})
+    chars = sum(len(headline) + len(content) for headline, content in articles)
+
+    start = time.perf_counter()
+    linker = EntityLinker(companies)
+    print(f"Automaton: {linker.aliases:,} aliases of {n_companies:,} companies in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    linked = [{company_id for company_id, _, _ in linker.link(headline, content)} for headline, content in articles]
+    elapsed = time.perf_counter() - start
+    print(f"Linking: {n_articles:,} articles ({chars / n_articles:,.0f} chars avg) in {elapsed:.2f}s "
+          f"({n_articles / elapsed:,.0f} articles/s)")
+
+    true_positives = sum(len(found & expected) for found, expected in zip(linked, truth))
+    found_total = sum(len(found) for found in linked)
+    expected_total = sum(len(expected) for expected in truth)
+    print(f"  precision {true_positives / max(1, found_total):.3f}, recall {true_positives / max(1, expected_total):.3f}")
+
+    patterns = [re.compile(r'\b[A-Z][a-z]+(?:Health|Med|Bio|Tech|Care|Wellness)\b'),
+                re.compile(r'\b[A-Z][a-z]+(?:\.com|\.io|\.ai)\b'),
+                re.compile(r'\b[A-Z][a-z]+\s+(?:Health|Medical|Bio|Tech|Care)\b')]
+    start = time.perf_counter()
+    for headline, content in articles:
+        text = f"{headline} {content}"
+        for pattern in patterns:
+            pattern.findall(text)
+    elapsed = time.perf_counter() - start
+    print(f"Regex name extraction (rss_feed_parser, unlinked): {n_articles / elapsed:,.0f} articles/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Link news articles to the companies they mention")
+    parser.add_argument("--link", action="store_true", help="Link articles added since the last run")
+    parser.add_argument("--relink", action="store_true", help="Drop all links and link every article again")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--benchmark", type=int, metavar="N", help="Time linking N synthetic articles")
+    parser.add_argument("--companies", type=int, default=10000, help="Companies in the benchmark")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark, args.companies)
+        return 0
+    if not (args.link or args.relink):
+        parser.error("nothing to do (use --link, --relink or --benchmark)")
+
+    from main import SessionLocal
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        stats = link_news(db, relink=args.relink, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Scanned {stats['articles']} articles in {time.perf_counter() - start:.2f}s: "
+          f"{stats['links']} company links, {stats['assigned']} articles given a company")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,165 @@
+"""
+In-memory facet index for company filtering.
+
+Every facet value gets a NumPy bool array ("bitmap") with one slot per company
+row, so filtering is a handful of vectorized ANDs and facet counts are
+popcounts over those arrays. The index is built once from the database on
+startup and kept current as companies are ingested. `version` records which
+state of the data a build reflects, so the owner can tell when to rebuild.
+"""
+
+import threading
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+FACET_FIELDS = ["industry_segment", "sector", "ncp_status", "partner_tier", "vc_tier", "ai_native"]
+
+_INITIAL_CAPACITY = 1024
+
+
+def facet_key(value: Any) -> Optional[str]:
+    """Normalize a column value into the string key used for its bitmap."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+class FacetIndex:
+    """Per-facet bitmap indexes over company rows."""
+
+    def __init__(self, fields: List[str] = FACET_FIELDS):
+        self.fields = list(fields)
+        self._lock = threading.RLock()
+        self.version: Optional[int] = None
+        self._reset(_INITIAL_CAPACITY)
+
+    def _reset(self, capacity: int) -> None:
+        self._capacity = capacity
+        self._size = 0
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._positions: Dict[int, int] = {}
+        self._ordered = True
+        self._bitmaps: Dict[str, Dict[str, np.ndarray]] = {field: {} for field in self.fields}
+
+    def _grow(self, needed: int) -> None:
+        if needed <= self._capacity:
+            return
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+
+        def resize(arr: np.ndarray) -> np.ndarray:
+            out = np.zeros(capacity, dtype=arr.dtype)
+            out[:self._size] = arr[:self._size]
+            return out
+
+        self._ids = resize(self._ids)
+        self._alive = resize(self._alive)
+        for values in self._bitmaps.values():
+            for key in values:
+                values[key] = resize(values[key])
+        self._capacity = capacity
+
+    def _bitmap(self, field: str, key: str) -> np.ndarray:
+        values = self._bitmaps[field]
+        if key not in values:
+            values[key] = np.zeros(self._capacity, dtype=bool)
+        return values[key]
+
+    def build(self, rows: Iterable[Mapping[str, Any]], version: Optional[int] = None) -> None:
+        """Rebuild the index from scratch. Rows should be ordered by id."""
+        rows = list(rows)
+        with self._lock:
+            self.version = version
+            capacity = _INITIAL_CAPACITY
+            while capacity < len(rows):
+                capacity *= 2
+            self._reset(capacity)
+            n = len(rows)
+            self._ids[:n] = [row["id"] for row in rows]
+            self._alive[:n] = True
+            self._positions = {int(company_id): pos for pos, company_id in enumerate(self._ids[:n])}
+            self._ordered = bool(np.all(np.diff(self._ids[:n]) > 0))
+            self._size = n
+            for field in self.fields:
+                keys = np.array([facet_key(row.get(field)) for row in rows], dtype=object)
+                for key in sorted(k for k in set(keys.tolist()) if k is not None):
+                    self._bitmap(field, key)[:n] = keys == key
+
+    def upsert(self, row: Mapping[str, Any]) -> None:
+        """Add a company row, or refresh its facet values if already indexed."""
+        with self._lock:
+            company_id = int(row["id"])
+            pos = self._positions.get(company_id)
+            if pos is None:
+                self._grow(self._size + 1)
+                pos = self._size
+                if pos and company_id < self._ids[pos - 1]:
+                    self._ordered = False
+                self._size += 1
+                self._ids[pos] = company_id
+                self._positions[company_id] = pos
+            self._alive[pos] = True
+            for field in self.fields:
+                for bitmap in self._bitmaps[field].values():
+                    bitmap[pos] = False
+                key = facet_key(row.get(field))
+                if key is not None:
+                    self._bitmap(field, key)[pos] = True
+
+    def remove(self, company_id: int) -> None:
+        with self._lock:
+            pos = self._positions.get(int(company_id))
+            if pos is not None:
+                self._alive[pos] = False
+
+    def _mask(self, filters: Mapping[str, str], skip: Optional[str] = None) -> np.ndarray:
+        mask = self._alive[:self._size].copy()
+        for field, key in filters.items():
+            if field == skip:
+                continue
+            bitmap = self._bitmaps[field].get(key)
+            if bitmap is None:
+                mask[:] = False
+                break
+            mask &= bitmap[:self._size]
+        return mask
+
+    def query(self, filters: Mapping[str, Any], offset: int = 0, limit: int = 10) -> Dict[str, Any]:
+        """
+        Apply facet filters and return one page of matching ids plus counts.
+
+        Counts for a facet are computed with every filter except that facet's
+        own applied, so the UI can show how many rows each alternative value
+        would match.
+        """
+        filters = {field: facet_key(value) for field, value in filters.items() if value is not None}
+        unknown = set(filters) - set(self.fields)
+        if unknown:
+            raise KeyError(f"Unknown facet(s): {', '.join(sorted(unknown))}")
+
+        with self._lock:
+            mask = self._mask(filters)
+            matching = self._ids[:self._size][mask]
+            if not self._ordered:
+                matching = np.sort(matching)
+            page_ids = matching[offset:offset + limit].tolist()
+
+            counts: Dict[str, Dict[str, int]] = {}
+            for field in self.fields:
+                base = mask if field not in filters else self._mask(filters, skip=field)
+                field_counts = {}
+                for key, bitmap in self._bitmaps[field].items():
+                    count = int(np.count_nonzero(bitmap[:self._size] & base))
+                    if count:
+                        field_counts[key] = count
+                counts[field] = field_counts
+
+        return {"total": int(matching.size), "ids": page_ids, "facets": counts}
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._alive[:self._size]))
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Extract funding rounds from news articles into the investments table.
+
+Headlines like "MediTech Solutions Raises $50M Series B Led by Sequoia"
+carry a round's amount, currency, type and lead investors. Each article goes
+through a cascade of compiled regexes, each stage run only if the previous
+one matched:
+
+1. A funding word ("raises", "secures", "funding", "Series B", "led by",
+   ...) anywhere in the article. Most articles stop here.
+2. A money amount with a currency marker (MONEY_RE, adapted from
+   nvoydia-1/scraping/capital_iq_scraper.py), in a sentence with a funding
+   word, headline first. Amounts right after "valuation" or "revenue" are
+   skipped.
+3. The round type ("Seed", "Series B", "Growth", ...), from that sentence or
+   else anywhere in the article.
+4. Lead investors, from "led by ..." / "co-led by ...".
+
+The round is dated by the article's publication date and belongs to the
+article's company. Rounds reported by several articles are merged. A round
+matching an existing investment is merged into it too: same company, the
+date within DUPLICATE_WINDOW_DAYS, and the same round type or an amount
+within 5%. Missing fields of the existing investment are filled in.
+Everything else is bulk-inserted. Runs are incremental: the id of the last
+scanned article is kept in pipeline_state.
+
+Usage:
+    python funding_extraction.py --extract
+    python funding_extraction.py --extract --rescan
+    python funding_extraction.py --benchmark 200000
+"""
+
+import argparse
+import random
+import re
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+STAGE = "funding_extraction"
+
+DUPLICATE_WINDOW_DAYS = 45
+AMOUNT_TOLERANCE = 0.05
+MIN_AMOUNT = 10_000
+MAX_AMOUNT = 100_000_000_000
+
+FUNDING_RE = re.compile(
+    r"\b(?:rais(?:es|ed|ing|e)|secur(?:es|ed|ing)|clos(?:es|ed|ing)|lands?|bags?|nabs?|fundings?|financing|"
+    r"round|investment|invest(?:s|ed)|backed|led\s+by|series\s+[a-h]|(?:pre-)?seed)\b",
+    re.I,
+)
+# MONEY_RE from capital_iq_scraper, with a required currency marker (bare numbers are headcounts,
+# percentages and years in news text) and more currencies and unit spellings
+MONEY_RE = re.compile(
+    r"(?P<currency>US\$|USD|C\$|CAD|A\$|AUD|\$|€|EUR|£|GBP)\s*"
+    r"(?P<raw>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)\s*"
+    r"(?P<unit>thousand|million|billion|mn|mm|bn|k|m|b)?\b",
+    re.I,
+)
+NOT_ROUND_RE = re.compile(r"(?:valu(?:ation|ed)|revenue|sales|market cap\w*)\W+(?:\w+\W+){0,3}$", re.I)
+ROUND_RE = re.compile(
+    r"\b(pre-seed|seed|series\s+[a-h](?:\d|\+)?|growth|bridge|venture\s+debt|debt|mezzanine|pre-ipo|angel)\b"
+    r"(?:\s+(?:extension|round|funding|financing))?",
+    re.I,
+)
+# A capitalized or numeric word; dots only inside it, so a sentence's final stop ends the name
+_NAME_WORD = r"[A-Z0-9][\w&'-]*(?:\.[\w&'-]+)*"
+LEAD_RE = re.compile(
+    rf"\b(?i:co-)?(?i:led\s+by)\s+(?P<leads>{_NAME_WORD}(?:(?:\s+|,\s*|\s+and\s+|\s*&\s*){_NAME_WORD})*)",
+)
+LEAD_SPLIT_RE = re.compile(r",\s*(?:and\s+)?|\s+and\s+")
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+CURRENCIES = {"us$": "USD", "usd": "USD", "$": "USD", "c$": "CAD", "cad": "CAD", "a$": "AUD", "aud": "AUD",
+              "€": "EUR", "eur": "EUR", "£": "GBP", "gbp": "GBP"}
+UNITS = {"thousand": 1e3, "k": 1e3, "million": 1e6, "mn": 1e6, "mm": 1e6, "m": 1e6,
+         "billion": 1e9, "bn": 1e9, "b": 1e9}
+# Leading words the lead-investor pattern picks up that are not part of a name
+LEAD_STOPWORDS = frozenset({"The", "Existing", "New"})
+
+
+def _to_amount(match) -> Optional[float]:
+    value = float(match.group("raw").replace(",", ""))
+    unit = (match.group("unit") or "").lower()
+    return value * UNITS.get(unit, 1.0)
+
+
+def _round_type(text: str) -> Optional[str]:
+    match = ROUND_RE.search(text)
+    if not match:
+        return None
+    kind = " ".join(match.group(1).split()).lower()
+    if kind.startswith("series"):
+        return "Series " + kind.split()[1].upper()
+    return {"pre-ipo": "Pre-IPO", "venture debt": "Venture Debt"}.get(kind, kind.title())
+
+
+def _lead_investors(text: str) -> Optional[str]:
+    match = LEAD_RE.search(text)
+    if not match:
+        return None
+    leads = []
+    for name in LEAD_SPLIT_RE.split(match.group("leads")):
+        words = name.strip(" .").split()
+        while words and words[0] in LEAD_STOPWORDS:
+            words.pop(0)
+        if words:
+            leads.append(" ".join(words))
+    return ", ".join(dict.fromkeys(leads)) or None
+
+
+def extract_funding(headline: Optional[str], content: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    The funding round an article reports, if any.
+
+    Returns:
+        {"amount", "currency", "round_type", "lead_investors"}, or None if the
+        article reports no round with an amount
+    """
+    headline = headline or ""
+    content = content or ""
+    if not FUNDING_RE.search(headline) and not FUNDING_RE.search(content):
+        return None
+
+    for sentence in [headline] + SENTENCE_RE.split(content):
+        if not FUNDING_RE.search(sentence):
+            continue
+        for match in MONEY_RE.finditer(sentence):
+            if NOT_ROUND_RE.search(sentence, 0, match.start()):
+                continue
+            amount = _to_amount(match)
+            if amount is None or not MIN_AMOUNT <= amount <= MAX_AMOUNT:
+                continue
+            text = f"{headline}. {content}"
+            return {
+                "amount": amount,
+                "currency": CURRENCIES[match.group("currency").lower()],
+                "round_type": _round_type(sentence) or _round_type(text),
+                "lead_investors": _lead_investors(text),
+            }
+    return None
+
+
+def _same_round(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+    """Whether two rounds of one company are the same event."""
+    if a["date"] and b["date"] and abs(a["date"] - b["date"]) > timedelta(days=DUPLICATE_WINDOW_DAYS):
+        return False
+    if a["round_type"] and b["round_type"]:
+        return a["round_type"].lower() == b["round_type"].lower()
+    if a["amount"] and b["amount"]:
+        return abs(a["amount"] - b["amount"]) <= AMOUNT_TOLERANCE * max(a["amount"], b["amount"])
+    return False
+
+
+def _fill_missing(target: Dict[str, Any], source: Dict[str, Any]) -> bool:
+    """Copy fields `target` lacks from `source`; whether anything changed."""
+    changed = False
+    for field in ("round_type", "amount", "lead_investors", "source_news_id"):
+        if target.get(field) is None and source.get(field) is not None:
+            target[field] = source[field]
+            changed = True
+    return changed
+
+
+def extract_investments(db, rescan: bool = False, batch_size: int = 5000) -> Dict[str, int]:
+    """
+    Extract rounds from the articles added since the last run and upsert them into investments.
+
+    Args:
+        db: Database session
+        rescan: Scan every article again; rounds already stored are deduplicated as usual
+        batch_size: Articles per read batch and commit
+
+    Returns:
+        {"articles", "rounds" found, "inserted", "updated" existing investments, "duplicates"}
+    """
+    from sqlalchemy import insert, select, update
+    from main import Investment, News, PipelineState
+
+    state = db.get(PipelineState, STAGE)
+    watermark = 0 if rescan or state is None else state.watermark
+    query = (
+        select(News.id, News.headline, News.content, News.published_at, News.company_id)
+        .order_by(News.id)
+        .limit(batch_size)
+    )
+    stats = {"articles": 0, "rounds": 0, "inserted": 0, "updated": 0, "duplicates": 0}
+    # Keyset pagination, so no read cursor is open across the per-batch commit
+    while True:
+        batch = db.execute(query.where(News.id > watermark)).all()
+        if not batch:
+            break
+        found = []
+        for news_id, headline, content, published_at, company_id in batch:
+            if company_id is None:
+                continue
+            funding = extract_funding(headline, content)
+            if funding:
+                found.append({**funding, "company_id": company_id, "date": published_at, "source_news_id": news_id})
+        stats["articles"] += len(batch)
+        stats["rounds"] += len(found)
+
+        # Existing rounds of the companies in this batch
+        existing: Dict[int, List[Dict[str, Any]]] = {}
+        if found:
+            rows = db.execute(
+                select(Investment.id, Investment.company_id, Investment.round_type, Investment.amount,
+                       Investment.date, Investment.lead_investors, Investment.source_news_id)
+                .where(Investment.company_id.in_({funding["company_id"] for funding in found}))
+            ).mappings()
+            for row in rows:
+                existing.setdefault(row["company_id"], []).append(dict(row))
+
+        inserts: List[Dict[str, Any]] = []
+        updates: Dict[int, Dict[str, Any]] = {}
+        for funding in found:
+            rounds = existing.setdefault(funding["company_id"], [])
+            match = next((known for known in rounds if _same_round(known, funding)), None)
+            if match is None:
+                rounds.append(funding)
+                inserts.append(funding)
+                continue
+            stats["duplicates"] += 1
+            if _fill_missing(match, funding) and match.get("id") is not None:
+                updates[match["id"]] = match
+        if inserts:
+            db.execute(insert(Investment), [
+                {field: funding[field] for field in ("company_id", "round_type", "amount", "currency", "date",
+                                                     "lead_investors", "source_news_id")}
+                for funding in inserts
+            ])
+        if updates:
+            db.execute(update(Investment), [
+                {field: known[field] for field in ("id", "round_type", "amount", "lead_investors", "source_news_id")}
+                for known in updates.values()
+            ])
+        watermark = batch[-1].id
+        db.merge(PipelineState(stage=STAGE, watermark=watermark))
+        # Commit per batch, so an interrupted run resumes where it stopped
+        db.commit()
+        stats["inserted"] += len(inserts)
+        stats["updated"] += len(updates)
+    db.commit()
+    return stats
+
+
+def benchmark(n: int, funding_share: float = 0.1, seed: int = 0) -> None:
+    """Extract from `n` synthetic articles, `funding_share` of them funding news; report speed and accuracy."""
+    rng = random.Random(seed)
+    templates = [
+        ("{company} raises ${amount}M Series {letter} led by {lead}",
+         "The round brings total funding to ${total}M. Existing investors also participated."),
+        ("{company} secures €{amount} million in Series {letter} funding",
+         "The Series {letter} financing was led by {lead} and {lead2}. The company is valued at $900 million."),
+        ("{company} lands ${amount}M to scale its platform",
+         "The Series {letter} round was co-led by {lead}, the company said on Tuesday."),
+    ]
+    other = ("{company} reports quarterly revenue of $48M as demand grows",
+             "Revenue rose 12% from a year earlier. The company employs 350 people across 4 offices.")
+    filler = " The chief executive said the company plans to hire engineers and expand to new markets this year."
+    articles = []
+    for i in range(n):
+        values = {"company": f"Company {i}", "amount": rng.randint(2, 400), "letter": rng.choice("ABCD"),
+                  "lead": f"Fund {rng.randrange(100)} Ventures", "lead2": f"Capital {rng.randrange(100)}",
+                  "total": rng.randint(400, 900)}
+        if rng.random() < funding_share:
+            headline, content = rng.choice(templates)
+            expected = (values["amount"] * 1e6, f"Series {values['letter']}")
+        else:
+            headline, content = other
+            expected = None
+        articles.append((headline.format(**values), content.format(**values) + filler * 3, expected))
+
+    start = time.perf_counter()
+    results = [extract_funding(headline, content) for headline, content, _ in articles]
+    elapsed = time.perf_counter() - start
+    print(f"Extracted from {n:,} articles in {elapsed:.2f}s ({n / elapsed:,.0f} articles/s, "
+          f"{funding_share:.0%} funding news)")
+
+    expected_rounds = [expected for _, _, expected in articles if expected]
+    found = sum(1 for result in results if result)
+    correct = sum(1 for (_, _, expected), result in zip(articles, results)
+                  if expected and result and (result["amount"], result["round_type"]) == expected)
+    false_positives = sum(1 for (_, _, expected), result in zip(articles, results) if result and not expected)
+    leads = sum(1 for result in results if result and result["lead_investors"])
+    print(f"  {found:,} rounds found, {correct:,} of {len(expected_rounds):,} with the right amount and type, "
+          f"{false_positives:,} false positives, {leads:,} with lead investors")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract funding rounds from news into investments")
+    parser.add_argument("--extract", action="store_true", help="Scan articles added since the last run")
+    parser.add_argument("--rescan", action="store_true", help="Scan every article again")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--benchmark", type=int, metavar="N", help="Time extraction over N synthetic articles")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return 0
+    if not (args.extract or args.rescan):
+        parser.error("nothing to do (use --extract, --rescan or --benchmark)")
+
+    from main import SessionLocal
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        stats = extract_investments(db, rescan=args.rescan, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Scanned {stats['articles']} articles in {time.perf_counter() - start:.2f}s: {stats['rounds']} rounds, "
+          f"{stats['inserted']} new investments, {stats['updated']} updated, {stats['duplicates']} duplicates")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
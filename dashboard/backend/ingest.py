@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Ingest collected articles into the news table.
+
+Reads the partitioned Parquet article store written by the news collector
+(nvoydia-1/news/article_store.py):
+
+    <root>/date=YYYY-MM-DD/company=<slug>/part-*.parquet
+
+Only partitions for companies in the database are read, and only the
+columns the news table needs. Runs are incremental on collection time: rows
+collected at or after the newest ingested article's collected_at are read,
+whatever their publication date, so history collected later for a new
+company or an earlier window is still picked up. Articles whose URL is
+already stored for the company are skipped.
+
+Usage:
+    python ingest.py ../../nvoydia-1/news/newsdata/articles
+    python ingest.py ../../nvoydia-1/news/newsdata/articles --since 2024-01-01
+"""
+
+import argparse
+from datetime import datetime
+from typing import Dict, Optional
+
+import pyarrow.dataset as ds
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from collector import import_collector
+
+# The store layout is defined once, by the collector that writes it
+article_store = import_collector("article_store")
+PARTITIONING = article_store.PARTITIONING
+company_slug = article_store.company_slug
+
+STORE_COLUMNS = ["company", "title", "description", "content", "url", "published_at", "source_name",
+                 "collected_at"]
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.rstrip("Z"))
+
+
+def ingest_articles(db: Session, store_root: str, since: Optional[str] = None,
+                    batch_size: int = 5000) -> Dict[str, int]:
+    """
+    Insert new articles from the article store into the news table.
+
+    Args:
+        db: Database session
+        store_root: Article store directory
+        since: Read every article published on or after this date (YYYY-MM-DD)
+            instead of those collected since the last run.
+        batch_size: Rows per read batch and insert
+
+    Returns:
+        {"read": rows scanned, "inserted": rows added, "skipped": duplicates or undated rows}
+    """
+    from main import Company, News
+
+    companies = {company_slug(name): company_id
+                 for company_id, name in db.execute(select(Company.id, Company.name)) if name}
+    stats = {"read": 0, "inserted": 0, "skipped": 0}
+    if not companies:
+        return stats
+
+    collected = None if since else db.execute(select(func.max(News.collected_at))).scalar()
+
+    # Only URLs that could collide with what we are about to read: rows
+    # collected at the watermark itself are read again and skipped here
+    existing_query = select(News.company_id, News.url).where(News.url.isnot(None))
+    expression = ds.field("company").isin(list(companies))
+    if since:
+        existing_query = existing_query.where(News.published_at >= datetime.strptime(since, "%Y-%m-%d"))
+        expression = expression & (ds.field("date") >= since)
+    elif collected:
+        existing_query = existing_query.where(News.collected_at >= collected)
+        expression = expression & (ds.field("collected_at") >= collected.isoformat())
+    seen = set(db.execute(existing_query).all())
+
+    dataset = ds.dataset(store_root, format="parquet", partitioning=PARTITIONING)
+
+    for batch in dataset.to_batches(columns=STORE_COLUMNS, filter=expression, batch_size=batch_size):
+        rows = []
+        for article in batch.to_pylist():
+            stats["read"] += 1
+            key = (companies[article["company"]], article["url"])
+            published_at = _parse_timestamp(article["published_at"])
+            if key in seen or published_at is None:
+                stats["skipped"] += 1
+                continue
+            seen.add(key)
+            rows.append({
+                "headline": article["title"] or "",
+                "content": article["content"] or article["description"] or "",
+                "published_at": published_at,
+                "source": article["source_name"] or "",
+                "url": article["url"],
+                "company_id": key[0],
+                "collected_at": _parse_timestamp(article["collected_at"]),
+            })
+        if rows:
+            db.execute(insert(News), rows)
+            stats["inserted"] += len(rows)
+    db.commit()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest articles from the news article store")
+    parser.add_argument("store", help="Article store directory")
+    parser.add_argument("--since", help="Read every article published on or after YYYY-MM-DD "
+                                        "(default: articles collected since the last run)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    from main import SessionLocal
+
+    db = SessionLocal()
+    try:
+        stats = ingest_articles(db, args.store, since=args.since, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Read {stats['read']} articles, inserted {stats['inserted']}, skipped {stats['skipped']}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
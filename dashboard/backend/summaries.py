@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Extractive summaries of stored news articles.
+
+Sentences are picked by the collector's sentence scoring
+(nvoydia-1/news/sentence_scoring.py, shared with its offline summarizer):
+TextRank centrality, similarity to the article's centroid, financial
+figures (numbers, amounts, percentages) and mentions of the company. The
+best non-redundant sentences are returned in their original order.
+
+Summaries are stored in the news_summaries table with a hash of the text
+they were made from. A missing or stale summary is generated by a
+SummaryJobQueue worker; concurrent requests for the same article share one
+job. `--backfill` precomputes summaries for every stored article.
+
+Usage:
+    python summaries.py --backfill
+    python summaries.py --backfill --refresh
+"""
+
+import argparse
+import hashlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from collector import import_collector
+
+sentence_scoring = import_collector("sentence_scoring")
+
+DEFAULT_MAX_SENTENCES = sentence_scoring.DEFAULT_MAX_SENTENCES
+SUMMARY_METHOD = "extractive"
+
+
+def summarize_text(text: str, company: Optional[str] = None,
+                   max_sentences: int = DEFAULT_MAX_SENTENCES) -> str:
+    """The `max_sentences` most salient sentences of `text`, in their original order."""
+    sentences = sentence_scoring.split_sentences(text, separator="\n")
+    chosen = sentence_scoring.select_sentences(sentences, company, max_sentences=max_sentences)
+    return " ".join(chosen) or text.strip()
+
+
+def summarize_article(headline: Optional[str], content: Optional[str], company: Optional[str] = None,
+                      max_sentences: int = DEFAULT_MAX_SENTENCES) -> str:
+    """Summary of one stored article from its headline and content."""
+    headline = (headline or "").strip()
+    if headline and headline[-1] not in ".!?":
+        headline += "."
+    return summarize_text("\n".join(part for part in (headline, content or "") if part), company, max_sentences)
+
+
+def content_hash(headline: Optional[str], content: Optional[str]) -> str:
+    """Hash of the text a summary is made from; a stored summary with another hash is stale."""
+    return hashlib.sha1(f"{headline or ''}\x1f{content or ''}".encode("utf-8")).hexdigest()
+
+
+class SummaryJobQueue:
+    """
+    Background summary generation, at most one job per article at a time.
+
+    Submitting an article whose job is queued or running returns that job's
+    Future instead of starting another, so a burst of clicks on one article
+    costs one summary.
+    """
+
+    def __init__(self, generate: Callable[[int], Any], workers: int = 2):
+        """
+        Args:
+            generate: Summarizes and stores one article by news id, returning the summary
+            workers: Worker threads
+        """
+        self._generate = generate
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="summary")
+        self._jobs: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.deduplicated = 0
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, news_id: int) -> Future:
+        """Queue a summary for `news_id`, or join the job already in flight for it."""
+        with self._lock:
+            future = self._jobs.get(news_id)
+            if future is not None:
+                self.deduplicated += 1
+                return future
+            future = self._jobs[news_id] = self._executor.submit(self._run, news_id)
+            self.submitted += 1
+        return future
+
+    def _run(self, news_id: int) -> Any:
+        try:
+            result = self._generate(news_id)
+            self.completed += 1
+            return result
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._jobs.pop(news_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "completed": self.completed,
+            "failed": self.failed,
+            "in_flight": len(self._jobs),
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+def backfill_summaries(db, refresh: bool = False, batch_size: int = 1000) -> Dict[str, int]:
+    """
+    Store summaries for articles that have none.
+
+    Args:
+        db: Database session
+        refresh: Also regenerate summaries whose article text has changed
+        batch_size: Articles per read batch and commit
+
+    Returns:
+        {"summarized": summaries written, "stale": of which replaced, "current": left as they were}
+    """
+    from sqlalchemy import delete, insert, select
+    from main import Company, News, NewsSummary
+
+    query = (
+        select(News.id, News.headline, News.content, Company.name, NewsSummary.content_hash)
+        .outerjoin(Company, News.company_id == Company.id)
+        .outerjoin(NewsSummary, NewsSummary.news_id == News.id)
+        .order_by(News.id)
+        .limit(batch_size)
+    )
+    if not refresh:
+        query = query.where(NewsSummary.news_id.is_(None))
+
+    stats = {"summarized": 0, "stale": 0, "current": 0}
+    last_id = 0
+    # Keyset pagination, as in entity_linking.link_news: no read cursor stays
+    # open while summaries are deleted, inserted and committed
+    while True:
+        batch = db.execute(query.where(News.id > last_id)).all()
+        if not batch:
+            break
+        rows, stale = [], []
+        for news_id, headline, content, company, stored_hash in batch:
+            digest = content_hash(headline, content)
+            if stored_hash == digest:
+                stats["current"] += 1
+                continue
+            if stored_hash is not None:
+                stale.append(news_id)
+            rows.append({"news_id": news_id, "summary": summarize_article(headline, content, company),
+                         "method": SUMMARY_METHOD, "content_hash": digest})
+        if stale:
+            db.execute(delete(NewsSummary).where(NewsSummary.news_id.in_(stale)))
+        if rows:
+            db.execute(insert(NewsSummary), rows)
+        # Commit per batch, so an interrupted run keeps the summaries it wrote
+        db.commit()
+        last_id = batch[-1].id
+        stats["summarized"] += len(rows)
+        stats["stale"] += len(stale)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute extractive summaries of stored news")
+    parser.add_argument("--backfill", action="store_true", help="Summarize every article without a summary")
+    parser.add_argument("--refresh", action="store_true", help="Also regenerate summaries of changed articles")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    if not args.backfill:
+        parser.error("nothing to do (use --backfill)")
+
+    from main import SessionLocal
+
+    db = SessionLocal()
+    try:
+        stats = backfill_summaries(db, refresh=args.refresh, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Summarized {stats['summarized']} articles ({stats['stale']} stale), {stats['current']} already current")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
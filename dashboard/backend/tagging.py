@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Event-type and sentiment tags for news articles.
+
+Two linear classifiers share one feature space: the words and word bigrams
+of an article, hashed into FEATURE_DIM signed slots (the hashing featurizer
+from embeddings.py), with headline terms counted HEADLINE_WEIGHT times. A
+class's score is the sum of its weights over the article's terms plus a bias,
+and the best-scoring class wins:
+
+- event_type: funding, acquisition, earnings, layoffs, partnership, product,
+  regulatory, or general when no event scores above the general bias
+- sentiment: positive, negative, or neutral likewise
+
+The default weights come from a small lexicon of indicative phrases. With
+labeled articles (--train) they are refined by perceptron updates and saved
+to a model file, which tagging then uses instead.
+
+Inference is vectorized over a batch: terms are hashed once, and each class
+score is one weighted bincount over the batch's terms.
+
+Tags are stored in the indexed news.event_type and news.sentiment columns,
+so `/news?event=funding` is an index lookup. Runs are incremental: the id of
+the last tagged article is kept in pipeline_state.
+
+Usage:
+    python tagging.py --tag
+    python tagging.py --tag --retag
+    python tagging.py --train labeled.jsonl
+    python tagging.py --benchmark 1000000
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from embeddings import MAX_TEXT_CHARS, HashingEncoder
+
+STAGE = "tagging"
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "tagging_model.npz")
+
+FEATURE_DIM = 1 << 20
+HEADLINE_WEIGHT = 2.0
+
+EVENT_TYPES = ["general", "funding", "acquisition", "earnings", "layoffs", "partnership", "product", "regulatory"]
+SENTIMENTS = ["neutral", "positive", "negative"]
+
+# Score an event (or a sentiment) must beat to replace the default label
+EVENT_BIAS = {"general": 1.5}
+SENTIMENT_BIAS = {"neutral": 1.0}
+
+EVENT_LEXICON = {
+    "funding": {
+        "raises": 2.0, "raised": 1.5, "raise": 1.0, "raising": 1.0, "funding": 1.5, "funding round": 1.0,
+        "financing": 1.5, "series": 1.0, "seed round": 2.0, "seed funding": 1.0, "led by": 1.0, "investors": 0.5,
+        "venture": 0.5, "valuation": 1.0, "backed": 0.5, "capital": 0.5,
+    },
+    "acquisition": {
+        "acquires": 2.5, "acquire": 2.0, "acquired": 2.0, "acquisition": 2.5, "acquisitions": 1.5,
+        "merger": 2.5, "merge": 2.0, "merges": 2.0, "buyout": 2.0, "takeover": 2.5, "to buy": 1.5, "buys": 2.0,
+        "deal": 0.5,
+    },
+    "earnings": {
+        "earnings": 2.5, "quarterly": 1.0, "quarter": 1.0, "revenue": 1.0, "profit": 1.5, "net income": 2.0,
+        "eps": 2.0, "guidance": 1.5, "fiscal": 1.0, "results": 0.5, "estimates": 1.0, "per share": 1.5,
+        "sales": 0.5,
+    },
+    "layoffs": {
+        "layoffs": 3.0, "layoff": 3.0, "lays off": 3.0, "laid off": 3.0, "job cuts": 3.0, "cuts jobs": 3.0,
+        "cut jobs": 3.0, "workforce": 1.5, "restructuring": 1.5, "headcount": 1.5, "employees": 0.5,
+    },
+    "partnership": {
+        "partnership": 2.5, "partners with": 2.5, "partnered": 2.0, "partner": 1.0, "collaboration": 2.0,
+        "collaborate": 1.5, "alliance": 2.0, "teams up": 2.5, "joint": 1.0, "agreement": 0.5,
+    },
+    "product": {
+        "launches": 2.5, "launched": 2.0, "launch": 1.5, "unveils": 2.5, "introduces": 2.0, "rolls out": 2.0,
+        "new platform": 1.5, "release": 1.0, "releases": 1.5, "available": 0.5, "product": 0.5,
+    },
+    "regulatory": {
+        "fda": 2.0, "clearance": 2.0, "approval": 2.0, "approved": 1.5, "cleared": 1.5, "510 k": 2.0,
+        "regulator": 2.0, "regulators": 2.0, "regulatory": 2.0, "lawsuit": 2.0, "sued": 2.0, "sec": 1.5,
+        "investigation": 1.5, "fined": 2.0, "compliance": 1.0,
+    },
+}
+SENTIMENT_LEXICON = {
+    "positive": {
+        "growth": 0.7, "grows": 0.7, "surge": 1.0, "surges": 1.0, "soars": 1.2, "beats": 1.0, "record": 0.7,
+        "strong": 0.7, "gains": 0.8, "expands": 0.7, "expand": 0.5, "expansion": 0.6, "secures": 0.5, "wins": 1.0,
+        "approval": 0.7, "approved": 0.7, "profit": 0.5, "rises": 0.8, "jumps": 1.0, "boost": 0.8, "boosts": 0.8,
+        "success": 0.8, "breakthrough": 1.0, "milestone": 0.8, "upgrade": 0.8, "outperform": 1.0, "raises": 0.4,
+        "partnership": 0.4, "launches": 0.4, "improved": 0.6, "improves": 0.6,
+    },
+    "negative": {
+        "layoffs": 1.2, "lays off": 1.2, "job cuts": 1.2, "cuts": 0.7, "decline": 0.8, "declines": 0.8,
+        "falls": 0.8, "drops": 0.8, "plunges": 1.2, "slump": 1.0, "loss": 0.7, "losses": 0.8, "misses": 1.0,
+        "lawsuit": 1.0, "sued": 1.0, "investigation": 0.8, "recall": 1.0, "fraud": 1.5, "bankruptcy": 1.5,
+        "weak": 0.8, "downgrade": 1.0, "delays": 0.7, "delayed": 0.7, "concerns": 0.6, "warning": 0.7,
+        "breach": 1.2, "shutdown": 1.2, "shuts down": 1.2, "struggles": 0.8, "fined": 1.0, "restructuring": 0.6,
+    },
+}
+
+
+class Features:
+    """Hashed terms of a batch of articles: for each term, its article, slot and signed weight."""
+
+    __slots__ = ("size", "rows", "slots", "values")
+
+    def __init__(self, size: int, rows: np.ndarray, slots: np.ndarray, values: np.ndarray):
+        self.size = size
+        self.rows = rows
+        self.slots = slots
+        self.values = values
+
+
+class Featurizer:
+    """Headline and content terms hashed into `dim` signed slots."""
+
+    def __init__(self, dim: int = FEATURE_DIM):
+        # No stopwords: "series a" and "lays off" need their short words
+        self.hasher = HashingEncoder(dim, stopwords=frozenset())
+        self.dim = dim
+
+    def _hashed(self, texts: Sequence[str], weight: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        rows, terms = self.hasher.term_hashes(texts)
+        slots = (terms & np.uint64(self.dim - 1)).astype(np.int64)
+        values = weight * (1.0 - 2.0 * (terms >> np.uint64(31)).astype(np.float64))
+        return rows, slots, values
+
+    def transform(self, headlines: Sequence[Optional[str]], contents: Sequence[Optional[str]]) -> Features:
+        head = self._hashed([headline or "" for headline in headlines], HEADLINE_WEIGHT)
+        body = self._hashed([(content or "")[:MAX_TEXT_CHARS] for content in contents], 1.0)
+        return Features(len(headlines), *(np.concatenate(pair) for pair in zip(head, body)))
+
+    def phrase(self, phrase: str) -> Tuple[int, float]:
+        """Slot and sign of a lexicon phrase of one or two words: its bigram, or its single word."""
+        _, terms = self.hasher.term_hashes([phrase])
+        term = terms[-1]
+        return int(term & np.uint64(self.dim - 1)), 1.0 - 2.0 * float(term >> np.uint64(31))
+
+
+class LinearTagger:
+    """Multiclass linear model over hashed terms."""
+
+    def __init__(self, labels: Sequence[str], weights: np.ndarray, bias: np.ndarray):
+        """
+        Args:
+            labels: Class names; the first is the default
+            weights: (classes, feature dim) float32 weights
+            bias: Per-class score offsets
+        """
+        self.labels = list(labels)
+        self.weights = weights
+        self.bias = bias
+
+    @classmethod
+    def from_lexicon(cls, labels: Sequence[str], lexicon: Dict[str, Dict[str, float]],
+                     bias: Dict[str, float], featurizer: Featurizer) -> "LinearTagger":
+        weights = np.zeros((len(labels), featurizer.dim), dtype=np.float32)
+        for label, phrases in lexicon.items():
+            row = labels.index(label)
+            for phrase, weight in phrases.items():
+                slot, sign = featurizer.phrase(phrase)
+                weights[row, slot] += sign * weight
+        return cls(labels, weights, np.array([bias.get(label, 0.0) for label in labels], dtype=np.float32))
+
+    def scores(self, features: Features) -> np.ndarray:
+        """(articles, classes) scores."""
+        out = np.empty((features.size, len(self.labels)), dtype=np.float64)
+        for c in range(len(self.labels)):
+            out[:, c] = np.bincount(features.rows, weights=self.weights[c, features.slots] * features.values,
+                                    minlength=features.size)
+        return out + self.bias
+
+    def predict(self, features: Features) -> np.ndarray:
+        """Class index of every article."""
+        return np.argmax(self.scores(features), axis=1)
+
+    def update(self, features: Features, targets: np.ndarray, learning_rate: float) -> int:
+        """One perceptron step: move weights from wrongly predicted classes to the right ones."""
+        predicted = self.predict(features)
+        wrong = predicted != targets
+        terms = wrong[features.rows]
+        rows, slots, values = features.rows[terms], features.slots[terms], features.values[terms]
+        np.add.at(self.weights, (targets[rows], slots), learning_rate * values)
+        np.add.at(self.weights, (predicted[rows], slots), -learning_rate * values)
+        return int(wrong.sum())
+
+
+class NewsTagger:
+    """Event-type and sentiment classifiers over a shared featurizer."""
+
+    def __init__(self, event: Optional[LinearTagger] = None, sentiment: Optional[LinearTagger] = None,
+                 dim: int = FEATURE_DIM):
+        """
+        Args:
+            event: Event-type classifier (default: from EVENT_LEXICON)
+            sentiment: Sentiment classifier (default: from SENTIMENT_LEXICON)
+            dim: Feature slots
+        """
+        self.featurizer = Featurizer(dim)
+        self.event = event or LinearTagger.from_lexicon(EVENT_TYPES, EVENT_LEXICON, EVENT_BIAS, self.featurizer)
+        self.sentiment = sentiment or LinearTagger.from_lexicon(SENTIMENTS, SENTIMENT_LEXICON, SENTIMENT_BIAS,
+                                                                self.featurizer)
+
+    def tag(self, headlines: Sequence[Optional[str]],
+            contents: Sequence[Optional[str]]) -> Tuple[List[str], List[str]]:
+        """Event type and sentiment of each article."""
+        features = self.featurizer.transform(headlines, contents)
+        events = [self.event.labels[i] for i in self.event.predict(features)]
+        sentiments = [self.sentiment.labels[i] for i in self.sentiment.predict(features)]
+        return events, sentiments
+
+    def fit(self, articles: Sequence[Dict], epochs: int = 5, learning_rate: float = 0.1,
+            batch_size: int = 4096) -> List[Tuple[int, int]]:
+        """
+        Refine the weights on labeled articles with perceptron updates.
+
+        Args:
+            articles: Dicts with headline, content, event_type and sentiment
+            epochs: Passes over the articles
+            learning_rate: Update size; small values keep more of the lexicon
+            batch_size: Articles per update
+
+        Returns:
+            Misclassified (event, sentiment) articles in each epoch
+        """
+        history = []
+        for _ in range(epochs):
+            errors = [0, 0]
+            for start in range(0, len(articles), batch_size):
+                batch = articles[start:start + batch_size]
+                features = self.featurizer.transform([a.get("headline") for a in batch],
+                                                     [a.get("content") for a in batch])
+                for i, (model, field) in enumerate(((self.event, "event_type"), (self.sentiment, "sentiment"))):
+                    targets = np.array([model.labels.index(a[field]) for a in batch])
+                    errors[i] += model.update(features, targets, learning_rate)
+            history.append(tuple(errors))
+        return history
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez_compressed(path, dim=self.featurizer.dim,
+                            event_labels=self.event.labels, event_weights=self.event.weights,
+                            event_bias=self.event.bias, sentiment_labels=self.sentiment.labels,
+                            sentiment_weights=self.sentiment.weights, sentiment_bias=self.sentiment.bias)
+
+    @classmethod
+    def load(cls, path: str) -> "NewsTagger":
+        with np.load(path) as model:
+            event = LinearTagger(model["event_labels"].tolist(), model["event_weights"], model["event_bias"])
+            sentiment = LinearTagger(model["sentiment_labels"].tolist(), model["sentiment_weights"],
+                                     model["sentiment_bias"])
+            return cls(event, sentiment, int(model["dim"]))
+
+
+def load_tagger(path: Optional[str] = DEFAULT_MODEL_PATH) -> NewsTagger:
+    """The trained model at `path` if there is one, else the lexicon model."""
+    if path and os.path.exists(path):
+        return NewsTagger.load(path)
+    return NewsTagger()
+
+
+def tag_news(db, tagger: Optional[NewsTagger] = None, retag: bool = False,
+             batch_size: int = 10000) -> Dict[str, int]:
+    """
+    Tag the articles added since the last run.
+
+    Args:
+        db: Database session
+        tagger: Classifier (default: load_tagger())
+        retag: Tag every article again (after the model changed)
+        batch_size: Articles per read batch and commit
+
+    Returns:
+        {"articles": articles tagged, "<event type>": articles of that type, ...}
+    """
+    from sqlalchemy import select, update
+    from main import News, PipelineState
+
+    tagger = tagger or load_tagger()
+    state = db.get(PipelineState, STAGE)
+    watermark = 0 if retag or state is None else state.watermark
+    query = select(News.id, News.headline, News.content).order_by(News.id).limit(batch_size)
+
+    stats = {"articles": 0}
+    # Keyset pagination, so no read cursor is open across the per-batch commit
+    while True:
+        batch = db.execute(query.where(News.id > watermark)).all()
+        if not batch:
+            break
+        events, sentiments = tagger.tag([row.headline for row in batch], [row.content for row in batch])
+        db.execute(update(News), [{"id": row.id, "event_type": event, "sentiment": sentiment}
+                                  for row, event, sentiment in zip(batch, events, sentiments)])
+        watermark = batch[-1].id
+        db.merge(PipelineState(stage=STAGE, watermark=watermark))
+        # Commit per batch, so an interrupted run resumes where it stopped
+        db.commit()
+        stats["articles"] += len(batch)
+        for event in events:
+            stats[event] = stats.get(event, 0) + 1
+    db.commit()
+    return stats
+
+
+def read_labeled(path: str) -> List[Dict]:
+    """Labeled articles from a JSON Lines file of {headline, content, event_type, sentiment}."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+_TEMPLATES = {
+    ("funding", "positive"): ["{company} raises ${amount}M Series {round} led by {investor}",
+                              "{company} secures ${amount}M in new funding to expand its platform"],
+    ("acquisition", "neutral"): ["{company} acquires {other} in ${amount}M deal",
+                                 "{other} agrees to merger with {company}"],
+    ("earnings", "positive"): ["{company} beats estimates as quarterly revenue surges {pct}%"],
+    ("earnings", "negative"): ["{company} misses estimates as quarterly revenue falls {pct}%"],
+    ("layoffs", "negative"): ["{company} lays off {pct}% of workforce in restructuring",
+                              "{company} announces layoffs amid weak demand"],
+    ("partnership", "neutral"): ["{company} partners with {other} to bring AI to hospitals"],
+    ("product", "neutral"): ["{company} launches new platform for clinical teams"],
+    ("regulatory", "positive"): ["{company} wins FDA 510(k) clearance for imaging software"],
+    ("regulatory", "negative"): ["{company} faces SEC investigation over billing practices"],
+    ("general", "neutral"): ["{company} to present at healthcare conference next month",
+                             "{company} names new chief medical officer"],
+}
+_FILLER = ("The company said on Tuesday that its platform is used by clinicians in several regions and that "
+           "it expects to hire engineers this year. The chief executive spoke with reporters after the event.")
+
+
+def synthetic_articles(n: int, seed: int = 0) -> Iterator[Tuple[str, str, str, str]]:
+    """(headline, content, event type, sentiment) of `n` templated articles."""
+    rng = random.Random(seed)
+    keys = list(_TEMPLATES)
+    for i in range(n):
+        event, sentiment = keys[rng.randrange(len(keys))]
+        headline = rng.choice(_TEMPLATES[(event, sentiment)]).format(
+            company=f"Company {i}", other=f"Company {rng.randrange(n)}", amount=rng.randint(2, 400),
+            round=rng.choice("ABCD"), investor=f"Fund {rng.randrange(500)}", pct=rng.randint(2, 40))
+        yield headline, _FILLER, event, sentiment
+
+
+def benchmark(n: int, batch_size: int = 10000) -> None:
+    """Tag `n` synthetic articles with the lexicon model; report throughput and agreement with the templates."""
+    tagger = NewsTagger()
+    articles = synthetic_articles(n)
+    elapsed = 0.0
+    correct_events = correct_sentiments = 0
+    confusion: Dict[Tuple[str, str], int] = {}
+    done = 0
+    while done < n:
+        batch = [next(articles) for _ in range(min(batch_size, n - done))]
+        headlines, contents, events, sentiments = zip(*batch)
+        start = time.perf_counter()
+        predicted_events, predicted_sentiments = tagger.tag(headlines, contents)
+        elapsed += time.perf_counter() - start
+        for expected, predicted in zip(events, predicted_events):
+            correct_events += expected == predicted
+            if expected != predicted:
+                confusion[(expected, predicted)] = confusion.get((expected, predicted), 0) + 1
+        correct_sentiments += sum(e == p for e, p in zip(sentiments, predicted_sentiments))
+        done += len(batch)
+    print(f"Tagged {n:,} articles in {elapsed:.2f}s ({n / elapsed:,.0f} articles/s, batches of {batch_size:,})")
+    print(f"  event type agreement {correct_events / n:.3f}, sentiment agreement {correct_sentiments / n:.3f}")
+    for (expected, predicted), count in sorted(confusion.items(), key=lambda item: -item[1])[:5]:
+        print(f"  {expected} tagged {predicted}: {count:,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tag news articles with event type and sentiment")
+    parser.add_argument("--tag", action="store_true", help="Tag articles added since the last run")
+    parser.add_argument("--retag", action="store_true", help="Tag every article again")
+    parser.add_argument("--model-path", default=DEFAULT_MODEL_PATH,
+                        help="Trained model to use, or to write with --train (default: .cache/tagging_model.npz)")
+    parser.add_argument("--train", metavar="JSONL", help="Refine the lexicon model on labeled articles")
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--benchmark", type=int, metavar="N", help="Time tagging N synthetic articles")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark, args.batch_size)
+        return 0
+    if args.train:
+        tagger = NewsTagger()
+        articles = read_labeled(args.train)
+        for epoch, (event_errors, sentiment_errors) in enumerate(tagger.fit(articles, args.epochs), 1):
+            print(f"Epoch {epoch}: {event_errors} event and {sentiment_errors} sentiment errors "
+                  f"on {len(articles)} articles")
+        tagger.save(args.model_path)
+        print(f"Saved model to {args.model_path}")
+        return 0
+    if not (args.tag or args.retag):
+        parser.error("nothing to do (use --tag, --retag, --train or --benchmark)")
+
+    from main import SessionLocal
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        stats = tag_news(db, load_tagger(args.model_path), retag=args.retag, batch_size=args.batch_size)
+    finally:
+        db.close()
+    articles = stats.pop("articles")
+    counts = ", ".join(f"{event} {count}" for event, count in sorted(stats.items(), key=lambda item: -item[1]))
+    print(f"Tagged {articles} articles in {time.perf_counter() - start:.2f}s" + (f": {counts}" if counts else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
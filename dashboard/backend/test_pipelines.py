@@ -0,0 +1,119 @@
+"""
+Batch pipeline stages against a real SQLite file.
+
+Each stage reads news in batches and commits after every batch; these runs
+span several batches so a read cursor left open across a commit shows up as
+"database is locked".
+
+Usage:
+    python -m pytest test_pipelines.py
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'pipelines.db')}"
+
+import main  # noqa: E402
+from sqlalchemy import delete, func, insert, select, update  # noqa: E402
+
+N_COMPANIES = 50
+N_NEWS = 3000
+BATCH_SIZE = 500
+
+
+@pytest.fixture
+def db():
+    with main.engine.begin() as conn:
+        for table in reversed(main.Base.metadata.sorted_tables):
+            conn.execute(delete(table))
+        conn.execute(insert(main.Company), [
+            {"id": i + 1, "name": f"Acme {i} Labs", "industry_segment": "AI", "technical_employees_pct": 50.0}
+            for i in range(N_COMPANIES)
+        ])
+        now = datetime.now()
+        conn.execute(insert(main.News), [
+            {"id": i + 1, "headline": f"Acme {i % N_COMPANIES} Labs raises ${i + 1}M Series A",
+             "content": "The round was led by Sequoia Capital.",
+             "published_at": now - timedelta(days=i)}
+            for i in range(N_NEWS)
+        ])
+    session = main.SessionLocal()
+    yield session
+    session.close()
+
+
+def _watermark(db, stage):
+    return db.get(main.PipelineState, stage).watermark
+
+
+def test_link_news_several_batches(db):
+    from entity_linking import STAGE, link_news
+
+    stats = link_news(db, batch_size=BATCH_SIZE)
+    assert stats["articles"] == N_NEWS
+    assert stats["assigned"] == N_NEWS
+    assert db.execute(select(func.count()).select_from(main.NewsCompany)).scalar() == N_NEWS
+    assert _watermark(db, STAGE) == N_NEWS
+    assert link_news(db, batch_size=BATCH_SIZE)["articles"] == 0
+
+
+def test_tag_news_several_batches(db):
+    from tagging import STAGE, tag_news
+
+    stats = tag_news(db, batch_size=BATCH_SIZE)
+    assert stats["articles"] == N_NEWS
+    assert stats.get("funding") == N_NEWS
+    assert _watermark(db, STAGE) == N_NEWS
+    assert db.execute(select(func.count()).where(main.News.event_type.is_(None))).scalar() == 0
+    assert tag_news(db, batch_size=BATCH_SIZE)["articles"] == 0
+
+
+def test_extract_investments_several_batches(db):
+    from funding_extraction import STAGE, extract_investments
+
+    db.execute(update(main.News).values(company_id=(main.News.id - 1) % N_COMPANIES + 1))
+    db.commit()
+    stats = extract_investments(db, batch_size=BATCH_SIZE)
+    assert stats["articles"] == stats["rounds"] == N_NEWS
+    assert stats["inserted"] + stats["duplicates"] == N_NEWS
+    assert db.execute(select(func.count()).select_from(main.Investment)).scalar() == stats["inserted"]
+    assert _watermark(db, STAGE) == N_NEWS
+
+    rescan = extract_investments(db, rescan=True, batch_size=BATCH_SIZE)
+    assert rescan["inserted"] == 0 and rescan["duplicates"] == N_NEWS
+
+
+def test_backfill_summaries_several_batches(db, monkeypatch):
+    import summaries
+    from summaries import backfill_summaries
+
+    # An interrupted run keeps the batches it committed
+    summarize_article = summaries.summarize_article
+
+    def fail_in_third_batch(headline, content, company):
+        if f"${2 * BATCH_SIZE + 1}M" in headline:
+            raise RuntimeError("interrupted")
+        return summarize_article(headline, content, company)
+
+    monkeypatch.setattr(summaries, "summarize_article", fail_in_third_batch)
+    with pytest.raises(RuntimeError):
+        backfill_summaries(db, batch_size=BATCH_SIZE)
+    db.rollback()
+    assert db.execute(select(func.count()).select_from(main.NewsSummary)).scalar() == 2 * BATCH_SIZE
+    monkeypatch.undo()
+
+    stats = backfill_summaries(db, batch_size=BATCH_SIZE)
+    assert stats == {"summarized": N_NEWS - 2 * BATCH_SIZE, "stale": 0, "current": 0}
+    assert db.execute(select(func.count()).select_from(main.NewsSummary)).scalar() == N_NEWS
+    assert backfill_summaries(db, batch_size=BATCH_SIZE)["summarized"] == 0
+
+    db.execute(update(main.News).where(main.News.id <= BATCH_SIZE).values(content="The round was led by a16z."))
+    db.commit()
+    refresh = backfill_summaries(db, refresh=True, batch_size=BATCH_SIZE)
+    assert refresh == {"summarized": BATCH_SIZE, "stale": BATCH_SIZE, "current": N_NEWS - BATCH_SIZE}
+    assert db.execute(select(func.count()).select_from(main.NewsSummary)).scalar() == N_NEWS
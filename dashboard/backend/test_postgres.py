@@ -0,0 +1,115 @@
+"""
+Postgres-only schema and fixture loading against a throwaway server.
+
+A cluster is created with initdb in a temporary directory and started with
+pg_ctl on a private Unix socket. The tests skip when the Postgres server
+binaries or psycopg2 are not available, and when running as root (initdb
+refuses to).
+
+Usage:
+    python -m pytest test_postgres.py
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+
+import pytest
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'postgres.db')}"
+
+import main  # noqa: E402
+from fixtures import generate_fixture, load_fixture  # noqa: E402
+from sqlalchemy import create_engine, func, select, text  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+N_COMPANIES = 200
+
+
+def _pg_bin(name):
+    path = shutil.which(name)
+    if path:
+        return path
+    try:
+        bindir = subprocess.run(["pg_config", "--bindir"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    path = os.path.join(bindir, name)
+    return path if os.access(path, os.X_OK) else None
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    pytest.importorskip("psycopg2")
+    initdb, pg_ctl = _pg_bin("initdb"), _pg_bin("pg_ctl")
+    if not (initdb and pg_ctl):
+        pytest.skip("initdb/pg_ctl not found")
+    if hasattr(os, "geteuid") and os.geteuid() == 0:
+        pytest.skip("initdb cannot run as root")
+
+    root = tmp_path_factory.mktemp("postgres")
+    data, socket_dir = root / "data", root / "socket"
+    socket_dir.mkdir()
+    subprocess.run([initdb, "-D", str(data), "-U", "postgres", "-A", "trust", "--no-sync"],
+                   check=True, capture_output=True)
+    subprocess.run([pg_ctl, "-D", str(data), "-l", str(root / "server.log"), "-w",
+                    "-o", f"-c listen_addresses='' -k {socket_dir} -F", "start"],
+                   check=True, capture_output=True)
+    engine = create_engine(f"postgresql+psycopg2://postgres@/postgres?host={socket_dir}")
+    try:
+        with engine.connect() as conn:
+            if not conn.execute(text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).first():
+                pytest.skip("pg_trgm extension not installed")
+        main.Base.metadata.create_all(bind=engine)
+        yield engine
+    finally:
+        engine.dispose()
+        subprocess.run([pg_ctl, "-D", str(data), "-m", "immediate", "-w", "stop"], capture_output=True)
+
+
+@pytest.fixture(scope="module")
+def loaded(engine):
+    fixture = generate_fixture(N_COMPANIES, seed=1)
+    with engine.begin() as conn:
+        counts = load_fixture(conn, main.Base.metadata, fixture, batch_size=64)
+    return fixture, counts
+
+
+def test_create_all_adds_postgres_indexes(engine):
+    with engine.connect() as conn:
+        indexes = dict(conn.execute(text(
+            "SELECT indexname, indexdef FROM pg_indexes WHERE tablename IN ('companies', 'news')"
+        )).all())
+    assert "USING gin" in indexes["ix_companies_name_trgm"]
+    assert "gin_trgm_ops" in indexes["ix_companies_name_trgm"]
+    assert "USING brin" in indexes["ix_news_published_at_brin"]
+
+
+def test_load_fixture_copies_every_row(engine, loaded):
+    fixture, counts = loaded
+    assert counts == {name: len(spec["rows"]) for name, spec in fixture.items()}
+    with engine.connect() as conn:
+        for name, spec in fixture.items():
+            table = main.Base.metadata.tables[name]
+            assert conn.execute(select(func.count()).select_from(table)).scalar() == len(spec["rows"])
+
+        # NULLs, booleans and relative dates survive the CSV round trip
+        columns = fixture["companies"]["columns"]
+        expected_nulls = sum(row[columns.index("partner_tier")] is None for row in fixture["companies"]["rows"])
+        expected_native = sum(row[columns.index("ai_native")] for row in fixture["companies"]["rows"])
+        assert conn.execute(
+            select(func.count()).where(main.Company.partner_tier.is_(None))
+        ).scalar() == expected_nulls
+        assert conn.execute(select(func.count()).where(main.Company.ai_native.is_(True))).scalar() == expected_native
+        assert conn.execute(select(func.count()).where(main.News.published_at.is_(None))).scalar() == 0
+
+
+def test_load_fixture_syncs_sequences(engine, loaded):
+    with Session(engine) as db:
+        company = main.Company(name="Sequence Check", industry_segment="AI")
+        db.add(company)
+        db.flush()
+        assert company.id == N_COMPANIES + 1
+        db.rollback()
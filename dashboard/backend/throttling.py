@@ -0,0 +1,115 @@
+"""
+Request throttling for expensive endpoints.
+
+- RateLimiter: token bucket per client key (refills at `rate` tokens/second up to `burst`)
+- SingleFlight: concurrent calls with the same key share one execution and its result
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class RateLimiter:
+    """Token-bucket rate limiter keyed per client."""
+
+    def __init__(self, rate: float, burst: int, max_clients: int = 10_000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+
+    def acquire(self, key: Hashable) -> Tuple[bool, float]:
+        """
+        Take one token for `key`.
+
+        Returns (allowed, retry_after_seconds); retry_after is 0 when allowed.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+                self.allowed += 1
+            else:
+                retry_after = (1 - tokens) / self.rate
+                self.limited += 1
+            self._buckets[key] = (tokens, now)
+            # Least recently seen clients go first; a forgotten client just starts with a full bucket
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return retry_after == 0.0, retry_after
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "tracked_clients": len(self._buckets),
+        }
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait and receive the same result (or exception). Nothing is
+    cached once the call completes.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls),
+        }
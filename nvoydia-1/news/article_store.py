@@ -0,0 +1,317 @@
+"""
+Append-only Parquet store for collected articles.
+
+Articles from every company and run share one dataset, hive-partitioned by
+publication date and company:
+
+    <root>/date=2024-01-15/company=apple_inc/part-<timestamp>-<id>.parquet
+
+Writes only ever add new part files. An article whose URL hash is already
+stored for the company is skipped, and so is a near-duplicate of a stored
+article (see dedup.py); each row keeps its MinHash signature for that check. Reads go through `pyarrow.dataset`, so
+company/date filters prune partitions and column selections skip the rest
+of each file.
+
+Usage:
+    python article_store.py import newsdata/*.json
+    python article_store.py scan --company "Apple Inc" --start 2024-01-01
+    python article_store.py compact
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from dedup import LSHIndex, article_text, minhash_signatures
+
+DEFAULT_STORE_PATH = os.path.join("newsdata", "articles")
+
+# PARTITIONING and company_slug are also imported by the dashboard's ingest (dashboard/backend/ingest.py)
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string()), ("company", pa.string())]), flavor="hive")
+
+ARTICLE_SCHEMA = pa.schema([
+    ("url_hash", pa.string()),
+    ("company_name", pa.string()),
+    ("period", pa.string()),
+    ("title", pa.string()),
+    ("description", pa.string()),
+    ("url", pa.string()),
+    ("published_at", pa.string()),
+    ("source_name", pa.string()),
+    ("source_id", pa.string()),
+    ("author", pa.string()),
+    ("url_to_image", pa.string()),
+    ("content", pa.string()),
+    ("collected_at", pa.string()),
+    ("duplicates", pa.int32()),
+    ("minhash", pa.binary()),
+])
+
+# Older part files may lack newer columns; reading through this schema fills them with nulls
+DATASET_SCHEMA = ARTICLE_SCHEMA.append(pa.field("date", pa.string())).append(pa.field("company", pa.string()))
+
+
+def company_slug(company_name: str) -> str:
+    """Partition value for a company, matching the newsdata/<company>_news.json naming."""
+    return company_name.lower().replace(' ', '_').replace('/', '_')
+
+
+def url_hash(url: str) -> str:
+    return hashlib.sha1(url.strip().encode('utf-8')).hexdigest()
+
+
+class ArticleStore:
+    """Partitioned, append-only Parquet dataset of articles."""
+
+    def __init__(self, root: str = DEFAULT_STORE_PATH):
+        """
+        Open (or create) a store.
+
+        Args:
+            root: Dataset directory
+        """
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        self._hashes: Dict[str, Set[str]] = {}
+        self._indexes: Dict[str, LSHIndex] = {}
+        self.near_duplicates = 0
+
+    def _dataset(self) -> ds.Dataset:
+        # Files starting with '.' are in-progress writes and are ignored
+        return ds.dataset(self.root, format="parquet", partitioning=PARTITIONING, schema=DATASET_SCHEMA)
+
+    def _load_company(self, slug: str) -> None:
+        """Read a company's URL hashes and signatures once; append() keeps them up to date."""
+        if slug in self._hashes:
+            return
+        table = self.scan(columns=["url_hash", "minhash", "title", "description"], company_slugs=[slug])
+        self._hashes[slug] = set(table.column("url_hash").to_pylist())
+        index = self._indexes[slug] = LSHIndex()
+        rows = table.to_pylist()
+        missing = [row for row in rows if row["minhash"] is None]
+        computed = iter(minhash_signatures([article_text(row) for row in missing]) if missing else [])
+        for row in rows:
+            signature = np.frombuffer(row["minhash"], dtype=np.uint32) if row["minhash"] is not None else next(computed)
+            index.add(signature)
+
+    def append(self, company_name: str, articles: Iterable[Dict[str, Any]],
+               period: Optional[str] = None, collected_at: Optional[str] = None) -> int:
+        """
+        Add articles for a company, skipping stored URLs and near-duplicates of stored articles.
+
+        Args:
+            company_name: Company the articles were collected for
+            articles: Articles in the collector's processed format
+            period: Collection period the articles came from
+            collected_at: Collection timestamp (defaults to now)
+
+        Returns:
+            Number of articles written
+        """
+        slug = company_slug(company_name)
+        self._load_company(slug)
+        known = self._hashes[slug]
+        index = self._indexes[slug]
+        collected_at = collected_at or datetime.now().isoformat()
+
+        fresh = []
+        for article in articles:
+            key = url_hash(article['url']) if article.get('url') else None
+            if key is not None and key not in known:
+                known.add(key)
+                fresh.append((key, article))
+        signatures = minhash_signatures([article_text(article) for _, article in fresh]) if fresh else []
+
+        by_date: Dict[str, List[Dict[str, Any]]] = {}
+        for (key, article), signature in zip(fresh, signatures):
+            if index.find(signature) is not None:
+                self.near_duplicates += 1
+                continue
+            index.add(signature)
+            source = article.get('source') or {}
+            published_at = article.get('published_at') or ''
+            by_date.setdefault(published_at[:10] or 'unknown', []).append({
+                'url_hash': key,
+                'company_name': company_name,
+                'period': period,
+                'title': article.get('title'),
+                'description': article.get('description'),
+                'url': article['url'],
+                'published_at': published_at,
+                'source_name': source.get('name'),
+                'source_id': source.get('id'),
+                'author': article.get('author'),
+                'url_to_image': article.get('url_to_image'),
+                'content': article.get('content'),
+                'collected_at': collected_at,
+                'duplicates': article.get('duplicates', 0),
+                'minhash': signature.tobytes(),
+            })
+
+        for date, rows in by_date.items():
+            self._write_part(date, slug, pa.Table.from_pylist(rows, schema=ARTICLE_SCHEMA))
+        return sum(len(rows) for rows in by_date.values())
+
+    def append_results(self, results: Dict[str, Any]) -> int:
+        """Add every article from a collector results dictionary. Returns the number written."""
+        written = 0
+        for period_name, period_data in results['periods'].items():
+            written += self.append(results['company_name'], period_data.get('articles', []),
+                                   period=period_name, collected_at=results.get('collected_at'))
+        return written
+
+    def _write_part(self, date: str, slug: str, table: pa.Table) -> None:
+        """Write one new part file, renaming it into place once complete."""
+        directory = os.path.join(self.root, f"date={date}", f"company={slug}")
+        os.makedirs(directory, exist_ok=True)
+        name = f"part-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp_path = os.path.join(directory, f".{name}.tmp")
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, os.path.join(directory, name))
+
+    def scan(self, columns: Optional[List[str]] = None, company: Optional[str] = None,
+             start: Optional[str] = None, end: Optional[str] = None,
+             company_slugs: Optional[List[str]] = None,
+             where: Optional[ds.Expression] = None) -> pa.Table:
+        """
+        Read articles, pushing company and date predicates down to the partitions.
+
+        Args:
+            columns: Columns to read (default: all, plus the partition columns)
+            company: Only this company
+            start: Earliest publication date, YYYY-MM-DD (inclusive)
+            end: Latest publication date, YYYY-MM-DD (inclusive)
+            company_slugs: Only these partition values (alternative to `company`)
+            where: Extra dataset expression, e.g. ds.field('source_name') == 'Reuters'
+
+        Returns:
+            Arrow table of the matching articles
+        """
+        if not any(name.startswith("date=") for name in os.listdir(self.root)):
+            empty = DATASET_SCHEMA.empty_table()
+            return empty.select(columns) if columns else empty
+
+        expression = where
+        if company is not None:
+            company_slugs = [company_slug(company)]
+
+        def conjoin(term):
+            nonlocal expression
+            expression = term if expression is None else expression & term
+
+        if company_slugs is not None:
+            conjoin(ds.field("company").isin(company_slugs))
+        if start:
+            conjoin(ds.field("date") >= start)
+        if end:
+            conjoin(ds.field("date") <= end)
+        return self._dataset().to_table(columns=columns, filter=expression)
+
+    def high_water_mark(self, company_name: str) -> Optional[str]:
+        """Newest stored publishedAt for a company, for incremental collection."""
+        table = self.scan(columns=["published_at"], company=company_name)
+        if table.num_rows == 0:
+            return None
+        return pc.max(table.column("published_at")).as_py() or None
+
+    def to_results(self, company_name: str, start: Optional[str] = None,
+                   end: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Rebuild a collector-style results dictionary from the store.
+
+        Articles are grouped by the period they were collected under and sorted
+        newest first, so existing consumers of the JSON files can read the store.
+        """
+        table = self.scan(company=company_name, start=start, end=end)
+        periods: Dict[str, Dict[str, Any]] = {}
+        for row in sorted(table.to_pylist(), key=lambda r: r['published_at'] or '', reverse=True):
+            period = periods.setdefault(row['period'] or 'unknown', {'articles': []})
+            period['articles'].append({
+                'title': row['title'],
+                'description': row['description'],
+                'url': row['url'],
+                'published_at': row['published_at'],
+                'source': {'name': row['source_name'], 'id': row['source_id']},
+                'author': row['author'],
+                'url_to_image': row['url_to_image'],
+                'content': row['content'],
+                'duplicates': row['duplicates'] or 0,
+            })
+        for period in periods.values():
+            period['articles_collected'] = len(period['articles'])
+        return {
+            'company_name': company_name,
+            'collected_at': max(table.column('collected_at').to_pylist()) if table.num_rows else None,
+            'periods': periods
+        }
+
+    def compact(self) -> int:
+        """
+        Merge the part files of each partition into one.
+
+        Returns:
+            Number of partitions rewritten
+        """
+        rewritten = 0
+        for directory in glob.glob(os.path.join(self.root, "date=*", "company=*")):
+            parts = sorted(glob.glob(os.path.join(directory, "part-*.parquet")))
+            if len(parts) < 2:
+                continue
+            table = ds.dataset(parts, format="parquet", schema=ARTICLE_SCHEMA).to_table()
+            date = os.path.basename(os.path.dirname(directory))[len("date="):]
+            slug = os.path.basename(directory)[len("company="):]
+            self._write_part(date, slug, table)
+            for part in parts:
+                os.remove(part)
+            rewritten += 1
+        return rewritten
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the partitioned article store")
+    parser.add_argument('--store', default=DEFAULT_STORE_PATH, help=f'Store directory (default: {DEFAULT_STORE_PATH})')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    imp = sub.add_parser('import', help='Import collector JSON result files')
+    imp.add_argument('paths', nargs='+')
+
+    scan = sub.add_parser('scan', help='Count and preview stored articles')
+    scan.add_argument('--company')
+    scan.add_argument('--start', help='YYYY-MM-DD')
+    scan.add_argument('--end', help='YYYY-MM-DD')
+    scan.add_argument('--limit', type=int, default=10)
+
+    sub.add_parser('compact', help='Merge part files within each partition')
+
+    args = parser.parse_args()
+    store = ArticleStore(args.store)
+
+    if args.command == 'import':
+        for path in args.paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                results = json.load(f)
+            print(f"{path}: {store.append_results(results)} new articles")
+    elif args.command == 'scan':
+        table = store.scan(columns=['published_at', 'company_name', 'source_name', 'title'],
+                           company=args.company, start=args.start, end=args.end)
+        print(f"{table.num_rows} articles")
+        for row in table.slice(0, args.limit).to_pylist():
+            print(f"  {row['published_at']}  {row['company_name']:20.20s}  {row['source_name'] or '':15.15s}  {row['title']}")
+    elif args.command == 'compact':
+        print(f"Compacted {store.compact()} partitions")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
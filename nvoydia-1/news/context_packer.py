@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Token-budgeted packing of a period's articles into summarizer prompts.
+
+A busy period can hold far more text than fits in (or is worth sending to)
+the model, so each period's articles are packed before summarizing:
+
+1. Near-duplicates are collapsed (dedup.py), so syndicated copies of one
+   story are sent once.
+2. The rest are ordered by local relevance (ranking.py), best first.
+3. Each article's text is capped at `max_article_tokens`.
+4. Articles are packed greedily into chunks of at most `budget` tokens, up
+   to `max_chunks` chunks; whatever ranks below that is dropped.
+
+One chunk is summarized with a single call. More than one is map-reduced by
+the summarizer: each chunk is summarized on its own, then the partial
+summaries are merged.
+
+Tokens are counted with tiktoken when it is installed, otherwise estimated
+at about 4 characters per token.
+
+Usage:
+    python context_packer.py newsdata/apple_news.json --company "Apple" --budget 1500
+"""
+
+import argparse
+import json
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+
+from dedup import DEFAULT_THRESHOLD, dedupe_articles
+from ranking import ArticleRanker
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken is optional; a character-count estimate is the fallback
+    tiktoken = None
+
+DEFAULT_WINDOW_BUDGET = 3000
+DEFAULT_MAX_CHUNKS = 4
+DEFAULT_MAX_ARTICLE_TOKENS = 400
+
+# Chars per token for the estimate when tiktoken is not installed
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: Optional[str]):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("cl100k_base")
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Token count of `text` for `model` (estimated when tiktoken is not installed)."""
+    encoding = _encoding(model)
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """`text` cut to at most `max_tokens` tokens, at a word boundary where possible."""
+    encoding = _encoding(model)
+    if encoding is None:
+        limit = max_tokens * CHARS_PER_TOKEN
+        if len(text) <= limit:
+            return text
+        cut = text[:limit]
+        return cut[:cut.rfind(" ")] if " " in cut else cut
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+
+def article_context(article: Dict[str, Any]) -> str:
+    """An article's title, description and content as one prompt paragraph."""
+    title = str(article.get("title") or "").strip()
+    if title and title[-1] not in ".!?":
+        # Headlines have no final stop; keep them from running into the description
+        title += "."
+    parts = [title, article.get("description") or "", article.get("content") or ""]
+    return " ".join(str(part) for part in parts if part).strip()
+
+
+class WindowPack:
+    """The packed prompt context of one period."""
+
+    __slots__ = ("chunks", "articles_in", "articles_selected", "articles_used", "tokens")
+
+    def __init__(self, chunks: List[str], articles_in: int, articles_selected: int, articles_used: int, tokens: int):
+        self.chunks = chunks
+        # Articles passed in, left after dedup, and packed into the chunks
+        self.articles_in = articles_in
+        self.articles_selected = articles_selected
+        self.articles_used = articles_used
+        self.tokens = tokens
+
+    @property
+    def empty(self) -> bool:
+        return not self.chunks
+
+
+class ContextPacker:
+    """Dedups, ranks and packs articles into token-budgeted chunks."""
+
+    def __init__(self, model: Optional[str] = None, budget: int = DEFAULT_WINDOW_BUDGET,
+                 max_chunks: int = DEFAULT_MAX_CHUNKS, max_article_tokens: int = DEFAULT_MAX_ARTICLE_TOKENS,
+                 dedupe_threshold: Optional[float] = DEFAULT_THRESHOLD, ranker: Optional[ArticleRanker] = None,
+                 rank: bool = True):
+        """
+        Args:
+            model: Model whose tokenizer counts tokens
+            budget: Article tokens per chunk, i.e. per chat call
+            max_chunks: Chunks per period before lower-ranked articles are dropped
+            max_article_tokens: Cap on a single article's text
+            dedupe_threshold: Near-duplicate threshold (None keeps duplicates)
+            ranker: Relevance ranker (default: ArticleRanker())
+            rank: Order articles by relevance (otherwise they keep their input order)
+        """
+        self.model = model
+        self.budget = budget
+        self.max_chunks = max_chunks
+        self.max_article_tokens = min(max_article_tokens, budget)
+        self.dedupe_threshold = dedupe_threshold
+        self.ranker = ranker or ArticleRanker()
+        self.rank = rank
+
+    def signature(self) -> str:
+        """Packing settings, for cache keys: a change in any of them changes the prompt."""
+        return f"budget={self.budget},chunks={self.max_chunks},article={self.max_article_tokens}," \
+               f"dedupe={self.dedupe_threshold},rank={self.rank}"
+
+    def select(self, company: str, articles: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Deduplicated articles, most relevant first when ranking."""
+        articles = [article for article in articles if article_context(article)]
+        if self.dedupe_threshold is not None:
+            articles = dedupe_articles(articles, self.dedupe_threshold)
+        if self.rank and len(articles) > 1:
+            articles = self.ranker.top_n(articles, company, len(articles))
+        return articles
+
+    def pack(self, company: str, articles: Sequence[Dict[str, Any]]) -> WindowPack:
+        """
+        Pack one period's articles.
+
+        Returns:
+            WindowPack whose chunks each fit in the budget; no chunks if the
+            period has no article text
+        """
+        chunks: List[List[str]] = []
+        chunk_tokens = 0
+        used = tokens = 0
+        selected = self.select(company, articles)
+        for article in selected:
+            text = truncate_tokens(article_context(article), self.max_article_tokens, self.model)
+            size = count_tokens(text, self.model)
+            if not chunks or chunk_tokens + size > self.budget:
+                if len(chunks) == self.max_chunks:
+                    break
+                chunks.append([])
+                chunk_tokens = 0
+            chunks[-1].append(text)
+            chunk_tokens += size
+            used += 1
+            tokens += size
+        return WindowPack(["\n\n".join(chunk) for chunk in chunks], len(articles), len(selected), used, tokens)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show how each period's articles are packed for the summarizer")
+    parser.add_argument('path', help='Collector JSON result file')
+    parser.add_argument('--company', help='Company name for relevance ranking (default: from the file)')
+    parser.add_argument('--model', help='Model whose tokenizer to use')
+    parser.add_argument('--budget', type=int, default=DEFAULT_WINDOW_BUDGET,
+                        help=f'Article tokens per call (default: {DEFAULT_WINDOW_BUDGET})')
+    parser.add_argument('--max-chunks', type=int, default=DEFAULT_MAX_CHUNKS,
+                        help=f'Calls per period before articles are dropped (default: {DEFAULT_MAX_CHUNKS})')
+    args = parser.parse_args()
+
+    with open(args.path, 'r', encoding='utf-8') as f:
+        results = json.load(f)
+    company = args.company or results['company_name']
+    packer = ContextPacker(args.model, budget=args.budget, max_chunks=args.max_chunks)
+    print(f"Tokenizer: {'tiktoken' if tiktoken is not None else f'~{CHARS_PER_TOKEN} chars per token'}")
+    for period_name, period_data in results['periods'].items():
+        articles = period_data.get('articles') or []
+        pack = packer.pack(company, articles)
+        raw = sum(count_tokens(article_context(article), args.model) for article in articles)
+        print(f"{period_name}: {pack.articles_used} of {pack.articles_in} articles "
+              f"({pack.articles_selected} after dedup), {raw} -> {pack.tokens} tokens in {len(pack.chunks)} chunk(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
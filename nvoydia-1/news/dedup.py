@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection for syndicated news articles.
+
+Each article's title and description are reduced to a set of word and
+word-pair shingles and summarized by a MinHash signature. The fraction of
+equal signature slots estimates the Jaccard similarity of two shingle sets.
+Signatures are split into LSH bands, so only articles that agree on a whole
+band are ever compared. Detection cost therefore grows with the number of
+near-duplicates rather than with the number of article pairs. Matches are
+joined transitively into clusters with union-find.
+
+Usage:
+    python dedup.py newsdata/apple_news.json
+    python dedup.py newsdata/*.json --threshold 0.6 --write
+"""
+
+import argparse
+import json
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 16  # 4 rows per band: pairs above ~0.5 Jaccard usually share a band
+DEFAULT_THRESHOLD = 0.7
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Multiply-shift hash family; fixed seed so signatures are stable across runs
+_rng = np.random.default_rng(20240101)
+_HASH_A = _rng.integers(1, 2 ** 63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_HASH_B = _rng.integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64)
+
+
+def article_text(article: Dict[str, Any]) -> str:
+    """Text that identifies a story: title and description."""
+    return f"{article.get('title') or ''} {article.get('description') or ''}"
+
+
+def shingles(text: str) -> set:
+    """Words and adjacent word pairs of a text, lowercased."""
+    words = TOKEN_RE.findall(text.lower())
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def minhash_signatures(texts: Sequence[str], chunk_size: int = 512) -> np.ndarray:
+    """
+    MinHash signatures for many texts at once.
+
+    Returns:
+        uint32 array of shape (len(texts), NUM_PERM)
+    """
+    token_hashes: List[int] = []
+    counts = []
+    for text in texts:
+        tokens = shingles(text) or {""}
+        token_hashes.extend(zlib.crc32(token.encode('utf-8')) for token in tokens)
+        counts.append(len(tokens))
+
+    hashes = np.array(token_hashes, dtype=np.uint64)
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    signatures = np.empty((len(texts), NUM_PERM), dtype=np.uint32)
+    for start in range(0, len(texts), chunk_size):
+        stop = min(start + chunk_size, len(texts))
+        chunk = hashes[offsets[start]:offsets[stop]]
+        with np.errstate(over='ignore'):
+            values = chunk[:, None] * _HASH_A
+            values += _HASH_B
+        values >>= np.uint64(32)
+        signatures[start:stop] = np.minimum.reduceat(values, offsets[start:stop] - offsets[start], axis=0)
+    return signatures
+
+
+def band_keys(signatures: np.ndarray) -> np.ndarray:
+    """
+    One 64-bit key per LSH band of each signature.
+
+    Returns:
+        uint64 array of shape (len(signatures), BANDS)
+    """
+    rows = signatures.reshape(len(signatures), BANDS, NUM_PERM // BANDS).astype(np.uint64)
+    with np.errstate(over='ignore'):
+        return (rows * _HASH_A[:rows.shape[2]]).sum(axis=2, dtype=np.uint64)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+class LSHIndex:
+    """Banded LSH index over MinHash signatures."""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        """
+        Args:
+            threshold: Estimated Jaccard similarity at which two articles are duplicates
+        """
+        self.threshold = threshold
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(BANDS)]
+        self.signatures: List[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def _keys(self, signature: np.ndarray, keys: Optional[Sequence[int]]) -> Sequence[int]:
+        return keys if keys is not None else band_keys(signature[None, :])[0].tolist()
+
+    def candidates(self, signature: np.ndarray, keys: Optional[Sequence[int]] = None) -> List[int]:
+        """
+        Ids of indexed signatures at or above the threshold.
+
+        Args:
+            signature: MinHash signature
+            keys: Its band keys, if already computed in bulk with band_keys()
+        """
+        seen = set()
+        matches = []
+        for band, key in enumerate(self._keys(signature, keys)):
+            for item in self._buckets[band].get(key, ()):
+                if item in seen:
+                    continue
+                seen.add(item)
+                if similarity(signature, self.signatures[item]) >= self.threshold:
+                    matches.append(item)
+        return matches
+
+    def find(self, signature: np.ndarray, keys: Optional[Sequence[int]] = None) -> Optional[int]:
+        """Id of the first indexed near-duplicate, or None."""
+        matches = self.candidates(signature, keys)
+        return min(matches) if matches else None
+
+    def add(self, signature: np.ndarray, keys: Optional[Sequence[int]] = None) -> int:
+        """Index a signature and return its id."""
+        item = len(self.signatures)
+        self.signatures.append(signature)
+        for band, key in enumerate(self._keys(signature, keys)):
+            self._buckets[band].setdefault(key, []).append(item)
+        return item
+
+
+def cluster_signatures(signatures: np.ndarray, threshold: float = DEFAULT_THRESHOLD) -> List[List[int]]:
+    """
+    Group signatures into clusters of near-duplicates (transitively).
+
+    Returns:
+        Lists of row positions, one list per cluster
+    """
+    index = LSHIndex(threshold)
+    parent = list(range(len(signatures)))
+
+    def root(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    all_keys = band_keys(signatures).tolist()
+    for i, (signature, keys) in enumerate(zip(signatures, all_keys)):
+        for j in index.candidates(signature, keys):
+            a, b = root(i), root(j)
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+        index.add(signature, keys)
+
+    clusters: Dict[int, List[int]] = {}
+    for i in range(len(signatures)):
+        clusters.setdefault(root(i), []).append(i)
+    return list(clusters.values())
+
+
+def _canonical(articles: List[Dict[str, Any]], members: List[int]) -> int:
+    """The earliest published copy; ties go to the one with the most text."""
+    return min(members, key=lambda i: (articles[i].get('published_at') or '9999',
+                                       -len(articles[i].get('content') or '') - len(articles[i].get('description') or '')))
+
+
+def canonical_positions(articles: List[Dict[str, Any]],
+                        threshold: float = DEFAULT_THRESHOLD) -> Dict[int, int]:
+    """
+    Cluster articles and pick one canonical copy per cluster.
+
+    Returns:
+        Position of each canonical article -> number of copies it absorbed
+        (including copies absorbed by earlier deduplication)
+    """
+    if not articles:
+        return {}
+    signatures = minhash_signatures([article_text(article) for article in articles])
+    keep = {}
+    for members in cluster_signatures(signatures, threshold):
+        canonical = _canonical(articles, members)
+        keep[canonical] = len(members) - 1 + sum(articles[i].get('duplicates', 0) for i in members)
+    return keep
+
+
+def dedupe_articles(articles: List[Dict[str, Any]],
+                    threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Collapse near-duplicate articles.
+
+    Args:
+        articles: Articles in the collector's processed format
+        threshold: Estimated Jaccard similarity at which two articles are duplicates
+
+    Returns:
+        One canonical article per cluster, in input order, each with a
+        `duplicates` count of the copies it absorbed
+    """
+    keep = canonical_positions(articles, threshold)
+    return [dict(articles[i], duplicates=keep[i]) for i in sorted(keep)]
+
+
+def dedupe_results(results: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> int:
+    """
+    Collapse near-duplicates across all periods of a results dictionary, in place.
+
+    The canonical copy stays in its own period and the others are dropped.
+
+    Returns:
+        Number of articles removed
+    """
+    located = [(period_data, article)
+               for period_data in results['periods'].values()
+               for article in period_data.get('articles', [])]
+    keep = canonical_positions([article for _, article in located], threshold)
+
+    for period_data in results['periods'].values():
+        if 'articles' in period_data:
+            period_data['articles'] = []
+    for position, (period_data, article) in enumerate(located):
+        if position in keep:
+            article['duplicates'] = keep[position]
+            period_data['articles'].append(article)
+    for period_data in results['periods'].values():
+        if 'articles' in period_data:
+            period_data['articles_collected'] = len(period_data['articles'])
+    return len(located) - len(keep)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report (and optionally remove) near-duplicate articles")
+    parser.add_argument('paths', nargs='+', help='Collector JSON result files')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Estimated Jaccard similarity that counts as a duplicate (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--write', action='store_true', help='Rewrite the files without the duplicates')
+    args = parser.parse_args()
+
+    for path in args.paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            results = json.load(f)
+        total = sum(len(p.get('articles', [])) for p in results['periods'].values())
+        removed = dedupe_results(results, args.threshold)
+        print(f"{path}: {removed} of {total} articles are near-duplicates")
+        if args.write and removed:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
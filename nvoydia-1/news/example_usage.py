@@ -3,10 +3,52 @@
 Example usage of the CompanyNewsCollector
 
 This script demonstrates how to use the CompanyNewsCollector class programmatically.
+All company x period requests run concurrently; each company is saved as soon as
+its last period arrives. Runs are incremental: only articles newer than those
+already in the article store (newsdata/articles) are fetched and appended to it.
 """
 
-from top_n_news import CompanyNewsCollector
-import os
+from top_n_news import CompanyNewsCollector, TIME_PERIODS
+from article_store import ArticleStore
+from dedup import dedupe_results
+from ranking import rank_results
+import asyncio
+from datetime import datetime, timedelta
+
+
+def save_company(store, results):
+    """Append one company's new articles to the article store."""
+    added = store.append_results(results)
+    print(f"{results['company_name']}: {added} new articles")
+
+
+async def collect(collector, store, companies):
+    """Stream results in as they arrive and save each finished company."""
+    pending = {company: collector.new_results(company) for company in companies}
+    since = {company: store.high_water_mark(company) for company in companies}
+    
+    async for company, period_name, period_data in collector.collect_many(
+        companies,
+        max_articles_per_period=20,  # Limit to 20 articles per period for demo
+        concurrency=8,
+        since=since,
+        batch_queries=True  # One OR query per period for all companies, split back locally
+    ):
+        print(f"{company} / {period_name.replace('_', ' ')}: {collector.describe_period(period_data)}")
+        
+        results = pending[company]
+        results['periods'][period_name] = period_data
+        if len(results['periods']) == len(TIME_PERIODS):
+            # Keep the usual period order in the saved files
+            results['periods'] = {name: results['periods'][name] for name in TIME_PERIODS}
+            # Syndicated copies show up across periods; keep one canonical article each
+            dedupe_results(results)
+            # Keep the 10 most relevant of the 20 fetched per period
+            rank_results(results, 10)
+            print(collector.create_summary_report(results))
+            save_company(store, results)
+            del pending[company]
+
 
 def main():
     """Example usage of the news collector."""
@@ -23,36 +65,14 @@ def main():
     # Example companies to search
     companies = ["apple", "palantir", "amazon"]
     
-    for company in companies:
-        print(f"\n{'='*60}")
-        print(f"Collecting news for: {company}")
-        print(f"{'='*60}")
-        
-        # Collect news for different time periods
-        results = collector.collect_news(
-            company_name=company,
-            max_articles_per_period=20  # Limit to 20 articles per period for demo
-        )
-        
-        # Print summary
-        summary = collector.create_summary_report(results)
-        print(summary)
-        
-        # Create newsdata directory if it doesn't exist
-        import os
-        os.makedirs("newsdata", exist_ok=True)
-        
-        # Save results to JSON file in newsdata folder
-        output_file = f"newsdata/{company.lower().replace(' ', '_')}_news.json"
-        collector.save_results(results, output_file)
-        
-        # Also save to CSV for easy analysis
-        csv_file = f"newsdata/{company.lower().replace(' ', '_')}_news.csv"
-        collector.export_to_csv(results, csv_file)
-        
-        print(f"\nFiles saved to newsdata folder:")
-        print(f"  - JSON: {output_file}")
-        print(f"  - CSV: {csv_file}")
+    store = ArticleStore("newsdata/articles")
+    asyncio.run(collect(collector, store, companies))
+    
+    # Read back one company's last month without loading the rest of the store
+    recent = store.scan(columns=['published_at', 'title'], company="apple",
+                        start=(datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d'))
+    print(f"apple: {recent.num_rows} stored articles from the last 30 days")
+
 
 if __name__ == "__main__":
     main()
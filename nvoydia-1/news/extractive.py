@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Offline extractive summaries: pick a period's key sentences without an LLM.
+
+For bulk backfills where a chat call per period is too slow or expensive.
+Each period's text is split into sentences and scored by sentence_scoring.py
+on TextRank centrality, similarity to the period's centroid, financial
+figures (which the LLM prompt also asks to prioritize) and mentions of the
+company. The best sentences are taken greedily, skipping near-repeats of
+sentences already chosen or quoted in the previous summaries. Everything is
+a few small NumPy operations per period, so thousands of periods a second
+run on one CPU core.
+
+ExtractiveSummarizer is a drop-in Summarizer, so packing, caching and
+scheduling work exactly as for the LLM.
+
+Usage:
+    python summarizer.py palantir apple --extractive
+    python extractive.py --benchmark 10000
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from context_packer import DEFAULT_MAX_CHUNKS, DEFAULT_WINDOW_BUDGET, ContextPacker, WindowPack
+from news_cache import DiskCache, summary_cache_key
+from sentence_scoring import DEFAULT_MAX_SENTENCES, DEFAULT_WEIGHTS, select_sentences, split_sentences
+from summarizer import NO_ARTICLES, Summarizer, previous_context
+
+EXTRACTIVE_MODEL = "extractive"
+
+
+def summarize_text(text: str, company: Optional[str] = None, previous: Iterable[str] = (),
+                   max_sentences: int = DEFAULT_MAX_SENTENCES,
+                   weights: Optional[Dict[str, float]] = None) -> str:
+    """
+    Extractive summary of one period.
+
+    Args:
+        text: The period's article text, one paragraph per article
+        company: Company name; sentences mentioning it score higher
+        previous: Earlier summaries; sentences repeating them are avoided
+        max_sentences: Sentences in the summary
+        weights: Feature weights (default: DEFAULT_WEIGHTS)
+
+    Returns:
+        The chosen sentences in their original order, or NO_ARTICLES if the
+        text has no usable sentence
+    """
+    quoted = [s for summary in previous if summary != NO_ARTICLES for s in split_sentences(summary)]
+    chosen = select_sentences(split_sentences(text), company, quoted, max_sentences, weights)
+    return " ".join(chosen) if chosen else NO_ARTICLES
+
+
+class ExtractiveSummarizer(Summarizer):
+    """Summarizer that extracts sentences locally instead of calling a chat model."""
+
+    def __init__(self, max_sentences: int = DEFAULT_MAX_SENTENCES, concurrency: int = 8, max_previous: int = 2,
+                 cache: Optional[DiskCache] = None, refresh: bool = False, packer: Optional[ContextPacker] = None,
+                 parallel_windows: bool = False, weights: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            max_sentences: Sentences per summary
+            concurrency: Companies in progress at once
+            max_previous: Earlier summaries whose sentences are not repeated
+            cache: Summary cache; None disables caching
+            refresh: Ignore cached summaries but still store fresh ones
+            packer: Article packing (default: all chunks' worth of text, unranked, since
+                the sentence scoring does its own selection)
+            parallel_windows: Summarize a company's periods independently
+            weights: Sentence feature weights (default: DEFAULT_WEIGHTS)
+        """
+        packer = packer or ContextPacker(budget=DEFAULT_WINDOW_BUDGET * DEFAULT_MAX_CHUNKS, max_chunks=1,
+                                         dedupe_threshold=None, rank=False)
+        super().__init__(model=EXTRACTIVE_MODEL, concurrency=concurrency, max_previous=max_previous,
+                         cache=cache, refresh=refresh, packer=packer, parallel_windows=parallel_windows)
+        self.max_sentences = max_sentences
+        self.weights = weights
+
+    def cache_key(self, company: str, articles: List[Dict[str, Any]], previous: Dict[str, str]) -> str:
+        """Content address of a period summary: sentence count, weights, article set and previous summaries."""
+        settings = json.dumps({"max_sentences": self.max_sentences, "weights": self.weights or DEFAULT_WEIGHTS},
+                              sort_keys=True)
+        prompt = "\x1f".join([settings, company, self.packer.signature()])
+        return summary_cache_key(self.model, prompt, articles, previous_context(previous, self.max_previous))
+
+    async def summarize_pack(self, company: str, pack: WindowPack, previous: Dict[str, str]) -> str:
+        recent = list(previous.values())[-self.max_previous:] if self.max_previous else []
+        self._count(company, "calls")
+        return summarize_text("\n\n".join(pack.chunks), company, recent, self.max_sentences, self.weights)
+
+
+def benchmark(count: int) -> None:
+    """Summarize `count` synthetic periods of ten articles, directly and through ExtractiveSummarizer."""
+    from providers import from_newsapi
+    from stub_server import synthetic_articles
+    from top_n_news import TIME_PERIODS
+
+    now = datetime.now()
+    companies = {}
+    for i in range(max(1, count // len(TIME_PERIODS))):
+        company = f"Benchmark Corp {i:05d}"
+        periods = {}
+        for period_name, (start_days, end_days) in TIME_PERIODS.items():
+            from_date = (now - timedelta(days=end_days)).strftime('%Y-%m-%d')
+            to_date = (now - timedelta(days=start_days)).strftime('%Y-%m-%d')
+            raw = synthetic_articles(company, from_date, to_date, 10)
+            periods[period_name] = {"articles": [from_newsapi(article, "stub") for article in raw]}
+        companies[company] = {"company_name": company, "periods": periods}
+    windows = sum(len(data["periods"]) for data in companies.values())
+
+    summarizer = ExtractiveSummarizer()
+    texts = [(company, "\n\n".join(summarizer.packer.pack(company, period["articles"]).chunks))
+             for company, data in companies.items() for period in data["periods"].values()]
+    start = time.perf_counter()
+    for company, text in texts:
+        summarize_text(text, company)
+    elapsed = time.perf_counter() - start
+    print(f"summarize_text: {windows:,} periods in {elapsed:.2f}s ({windows / elapsed:,.0f} periods/s)")
+
+    start = time.perf_counter()
+    results = summarizer.run(companies)
+    elapsed = time.perf_counter() - start
+    print(f"ExtractiveSummarizer (packing + scheduling): {len(results):,} companies, {windows:,} periods "
+          f"in {elapsed:.2f}s ({windows / elapsed:,.0f} periods/s)")
+    company, summaries = next(iter(results.items()))
+    print(f"\n{company} / {next(iter(summaries))}:\n{next(iter(summaries.values()))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extractive period summaries without an LLM")
+    parser.add_argument('--benchmark', type=int, metavar='N', default=10000,
+                        help='Time summarizing N synthetic periods (default: 10000)')
+    args = parser.parse_args()
+    benchmark(args.benchmark)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,181 @@
+"""
+Persistent caches for NewsAPI responses and LLM summaries.
+
+Responses are stored in a single SQLite file keyed on the normalized query
+parameters (without `apiKey`). Windows that ended before today are closed and
+cached indefinitely; the rolling window that includes today gets a short TTL.
+When the cache grows past `max_bytes`, least recently used entries are evicted.
+
+Summaries use the same cache class in a separate file, keyed on their content:
+the model, the prompt, the window's normalized article set and the previous
+summaries given as context. A window is only re-summarized when one of those
+changes.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "newsapi.sqlite")
+DEFAULT_SUMMARY_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "summaries.sqlite")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# How long a response for a window that includes today stays fresh
+PRESENT_WINDOW_TTL = 15 * 60
+
+
+class DiskCache:
+    """SQLite-backed JSON cache with per-entry TTLs and size-based LRU eviction."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Open (or create) a cache file.
+
+        Args:
+            path: SQLite file path
+            max_bytes: Total payload size to keep before evicting least recently used entries
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_accessed_at ON entries (accessed_at)")
+        self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at, size FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (row[1] is not None and row[1] <= now):
+                if row is not None:
+                    self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    self._total -= row[2]
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a JSON-serializable value.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Seconds until the entry expires (None keeps it until evicted)
+        """
+        payload = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), expires_at, now)
+            )
+            self._total += len(payload) - (old[0] if old else 0)
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Drop expired entries, then least recently used ones until under max_bytes."""
+        now = time.time()
+        expired = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        ).fetchone()[0]
+        self._conn.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        self._total -= expired
+        if self._total <= self.max_bytes:
+            return
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+            victims.append((key,))
+            self._total -= size
+            if self._total <= self.max_bytes:
+                break
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._total = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {
+            'entries': entries,
+            'bytes': self._total,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def request_cache_key(params: Dict[str, Any]) -> str:
+    """Hash of the normalized request parameters, excluding the API key."""
+    normalized = {k: str(v).strip() for k, v in params.items() if k != 'apiKey' and v is not None}
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def response_ttl(to_date: str) -> Optional[float]:
+    """Closed historical windows never expire; the window that includes today does."""
+    if to_date < datetime.now().strftime('%Y-%m-%d'):
+        return None
+    return PRESENT_WINDOW_TTL
+
+
+def _normalize_text(text: Any) -> str:
+    return re.sub(r"\s+", " ", str(text or "")).strip().lower()
+
+
+def article_fingerprint(article: Dict[str, Any]) -> str:
+    """Hash of an article's URL and text, insensitive to case and whitespace."""
+    parts = [_normalize_text(article.get(field)) for field in ('url', 'title', 'description', 'content')]
+    return hashlib.sha1("\x1f".join(parts).encode('utf-8')).hexdigest()
+
+
+def summary_cache_key(model: str, prompt: str, articles: Iterable[Dict[str, Any]], context: str = "") -> str:
+    """
+    Content address of a window summary.
+
+    Args:
+        model: Chat model name
+        prompt: Everything in the prompt except the articles and context
+            (system message, template, company name)
+        articles: The window's articles; order and duplicates do not matter
+        context: Previous-summary context included in the prompt
+    """
+    fingerprints = sorted({article_fingerprint(article) for article in articles})
+    payload = json.dumps([model, prompt, fingerprints, context], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
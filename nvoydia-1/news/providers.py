@@ -0,0 +1,589 @@
+#!/usr/bin/env python3
+"""
+Pluggable news sources behind one interface.
+
+Every provider answers the same question - "articles about this company
+published in this window" - and returns them in the collector's processed
+article format (title, description, url, published_at, source, author,
+url_to_image, content) plus the name of the provider that found them:
+
+- NewsAPIProvider: NewsAPI /v2/everything, through CompanyNewsCollector
+  (response cache, rate limiter, paging and alias queries included)
+- NewsdataProvider: newsdata.io archive search
+- RSSProvider: RSS/Atom feeds, filtered locally by company name and aliases
+- FileProvider: articles from saved collector JSON files
+- MockProvider: deterministic synthetic articles, any number, no network
+
+NewsAggregator queries several providers concurrently and merges their
+answers: URLs are de-duplicated, syndicated near-duplicates collapsed, and a
+provider that fails only loses its own share of the articles.
+
+Usage:
+    python providers.py "Apple Inc" --providers newsapi,rss
+    python providers.py "Apple Inc" --providers mock --max-articles 200
+    python providers.py --benchmark 1000000
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import httpx
+
+from dedup import dedupe_articles
+from query_planner import AliasRegistry, CompanyMatcher
+from resilience import CircuitBreaker, CircuitOpenError, RequestStats, RetryPolicy, get_async
+from stub_server import synthetic_articles
+
+NEWSDATA_URL = "https://newsdata.io/api/1/archive"
+
+# The same feeds as api_integration_tests/rss_feed_parser.py
+DEFAULT_FEEDS = {
+    "TechCrunch Healthtech": "https://techcrunch.com/category/healthtech/feed/",
+    "MobiHealthNews": "https://www.mobihealthnews.com/rss.xml",
+    "FierceBiotech": "https://www.fiercebiotech.com/rss.xml",
+    "Healthcare Dive": "https://www.healthcaredive.com/feeds/news/",
+}
+
+
+def article(title: str, url: str, published_at: str, description: str = '', source_name: str = '',
+            source_id: str = '', author: str = '', url_to_image: str = '', content: str = '',
+            provider: str = '') -> Dict[str, Any]:
+    """An article in the common (collector-processed) format."""
+    return {
+        'title': title or '',
+        'description': description or '',
+        'url': url or '',
+        'published_at': published_at or '',
+        'source': {'name': source_name or '', 'id': source_id or ''},
+        'author': author or '',
+        'url_to_image': url_to_image or '',
+        'content': content or '',
+        'provider': provider,
+    }
+
+
+def from_newsapi(raw: Dict[str, Any], provider: str = 'newsapi') -> Dict[str, Any]:
+    """Convert a raw NewsAPI article to the common format."""
+    source = raw.get('source') or {}
+    return article(raw.get('title'), raw.get('url'), raw.get('publishedAt'), raw.get('description'),
+                   source.get('name'), source.get('id'), raw.get('author'), raw.get('urlToImage'),
+                   raw.get('content'), provider)
+
+
+def in_window(published_at: str, from_date: str, to_date: str) -> bool:
+    """Whether a publishedAt timestamp falls in [from_date, to_date] (to_date inclusive of the whole day)."""
+    # ISO dates and timestamps compare correctly as strings
+    return bool(published_at) and published_at >= from_date and published_at[:10] <= to_date[:10]
+
+
+class NewsProvider:
+    """Base class for news sources."""
+
+    name = 'provider'
+
+    async def fetch(self, client: httpx.AsyncClient, company_name: str, from_date: str, to_date: str,
+                    max_articles: int) -> Dict[str, Any]:
+        """
+        Search for articles about a company.
+
+        Args:
+            client: Shared HTTP client
+            company_name: Company to search for
+            from_date: Start of the window (YYYY-MM-DD or ISO timestamp)
+            to_date: End of the window (YYYY-MM-DD)
+            max_articles: Maximum number of articles to return
+
+        Returns:
+            {'status': 'ok', 'totalResults': n, 'articles': [...]} with articles in
+            the common format, or {'status': 'error', 'message': ...}
+        """
+        raise NotImplementedError
+
+
+class NewsAPIProvider(NewsProvider):
+    """NewsAPI, via a CompanyNewsCollector."""
+
+    name = 'newsapi'
+
+    def __init__(self, collector, concurrency: int = 8, requests_per_second: float = 5.0,
+                 daily_quota: Optional[int] = 1000, max_pages: int = 5):
+        """
+        Args:
+            collector: CompanyNewsCollector (its cache, aliases and endpoint are used)
+            concurrency: Maximum number of NewsAPI requests in flight
+            requests_per_second: Request rate ceiling
+            daily_quota: Remaining NewsAPI requests for today (None for unlimited)
+            max_pages: Maximum number of pages per window
+        """
+        self.collector = collector
+        self.concurrency = concurrency
+        self.requests_per_second = requests_per_second
+        self.daily_quota = daily_quota
+        self.max_pages = max_pages
+        self._semaphore = None
+        self._limiter = None
+
+    async def fetch(self, client, company_name, from_date, to_date, max_articles):
+        from top_n_news import QuotaRateLimiter
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._limiter = QuotaRateLimiter(self.requests_per_second, self.daily_quota)
+        response = await self.collector._fetch_window(client, self._semaphore, self._limiter, company_name,
+                                                      from_date, to_date, max_articles, self.max_pages)
+        if response.get('status') != 'ok':
+            return response
+        articles = [from_newsapi(raw, self.name) for raw in response['articles']]
+        return {'status': 'ok', 'totalResults': response['totalResults'],
+                'articles': [a for a in articles if a['title'] and a['url']]}
+
+
+class NewsdataProvider(NewsProvider):
+    """newsdata.io archive search (needs a plan with archive access)."""
+
+    name = 'newsdata'
+
+    def __init__(self, api_key: Optional[str] = None, base_url: str = NEWSDATA_URL,
+                 aliases: Optional[AliasRegistry] = None, max_pages: int = 5,
+                 retry: Optional[RetryPolicy] = None):
+        """
+        Args:
+            api_key: newsdata.io key. If not provided, will try to get from NEWSDATA_API_KEY.
+            base_url: Archive endpoint
+            aliases: Company alias registry for the query
+            max_pages: Maximum number of result pages per window
+            retry: Retry and backoff policy for failed requests
+        """
+        self.api_key = api_key or os.getenv('NEWSDATA_API_KEY')
+        if not self.api_key:
+            raise ValueError(
+                "newsdata.io key is required. Set NEWSDATA_API_KEY environment variable "
+                "or pass it as a parameter."
+            )
+        self.base_url = base_url
+        self.aliases = aliases or AliasRegistry()
+        self.max_pages = max_pages
+        self.retry = retry or RetryPolicy()
+        self.stats = RequestStats()
+
+    def _query(self, company_name: str) -> str:
+        return ' OR '.join(f'"{name}"' for name in self.aliases.names(company_name))
+
+    @staticmethod
+    def _convert(raw: Dict[str, Any]) -> Dict[str, Any]:
+        # pubDate is "YYYY-MM-DD HH:MM:SS" in UTC
+        published = (raw.get('pubDate') or '').replace(' ', 'T')
+        creators = raw.get('creator') or []
+        return article(raw.get('title'), raw.get('link'), f"{published}Z" if published else '',
+                       raw.get('description'), raw.get('source_name') or raw.get('source_id'),
+                       raw.get('source_id'), ', '.join(creators), raw.get('image_url'),
+                       raw.get('content'), NewsdataProvider.name)
+
+    async def fetch(self, client, company_name, from_date, to_date, max_articles):
+        params = {
+            'apikey': self.api_key,
+            'q': self._query(company_name),
+            'language': 'en',
+            'from_date': from_date[:10],
+            'to_date': to_date[:10],
+        }
+        articles: List[Dict[str, Any]] = []
+        total_results = 0
+        for _ in range(self.max_pages):
+            try:
+                response = await get_async(client, self.base_url, params, self.retry, stats=self.stats)
+                data = response.json()
+            except (httpx.HTTPError, ValueError) as e:
+                if articles:
+                    break
+                return {'status': 'error', 'message': str(e)}
+            if data.get('status') != 'success':
+                if articles:
+                    break
+                message = (data.get('results') or {}).get('message', 'Unknown error')
+                return {'status': 'error', 'message': message}
+            total_results = data.get('totalResults', 0)
+            articles.extend(self._convert(raw) for raw in data.get('results') or [])
+            if not data.get('nextPage') or len(articles) >= max_articles:
+                break
+            params['page'] = data['nextPage']
+        articles = [a for a in articles if a['title'] and a['url'] and in_window(a['published_at'], from_date, to_date)]
+        return {'status': 'ok', 'totalResults': total_results, 'articles': articles[:max_articles]}
+
+
+class RSSProvider(NewsProvider):
+    """
+    RSS/Atom feeds, matched to companies locally.
+
+    Each feed is downloaded and parsed once per provider instance, however
+    many companies are searched; a failed download is retried on the next
+    search.
+    """
+
+    name = 'rss'
+
+    def __init__(self, feeds: Optional[Dict[str, str]] = None, aliases: Optional[AliasRegistry] = None):
+        """
+        Args:
+            feeds: Feed name -> URL (defaults to the healthtech feeds)
+            aliases: Company alias registry for matching entries to companies
+        """
+        import feedparser  # Only needed for this provider
+
+        self._feedparser = feedparser
+        self.feeds = feeds or DEFAULT_FEEDS
+        self.aliases = aliases or AliasRegistry()
+        self._entries: Dict[str, asyncio.Task] = {}
+
+    async def _download(self, client: httpx.AsyncClient, feed_name: str, url: str) -> List[Dict[str, Any]]:
+        response = await client.get(url, follow_redirects=True)
+        response.raise_for_status()
+        # feedparser is CPU-bound; keep it off the event loop
+        feed = await asyncio.to_thread(self._feedparser.parse, response.content)
+        entries = []
+        for entry in feed.entries:
+            parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+            # feedparser normalizes dates to UTC struct_time
+            published = time.strftime('%Y-%m-%dT%H:%M:%SZ', parsed) if parsed else ''
+            entries.append(article(entry.get('title'), entry.get('link'), published, entry.get('summary'),
+                                   feed_name, author=entry.get('author'), provider=self.name))
+        return entries
+
+    async def _feed(self, client: httpx.AsyncClient, feed_name: str, url: str) -> List[Dict[str, Any]]:
+        if url not in self._entries:
+            self._entries[url] = asyncio.ensure_future(self._download(client, feed_name, url))
+        task = self._entries[url]
+        try:
+            # Shielded: a cancelled search must not cancel the download other searches share
+            return await asyncio.shield(task)
+        except Exception:
+            # Let the next search download it again instead of replaying the error
+            if self._entries.get(url) is task:
+                del self._entries[url]
+            raise
+
+    async def fetch(self, client, company_name, from_date, to_date, max_articles):
+        results = await asyncio.gather(*(self._feed(client, name, url) for name, url in self.feeds.items()),
+                                       return_exceptions=True)
+        entries = [entry for result in results if not isinstance(result, BaseException) for entry in result]
+        failures = []
+        for name, result in zip(self.feeds, results):
+            if isinstance(result, BaseException):
+                # First line only: httpx adds a documentation link on the next
+                message = str(result).split('\n')[0]
+                failures.append(f"{name}: {type(result).__name__}: {message}")
+        if not entries and failures:
+            return {'status': 'error', 'message': f"All feeds failed: {'; '.join(failures)}"}
+        matcher = CompanyMatcher([company_name], self.aliases)
+        articles = [entry for entry in entries
+                    if in_window(entry['published_at'], from_date, to_date) and matcher.match(entry)]
+        articles.sort(key=lambda a: a['published_at'], reverse=True)
+        return {'status': 'ok', 'totalResults': len(articles), 'articles': articles[:max_articles]}
+
+
+class FileProvider(NewsProvider):
+    """Articles from saved collector JSON files (e.g. newsdata/*_news.json)."""
+
+    name = 'file'
+
+    def __init__(self, paths: Sequence[str]):
+        """
+        Args:
+            paths: Collector JSON result files or glob patterns
+        """
+        self._articles: Dict[str, List[Dict[str, Any]]] = {}
+        for pattern in paths:
+            for path in sorted(glob.glob(pattern)):
+                with open(path, 'r', encoding='utf-8') as f:
+                    results = json.load(f)
+                company = results['company_name'].lower()
+                for period_data in results['periods'].values():
+                    for item in period_data.get('articles', []):
+                        self._articles.setdefault(company, []).append(dict(item, provider=self.name))
+
+    async def fetch(self, client, company_name, from_date, to_date, max_articles):
+        articles = [a for a in self._articles.get(company_name.lower(), [])
+                    if in_window(a['published_at'], from_date, to_date)]
+        articles.sort(key=lambda a: a['published_at'], reverse=True)
+        return {'status': 'ok', 'totalResults': len(articles), 'articles': articles[:max_articles]}
+
+
+class MockProvider(NewsProvider):
+    """
+    Deterministic synthetic articles, generated on demand.
+
+    The same company and window always give the same articles (those of
+    stub_server.py), and nothing is held in memory, so a window can be made
+    to contain millions of articles for throughput tests.
+    """
+
+    name = 'mock'
+
+    def __init__(self, total_results: int = 250, latency: float = 0.0, name: str = 'mock'):
+        """
+        Args:
+            total_results: Articles available per company and window
+            latency: Seconds to wait before answering, to mimic a remote source
+            name: Provider name (lets several mocks stand in for different sources)
+        """
+        self.total_results = total_results
+        self.latency = latency
+        self.name = name
+
+    def iter_articles(self, company_name: str, from_date: str, to_date: str,
+                      count: Optional[int] = None, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Yield up to `count` articles (default: all of total_results) without materializing them."""
+        count = self.total_results if count is None else min(count, self.total_results)
+        for offset in range(0, count, batch_size):
+            for raw in synthetic_articles(company_name, from_date, to_date, min(batch_size, count - offset), offset):
+                yield from_newsapi(raw, self.name)
+
+    async def fetch(self, client, company_name, from_date, to_date, max_articles):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        articles = list(self.iter_articles(company_name, from_date, to_date, max_articles))
+        return {'status': 'ok', 'totalResults': self.total_results, 'articles': articles}
+
+
+class NewsAggregator:
+    """Queries several providers concurrently and merges their articles."""
+
+    def __init__(self, providers: Sequence[NewsProvider], dedupe: bool = True, concurrency: int = 16,
+                 failure_threshold: int = 5, reset_timeout: float = 60.0):
+        """
+        Args:
+            providers: News sources to query
+            dedupe: Collapse near-duplicate articles across providers (URL duplicates are always dropped)
+            concurrency: Maximum number of provider searches in flight
+            failure_threshold: Consecutive failed searches after which a provider is paused
+            reset_timeout: Seconds a paused provider is skipped before it is tried again
+        """
+        self.providers = list(providers)
+        self.dedupe = dedupe
+        self.concurrency = concurrency
+        self.breakers = {provider.name: CircuitBreaker(provider.name, failure_threshold, reset_timeout)
+                         for provider in self.providers}
+
+    @staticmethod
+    def _merge(responses: List[Tuple[NewsProvider, Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+        """URL-deduplicated articles of all successful responses, newest first, and each failure's message."""
+        seen = set()
+        merged = []
+        errors = {}
+        for provider, response in responses:
+            if response.get('status') != 'ok':
+                errors[provider.name] = response.get('message', 'Unknown error')
+                continue
+            for item in response['articles']:
+                key = item['url'].strip().rstrip('/').lower()
+                if key not in seen:
+                    seen.add(key)
+                    merged.append(item)
+        merged.sort(key=lambda a: a['published_at'], reverse=True)
+        return merged, errors
+
+    async def _call(self, provider: NewsProvider, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                    company_name: str, from_date: str, to_date: str, max_articles: int) -> Dict[str, Any]:
+        breaker = self.breakers[provider.name]
+        try:
+            trial = breaker.before_request()
+        except CircuitOpenError as e:
+            return {'status': 'error', 'message': str(e)}
+        try:
+            async with semaphore:
+                try:
+                    response = await provider.fetch(client, company_name, from_date, to_date, max_articles)
+                except Exception as e:  # One broken source must not sink the others
+                    response = {'status': 'error', 'message': f"{type(e).__name__}: {e}"}
+        except BaseException:
+            # Cancelled before the provider answered: neither a success nor a failure
+            if trial:
+                breaker.release()
+            raise
+        if response.get('status') == 'ok':
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+        return response
+
+    async def search(self, client: httpx.AsyncClient, company_name: str, from_date: str, to_date: str,
+                     max_articles: int = 50, since: Optional[str] = None,
+                     semaphore: Optional[asyncio.Semaphore] = None) -> Dict[str, Any]:
+        """
+        Search every provider for one company and window.
+
+        Args:
+            client: Shared HTTP client
+            company_name: Company to search for
+            from_date: Start of the window
+            to_date: End of the window
+            max_articles: Maximum number of articles per provider
+            since: Only keep articles published after this high-water mark
+            semaphore: Concurrency cap shared with other searches
+
+        Returns:
+            Period dictionary as stored by the collector, with a 'providers'
+            entry counting each provider's articles and an 'errors' entry for
+            failed providers; an 'error' entry if every provider failed
+        """
+        semaphore = semaphore or asyncio.Semaphore(self.concurrency)
+        query_from = max(from_date, since.rstrip('Z')[:19]) if since else from_date
+        responses = await asyncio.gather(*(
+            self._call(provider, client, semaphore, company_name, query_from, to_date, max_articles)
+            for provider in self.providers
+        ))
+        articles, errors = self._merge(list(zip(self.providers, responses)))
+        date_range = {'from': from_date, 'to': to_date}
+        if errors and len(errors) == len(self.providers):
+            return {'error': '; '.join(f"{name}: {message}" for name, message in errors.items()),
+                    'date_range': date_range}
+
+        if since:
+            articles = [a for a in articles if a['published_at'] > since]
+        if self.dedupe:
+            articles = dedupe_articles(articles)
+        counts: Dict[str, int] = {}
+        for item in articles:
+            counts[item['provider']] = counts.get(item['provider'], 0) + 1
+        period_data = {
+            'date_range': date_range,
+            'total_results': sum(r.get('totalResults', 0) for r in responses if r.get('status') == 'ok'),
+            'articles_collected': len(articles),
+            'articles': articles,
+            'providers': counts,
+        }
+        if errors:
+            period_data['errors'] = errors
+        return period_data
+
+    async def collect_many(self, companies: List[str], max_articles_per_period: int = 50,
+                           since: Optional[Dict[str, str]] = None
+                           ) -> AsyncIterator[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Like CompanyNewsCollector.collect_many, over all providers.
+
+        Yields:
+            (company_name, period_name, period_data) tuples in completion order
+        """
+        from top_n_news import TIME_PERIODS
+
+        since = since or {}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        now = datetime.now()
+
+        async def run(company, period_name, from_date, to_date):
+            period_data = await self.search(client, company, from_date, to_date, max_articles_per_period,
+                                            since.get(company), semaphore)
+            return company, period_name, period_data
+
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            tasks = [
+                asyncio.create_task(run(company, period_name,
+                                        (now - timedelta(start_days)).strftime('%Y-%m-%d'),
+                                        (now - timedelta(end_days)).strftime('%Y-%m-%d')))
+                for company in companies
+                for period_name, (end_days, start_days) in TIME_PERIODS.items()
+            ]
+            try:
+                for finished in asyncio.as_completed(tasks):
+                    yield await finished
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+
+def build_providers(names: Sequence[str], api_key: Optional[str] = None,
+                    aliases: Optional[AliasRegistry] = None, files: Sequence[str] = (),
+                    mock_total: int = 250) -> List[NewsProvider]:
+    """Instantiate providers by name: newsapi, newsdata, rss, file, mock."""
+    providers: List[NewsProvider] = []
+    for name in names:
+        if name == 'newsapi':
+            from top_n_news import CompanyNewsCollector
+            providers.append(NewsAPIProvider(CompanyNewsCollector(api_key=api_key, aliases=aliases)))
+        elif name == 'newsdata':
+            providers.append(NewsdataProvider(aliases=aliases))
+        elif name == 'rss':
+            providers.append(RSSProvider(aliases=aliases))
+        elif name == 'file':
+            providers.append(FileProvider(files))
+        elif name == 'mock':
+            providers.append(MockProvider(total_results=mock_total))
+        else:
+            raise ValueError(f"Unknown provider '{name}'")
+    return providers
+
+
+def benchmark(count: int) -> None:
+    """Generate `count` mock articles and report the rate."""
+    provider = MockProvider(total_results=count)
+    to_date = datetime.now().strftime('%Y-%m-%d')
+    from_date = (datetime.now() - timedelta(365)).strftime('%Y-%m-%d')
+    start = time.perf_counter()
+    generated = sum(1 for _ in provider.iter_articles("Benchmark Corp", from_date, to_date))
+    elapsed = time.perf_counter() - start
+    print(f"Generated {generated:,} mock articles in {elapsed:.2f}s ({generated / elapsed:,.0f} articles/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search several news providers at once")
+    parser.add_argument('companies', nargs='*', help='Companies to search for')
+    parser.add_argument('--providers', default='newsapi',
+                        help='Comma-separated providers: newsapi, newsdata, rss, file, mock (default: newsapi)')
+    parser.add_argument('--api-key', help='NewsAPI key (optional if NEWS_API_KEY env var is set)')
+    parser.add_argument('--files', nargs='*', default=['newsdata/*_news.json'],
+                        help='Collector JSON files for the file provider (default: newsdata/*_news.json)')
+    parser.add_argument('--max-articles', type=int, default=50, help='Maximum articles per provider and period')
+    parser.add_argument('--mock-total', type=int, default=250, help='Articles per window from the mock provider')
+    parser.add_argument('--output', help='Write collector-style results (one file per company) to this directory')
+    parser.add_argument('--benchmark', type=int, metavar='N', help='Just time generating N mock articles')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return 0
+    if not args.companies:
+        parser.error('give at least one company (or --benchmark N)')
+
+    from top_n_news import TIME_PERIODS
+
+    aliases = AliasRegistry.load()
+    try:
+        providers = build_providers(args.providers.split(','), args.api_key, aliases, args.files, args.mock_total)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    aggregator = NewsAggregator(providers)
+    results = {company: {'company_name': company, 'collected_at': datetime.now().isoformat(), 'periods': {}}
+               for company in args.companies}
+
+    async def run():
+        async for company, period_name, period_data in aggregator.collect_many(args.companies, args.max_articles):
+            results[company]['periods'][period_name] = period_data
+            if 'error' in period_data:
+                print(f"{company} / {period_name}: Error: {period_data['error']}")
+            else:
+                counts = ', '.join(f"{name} {n}" for name, n in period_data['providers'].items())
+                print(f"{company} / {period_name}: {period_data['articles_collected']} articles ({counts or 'none'})")
+
+    asyncio.run(run())
+
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+        for company, company_results in results.items():
+            company_results['periods'] = {name: company_results['periods'][name] for name in TIME_PERIODS}
+            path = os.path.join(args.output, f"{company.lower().replace(' ', '_').replace('/', '_')}_news.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(company_results, f, indent=2, ensure_ascii=False)
+            print(f"Saved {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
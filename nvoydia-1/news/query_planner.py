@@ -0,0 +1,248 @@
+"""
+Company alias registry, NewsAPI query plans and result demultiplexing.
+
+- AliasRegistry: canonical company name -> aliases and tickers (company_aliases.json)
+- QueryPlanner: compiles each company's `q` once, and packs several companies
+  into one OR query while the combined `q` fits NewsAPI's length limit
+- CompanyMatcher: Aho-Corasick automaton over every alias that assigns the
+  articles returned for a batched query back to the companies they mention
+"""
+
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Sequence
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional; a compiled regex is the fallback
+    ahocorasick = None
+
+DEFAULT_ALIASES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "company_aliases.json")
+
+# NewsAPI rejects a `q` longer than this
+MAX_QUERY_LENGTH = 500
+
+FINANCIAL_FILTER = (
+    "(earnings OR revenue OR stock OR financial OR merger OR acquisition OR IPO OR "
+    "funding OR VC OR investment OR investment round)"
+)
+
+
+class AliasRegistry:
+    """Aliases and tickers for companies, keyed by canonical name."""
+
+    def __init__(self, entries: Optional[Dict[str, Dict[str, List[str]]]] = None):
+        """
+        Args:
+            entries: Canonical name -> {"aliases": [...], "tickers": [...]}
+        """
+        self._entries: Dict[str, Dict[str, List[str]]] = {}
+        self._by_lower: Dict[str, str] = {}
+        for name, entry in (entries or {}).items():
+            self.add(name, entry.get('aliases', []), entry.get('tickers', []))
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_ALIASES_PATH) -> "AliasRegistry":
+        """Load a registry from a JSON file; a missing file gives an empty registry."""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def save(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f, indent=2, ensure_ascii=False)
+
+    def add(self, name: str, aliases: Iterable[str] = (), tickers: Iterable[str] = ()) -> None:
+        """Register (or extend) a company's aliases and tickers."""
+        entry = self._entries.setdefault(name, {'aliases': [], 'tickers': []})
+        entry['aliases'] += [a for a in aliases if a not in entry['aliases']]
+        entry['tickers'] += [t for t in tickers if t not in entry['tickers']]
+        for term in [name] + entry['aliases']:
+            self._by_lower.setdefault(term.lower(), name)
+
+    def canonical(self, name: str) -> str:
+        """Canonical name for a company or any of its aliases (unknown names map to themselves)."""
+        return self._by_lower.get(name.lower(), name)
+
+    def names(self, company: str) -> List[str]:
+        """
+        Canonical name and aliases of a company.
+
+        Any spelling of a registered company gives the same list, so e.g.
+        "Apple" and "Apple Inc" compile to the same query.
+        """
+        canonical = self.canonical(company)
+        entry = self._entries.get(canonical)
+        if entry is None:
+            return [company]
+        terms = [canonical] + entry['aliases']
+        if company.lower() not in {term.lower() for term in terms}:
+            terms.append(company)
+        return terms
+
+    def tickers(self, company: str) -> List[str]:
+        entry = self._entries.get(self.canonical(company))
+        return list(entry['tickers']) if entry else []
+
+
+class QueryPlan:
+    """One NewsAPI query and the companies whose articles it fetches."""
+
+    __slots__ = ('query', 'companies')
+
+    def __init__(self, query: str, companies: List[str]):
+        self.query = query
+        self.companies = companies
+
+    def __repr__(self) -> str:
+        return f"QueryPlan(companies={self.companies!r}, query={self.query!r})"
+
+
+class QueryPlanner:
+    """Compiles and batches NewsAPI `q` strings for companies."""
+
+    def __init__(self, registry: Optional[AliasRegistry] = None, max_length: int = MAX_QUERY_LENGTH,
+                 financial_filter: str = FINANCIAL_FILTER):
+        self.registry = registry or AliasRegistry()
+        self.max_length = max_length
+        self.financial_filter = financial_filter
+        self._clauses: Dict[str, str] = {}
+
+    def company_clause(self, company: str) -> str:
+        """The part of `q` that matches one company (compiled once per company)."""
+        clause = self._clauses.get(company)
+        if clause is None:
+            terms = [f'"{term}"' for term in self.registry.names(company)] + self.registry.tickers(company)
+            # A company without aliases keeps the original must-match form
+            clause = f'+{terms[0]}' if len(terms) == 1 else f"({' OR '.join(terms)})"
+            self._clauses[company] = clause
+        return clause
+
+    def query(self, company: str) -> str:
+        """Full `q` for a single company."""
+        return f"{self.company_clause(company)} AND {self.financial_filter}"
+
+    def plan(self, companies: Sequence[str], batch: bool = True,
+             max_companies: Optional[int] = None) -> List[QueryPlan]:
+        """
+        Group companies into as few queries as the length limit allows.
+
+        Companies that compile to the same clause share one query. Packing is
+        first-fit in the given order, so related companies listed together
+        end up in the same query.
+
+        Args:
+            companies: Company names
+            batch: Pack several companies per query (False gives one query per company)
+            max_companies: Cap on companies per query (None for no cap)
+
+        Returns:
+            Query plans covering every company exactly once
+        """
+        by_clause: Dict[str, List[str]] = {}
+        for company in companies:
+            by_clause.setdefault(self.company_clause(company), []).append(company)
+
+        plans: List[QueryPlan] = []
+        clauses: List[str] = []
+        for clause, members in by_clause.items():
+            if batch and plans:
+                current = plans[-1]
+                combined = self._batched_query(clauses + [clause])
+                fits = len(combined) <= self.max_length
+                under_cap = max_companies is None or len(current.companies) + len(members) <= max_companies
+                if fits and under_cap:
+                    clauses.append(clause)
+                    current.query = combined
+                    current.companies.extend(members)
+                    continue
+            clauses = [clause]
+            plans.append(QueryPlan(self._batched_query(clauses), list(members)))
+        return plans
+
+    def _batched_query(self, clauses: List[str]) -> str:
+        if len(clauses) == 1:
+            return f"{clauses[0]} AND {self.financial_filter}"
+        # The '+' must-match prefix does not make sense inside an OR group
+        inner = ' OR '.join(clause.lstrip('+') for clause in clauses)
+        return f"({inner}) AND {self.financial_filter}"
+
+
+class CompanyMatcher:
+    """Finds which companies an article mentions, by name, alias or ticker."""
+
+    def __init__(self, companies: Sequence[str], registry: Optional[AliasRegistry] = None):
+        """
+        Args:
+            companies: Companies to look for
+            registry: Alias registry (names match case-insensitively, tickers exactly)
+        """
+        registry = registry or AliasRegistry()
+        self.companies = list(companies)
+        self._names: Dict[str, set] = {}
+        self._tickers: Dict[str, set] = {}
+        for company in self.companies:
+            for name in registry.names(company):
+                self._names.setdefault(name.lower(), set()).add(company)
+            for ticker in registry.tickers(company):
+                self._tickers.setdefault(ticker, set()).add(company)
+        self._name_matcher = self._build(self._names)
+        self._ticker_matcher = self._build(self._tickers)
+
+    @staticmethod
+    def _build(terms: Dict[str, set]):
+        if not terms:
+            return None
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for term, owners in terms.items():
+                automaton.add_word(term, (len(term), owners))
+            automaton.make_automaton()
+            return automaton
+        return re.compile('|'.join(re.escape(t) for t in sorted(terms, key=len, reverse=True)))
+
+    @staticmethod
+    def _is_word(char: str) -> bool:
+        return char.isalnum() or char == '_'
+
+    def _scan(self, matcher, terms: Dict[str, set], text: str, found: set) -> None:
+        if matcher is None:
+            return
+        if ahocorasick is not None:
+            hits = ((end - length + 1, end + 1, owners) for end, (length, owners) in matcher.iter(text))
+        else:
+            hits = ((m.start(), m.end(), terms[m.group(0)]) for m in matcher.finditer(text))
+        for start, end, owners in hits:
+            # Only whole-word matches: "Meta" must not match "metal"
+            if start > 0 and self._is_word(text[start - 1]):
+                continue
+            if end < len(text) and self._is_word(text[end]):
+                continue
+            found |= owners
+
+    def match_text(self, text: str) -> set:
+        """Companies mentioned in a text."""
+        found: set = set()
+        self._scan(self._name_matcher, self._names, text.lower(), found)
+        self._scan(self._ticker_matcher, self._tickers, text, found)
+        return found
+
+    def match(self, article: Dict) -> set:
+        """Companies mentioned in an article's title, description or content."""
+        text = ' '.join(article.get(field) or '' for field in ('title', 'description', 'content'))
+        return self.match_text(text)
+
+    def demultiplex(self, articles: Iterable[Dict]) -> Dict[str, List[Dict]]:
+        """
+        Split the articles of a batched query by the companies they mention.
+
+        An article mentioning several companies goes to each of them; one
+        mentioning none of them is dropped.
+        """
+        assigned: Dict[str, List[Dict]] = {company: [] for company in self.companies}
+        for article in articles:
+            for company in self.match(article):
+                assigned[company].append(article)
+        return assigned
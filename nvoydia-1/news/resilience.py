@@ -0,0 +1,328 @@
+"""
+Retries, backoff and circuit breaking for news source HTTP requests.
+
+- RetryPolicy: which responses to retry and how long to wait (exponential
+  backoff with full jitter, or the server's Retry-After when it sends one)
+- CircuitBreaker: stops calling a source after repeated failures and lets a
+  single trial request through once a cool-down has passed
+- RequestStats: per-request latency, retry and failure counts for a run
+
+`get` and `get_async` combine the three around a requests.Session or an
+httpx.AsyncClient.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import requests
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of making a request while a source's circuit is open."""
+
+
+class QuotaExhaustedError(Exception):
+    """Raised when the rate limiter has no request quota left."""
+
+
+class RetryPolicy:
+    """When to retry a request and how long to wait first."""
+
+    def __init__(self, max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 max_retry_after: float = 120.0, retry_statuses: Tuple[int, ...] = RETRY_STATUSES):
+        """
+        Args:
+            max_retries: Retries after the first attempt
+            backoff_base: Backoff ceiling for the first retry, in seconds; doubles each retry
+            backoff_max: Largest backoff ceiling
+            max_retry_after: Give up instead of honoring a longer Retry-After
+            retry_statuses: HTTP statuses worth retrying
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.retry_statuses = retry_statuses
+
+    @staticmethod
+    def retry_after(value: Optional[str]) -> Optional[float]:
+        """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+    def delay(self, retry: int, retry_after: Optional[str] = None) -> Optional[float]:
+        """
+        Seconds to wait before a retry.
+
+        Args:
+            retry: 0 for the first retry, 1 for the second, ...
+            retry_after: The response's Retry-After header, if any
+
+        Returns:
+            The delay, or None if the request should not be retried
+        """
+        if retry >= self.max_retries:
+            return None
+        wait = self.retry_after(retry_after)
+        if wait is not None:
+            return wait if wait <= self.max_retry_after else None
+        # Full jitter: spreads out clients that failed at the same moment
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** retry))
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one source.
+
+    Closed: requests flow. After `failure_threshold` consecutive failures it
+    opens and requests fail fast for `reset_timeout` seconds; then one trial
+    request is let through (half-open), whose outcome closes or re-opens it.
+    """
+
+    def __init__(self, name: str = 'source', failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trips = 0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def before_request(self) -> bool:
+        """
+        Raise CircuitOpenError unless a request may be made now.
+
+        Returns:
+            True if the request is the half-open trial; its caller must then
+            record its outcome or release() the trial
+        """
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return False
+            if state == 'half-open' and not self._trial:
+                self._trial = True
+                return True
+            remaining = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            raise CircuitOpenError(
+                f"{self.name} circuit open after {self.failures} consecutive failures; "
+                f"retrying in {remaining:.0f}s"
+            )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial or (self.opened_at is None and self.failures >= self.failure_threshold):
+                if not self._trial:
+                    self.trips += 1
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+    def release(self) -> None:
+        """Give back a half-open trial that ended without an outcome (cancelled, quota exhausted)."""
+        with self._lock:
+            self._trial = False
+
+
+class RequestStats:
+    """Latency and retry counters for the requests of one run."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+        self.statuses: Dict[Any, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, status: Any) -> None:
+        """One attempt: its latency and HTTP status (or exception name)."""
+        with self._lock:
+            self.latencies.append(latency)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def report(self) -> str:
+        """One-line summary for the end of a run."""
+        if not self.latencies:
+            line = "HTTP: no requests"
+        else:
+            ordered = sorted(self.latencies)
+            pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+            statuses = ', '.join(f"{status}: {count}" for status, count in sorted(self.statuses.items(), key=str))
+            line = (f"HTTP: {len(ordered)} attempts, latency p50 {pick(0.5):.0f} ms / p95 {pick(0.95):.0f} ms / "
+                    f"max {ordered[-1] * 1000:.0f} ms, {self.retries} retries, {self.failures} failed ({statuses})")
+        if self.rejected:
+            line += f", {self.rejected} rejected by the circuit breaker"
+        return line
+
+
+def _retry_delay(policy: RetryPolicy, retry: int, status: Any, retry_after: Optional[str]) -> Optional[float]:
+    """Backoff before the next attempt, or None to give up. `status` is an HTTP status or None for network errors."""
+    if status is not None and status not in policy.retry_statuses:
+        return None
+    return policy.delay(retry, retry_after)
+
+
+def _before_request(breaker: Optional[CircuitBreaker], stats: RequestStats) -> bool:
+    if breaker is None:
+        return False
+    try:
+        return breaker.before_request()
+    except CircuitOpenError:
+        stats.rejected += 1
+        raise
+
+
+def _give_up(breaker: Optional[CircuitBreaker], stats: RequestStats) -> None:
+    stats.failures += 1
+    if breaker is not None:
+        breaker.record_failure()
+
+
+def get(session: requests.Session, url: str, params: Dict[str, Any], timeout: Tuple[float, float],
+        policy: RetryPolicy, breaker: Optional[CircuitBreaker] = None,
+        stats: Optional[RequestStats] = None) -> requests.Response:
+    """
+    GET with retries, backoff and circuit breaking.
+
+    Connection errors, timeouts and the policy's retry statuses are retried;
+    anything else is returned (or raised) straight away.
+
+    Returns:
+        The final response (which may still be an HTTP error)
+
+    Raises:
+        CircuitOpenError: The source's circuit is open
+        requests.exceptions.RequestException: Network errors once retries are exhausted
+    """
+    stats = stats or RequestStats()
+    # Checked once per request: its retries make up a single outcome
+    trial = _before_request(breaker, stats)
+    retry = 0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                response = session.get(url, params=params, timeout=timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                stats.record(time.perf_counter() - start, type(e).__name__)
+                wait = _retry_delay(policy, retry, None, None)
+                if wait is None:
+                    _give_up(breaker, stats)
+                    raise
+            else:
+                stats.record(time.perf_counter() - start, response.status_code)
+                if response.status_code not in policy.retry_statuses:
+                    if breaker is not None:
+                        breaker.record_success()
+                    return response
+                wait = _retry_delay(policy, retry, response.status_code, response.headers.get('Retry-After'))
+                if wait is None:
+                    _give_up(breaker, stats)
+                    return response
+            stats.retries += 1
+            retry += 1
+            time.sleep(wait)
+    except BaseException:
+        if trial:
+            # Cancelled, quota exhausted or an unexpected error: no outcome was recorded
+            breaker.release()
+        raise
+
+
+async def get_async(client: httpx.AsyncClient, url: str, params: Dict[str, Any], policy: RetryPolicy,
+                    breaker: Optional[CircuitBreaker] = None, stats: Optional[RequestStats] = None,
+                    semaphore: Optional[asyncio.Semaphore] = None, limiter=None) -> httpx.Response:
+    """
+    Async GET with retries, backoff and circuit breaking.
+
+    Each attempt holds the semaphore and takes a rate limiter slot; backoff
+    waits happen outside both so they do not block other requests.
+
+    Args:
+        semaphore: Concurrency cap shared with other requests
+        limiter: Object with an async acquire() returning False once the quota is used up
+
+    Returns:
+        The final response (which may still be an HTTP error)
+
+    Raises:
+        CircuitOpenError: The source's circuit is open
+        QuotaExhaustedError: The limiter refused the request
+        httpx.HTTPError: Network errors once retries are exhausted
+    """
+    stats = stats or RequestStats()
+    semaphore = semaphore or asyncio.Semaphore(1)
+    # Checked once per request: its retries make up a single outcome
+    trial = _before_request(breaker, stats)
+    retry = 0
+    try:
+        while True:
+            async with semaphore:
+                if limiter is not None and not await limiter.acquire():
+                    raise QuotaExhaustedError("Request quota exhausted")
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url, params=params)
+                except httpx.TransportError as e:
+                    stats.record(time.perf_counter() - start, type(e).__name__)
+                    response, error = None, e
+                else:
+                    stats.record(time.perf_counter() - start, response.status_code)
+
+            if response is None:
+                wait = _retry_delay(policy, retry, None, None)
+                if wait is None:
+                    _give_up(breaker, stats)
+                    raise error
+            elif response.status_code not in policy.retry_statuses:
+                if breaker is not None:
+                    breaker.record_success()
+                return response
+            else:
+                wait = _retry_delay(policy, retry, response.status_code, response.headers.get('Retry-After'))
+                if wait is None:
+                    _give_up(breaker, stats)
+                    return response
+            stats.retries += 1
+            retry += 1
+            await asyncio.sleep(wait)
+    except BaseException:
+        if trial:
+            # Cancelled, quota exhausted or an unexpected error: no outcome was recorded
+            breaker.release()
+        raise
@@ -0,0 +1,170 @@
+"""
+Sentence scoring for extractive summaries.
+
+Shared by the offline period summarizer (extractive.py) and the dashboard
+API's article summaries (dashboard/backend/summaries.py), so both pick
+sentences the same way. Sentences become TF-IDF vectors over their own
+vocabulary and are scored on:
+
+- textrank: PageRank over the sentence cosine-similarity graph
+- centroid: cosine similarity to the mean vector
+- figures:  numbers, money amounts, percentages and financial terms
+- company:  mentions of the company's name
+
+The best sentences are taken greedily, skipping near-repeats of sentences
+already chosen or quoted in earlier summaries, and returned in their
+original order. Only NumPy and ranking's term lists are needed, so the API
+can import this without the LLM summarizer.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from ranking import FINANCIAL_TERMS, name_terms
+
+DEFAULT_MAX_SENTENCES = 3
+
+DEFAULT_WEIGHTS = {"textrank": 0.3, "centroid": 0.25, "figures": 0.35, "company": 0.1}
+
+# Cosine similarity above which a sentence counts as repeating another
+REDUNDANCY_THRESHOLD = 0.6
+
+DAMPING = 0.85
+
+# Sentences shorter than this (in words) are headlines fragments or boilerplate
+MIN_SENTENCE_WORDS = 4
+
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[\"'(A-Z0-9$€£])")
+WORD_RE = re.compile(r"[a-z][a-z'-]*|\d[\d,.]*")
+DIGIT_RE = re.compile(r"\d")
+FIGURE_RE = re.compile(r"[$€£]\s?\d|\d\s?(?:%|percent\b|million\b|billion\b|bn\b|m\b)")
+
+STOPWORDS = frozenset(
+    "a an and are as at be been by for from has have in into is it its of on or that the their this to was "
+    "were will with which who after over than more about also said says".split()
+)
+_FINANCIAL = frozenset(FINANCIAL_TERMS)
+
+
+def split_sentences(text: str, separator: str = "\n\n") -> List[str]:
+    """Sentences of `text`, one paragraph per `separator`, without NewsAPI truncation markers."""
+    sentences = []
+    for paragraph in text.split(separator):
+        paragraph = paragraph.strip()
+        # NewsAPI truncates content with a "… [+1234 chars]" marker
+        if paragraph.endswith(" chars]"):
+            paragraph = paragraph[:paragraph.rfind("[+")].rstrip().rstrip("…").rstrip()
+        sentences.extend(s.strip() for s in SENTENCE_RE.split(paragraph) if s.strip())
+    return sentences
+
+
+def _tokens(sentence: str) -> List[str]:
+    return [word for word in WORD_RE.findall(sentence.lower()) if word not in STOPWORDS]
+
+
+def _counts(token_lists: List[List[str]], vocabulary: Dict[str, int], grow: bool = False) -> np.ndarray:
+    """Term counts, one row per sentence. With grow, new tokens are added to the vocabulary, else ignored."""
+    rows, cols = [], []
+    lookup = vocabulary.setdefault if grow else vocabulary.get
+    for row, tokens in enumerate(token_lists):
+        ids = [lookup(token, len(vocabulary)) for token in tokens] if grow else \
+            [i for i in map(lookup, tokens) if i is not None]
+        rows.extend([row] * len(ids))
+        cols.extend(ids)
+    size = len(vocabulary)
+    flat = np.asarray(rows, dtype=np.int64) * size + np.asarray(cols, dtype=np.int64)
+    return np.bincount(flat, minlength=len(token_lists) * size).reshape(len(token_lists), size)
+
+
+def _tfidf(counts: np.ndarray, idf: np.ndarray) -> np.ndarray:
+    """L2-normalized TF-IDF rows (sublinear term frequency)."""
+    vectors = np.log1p(counts) * idf
+    norms = np.sqrt(np.einsum("ij,ij->i", vectors, vectors))[:, None]
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def textrank(similarity: np.ndarray, damping: float = DAMPING) -> np.ndarray:
+    """
+    PageRank scores of a weighted sentence graph, scaled so the best sentence scores 1.
+
+    A text has tens of sentences, so the stationary vector is solved for
+    directly instead of by power iteration.
+    """
+    n = len(similarity)
+    weights = similarity.copy()
+    np.fill_diagonal(weights, 0.0)
+    out = weights.sum(axis=1, keepdims=True)
+    # Sentences similar to nothing spread their rank evenly
+    transition = np.where(out > 0, weights / np.where(out > 0, out, 1.0), 1.0 / n)
+    ranks = np.linalg.solve(np.eye(n) - damping * transition.T, np.full(n, (1 - damping) / n))
+    return ranks / ranks.max()
+
+
+def select_sentences(sentences: Iterable[str], company: Optional[str] = None, previous: Iterable[str] = (),
+                     max_sentences: int = DEFAULT_MAX_SENTENCES,
+                     weights: Optional[Dict[str, float]] = None) -> List[str]:
+    """
+    The most salient of `sentences`.
+
+    Args:
+        sentences: Candidate sentences in text order (see split_sentences)
+        company: Company name; sentences mentioning it score higher
+        previous: Sentences of earlier summaries; sentences repeating them are avoided
+        max_sentences: Sentences to pick
+        weights: Feature weights (default: DEFAULT_WEIGHTS)
+
+    Returns:
+        Up to `max_sentences` sentences in their original order; empty if
+        none is long enough to use
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    kept, token_lists, seen = [], [], set()
+    for sentence in sentences:
+        tokens = _tokens(sentence)
+        key = tuple(tokens)
+        # Syndicated copies repeat sentences word for word
+        if len(tokens) < MIN_SENTENCE_WORDS or key in seen:
+            continue
+        seen.add(key)
+        kept.append(sentence)
+        token_lists.append(tokens)
+    sentences = kept
+    if len(sentences) <= max_sentences:
+        return sentences
+
+    vocabulary: Dict[str, int] = {}
+    counts = _counts(token_lists, vocabulary, grow=True)
+    document_frequency = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + len(sentences)) / (1 + document_frequency)) + 1
+    vectors = _tfidf(counts, idf)
+    similarity = vectors @ vectors.T
+
+    centroid = vectors.mean(axis=0)
+    centroid /= np.linalg.norm(centroid) or 1.0
+    names = set(name_terms(company)) if company else set()
+    has_number = np.array([DIGIT_RE.search(sentence) is not None for sentence in sentences])
+    has_figure = np.array([number and FIGURE_RE.search(sentence) is not None
+                           for sentence, number in zip(sentences, has_number)])
+    has_term = np.array([not _FINANCIAL.isdisjoint(tokens) for tokens in token_lists])
+    figures = np.minimum(1.0, 0.5 * has_number + 0.5 * has_figure + 0.25 * has_term)
+    mentions = np.array([not names.isdisjoint(tokens) for tokens in token_lists], dtype=float)
+    scores = (weights["textrank"] * textrank(similarity) + weights["centroid"] * (vectors @ centroid)
+              + weights["figures"] * figures + weights["company"] * mentions)
+
+    repeated = np.zeros(len(sentences), dtype=bool)
+    previous = list(previous)
+    if previous:
+        quoted = _tfidf(_counts([_tokens(s) for s in previous], vocabulary), idf)
+        repeated = (vectors @ quoted.T).max(axis=1) > REDUNDANCY_THRESHOLD
+
+    chosen: List[int] = []
+    # Fresh sentences first; repeats only if there are not enough fresh ones
+    for i in np.lexsort((-scores, repeated)).tolist():
+        if chosen and similarity[i, chosen].max() > REDUNDANCY_THRESHOLD:
+            continue
+        chosen.append(i)
+        if len(chosen) == max_sentences:
+            break
+    return [sentences[i] for i in sorted(chosen)]
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Streaming JSONL/CSV export of collected articles.
+
+Rows are written as each period arrives and nothing is kept afterwards, so
+memory use stays flat however many companies and articles a run covers.
+The format follows the file extension (.jsonl or .csv), and a trailing .zst
+compresses the stream with zstandard:
+
+    news.jsonl        one JSON object per article (all fields, plus company_name and period)
+    news.csv.zst      the CSV export columns, zstd-compressed
+
+The output is flushed after every period, so a long run can be followed
+with `tail -f` (or `zstdcat`) while it is still collecting.
+
+Usage:
+    python stream_export.py "Apple Inc" "Tesla" --output newsdata/news.jsonl.zst
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+from typing import Any, Dict, List, Optional
+
+CSV_COLUMNS = ['company_name', 'period', 'title', 'description', 'url', 'published_at',
+               'source_name', 'author', 'url_to_image']
+
+
+def export_format(path: str) -> str:
+    """'jsonl' or 'csv', from the file name (ignoring a .zst suffix)."""
+    name = path[:-len('.zst')] if path.endswith('.zst') else path
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    raise ValueError(f"Cannot tell the export format of '{path}' (expected .jsonl or .csv, optionally .zst)")
+
+
+class ArticleWriter:
+    """Writes articles one row at a time to a JSONL or CSV file."""
+
+    def __init__(self, path: str, fmt: Optional[str] = None, compress: Optional[bool] = None,
+                 level: int = 3, columns: List[str] = CSV_COLUMNS):
+        """
+        Open the output file.
+
+        Args:
+            path: Output file path
+            fmt: 'jsonl' or 'csv' (default: from the file extension)
+            compress: zstd-compress the stream (default: when the path ends in .zst)
+            level: zstd compression level
+            columns: CSV columns
+        """
+        self.path = path
+        self.format = fmt or export_format(path)
+        self.columns = columns
+        self.rows = 0
+        compress = path.endswith('.zst') if compress is None else compress
+
+        raw = open(path, 'wb')
+        self._compressor = None
+        if compress:
+            try:
+                import zstandard
+            except ImportError:
+                raw.close()
+                raise ImportError("zstd output needs the zstandard package (pip install zstandard)")
+            self._compressor = zstandard.ZstdCompressor(level=level).stream_writer(raw)
+            raw = self._compressor
+        self._file = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+        self._csv = None
+        if self.format == 'csv':
+            self._csv = csv.DictWriter(self._file, fieldnames=columns, extrasaction='ignore')
+            self._csv.writeheader()
+
+    def __enter__(self) -> "ArticleWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def write_article(self, company_name: str, period_name: str, article: Dict[str, Any]) -> None:
+        """Write one article in the collector's processed format."""
+        if self._csv is not None:
+            source = article.get('source') or {}
+            self._csv.writerow(dict(article, company_name=company_name, period=period_name,
+                                    source_name=source.get('name', '')))
+        else:
+            row = {'company_name': company_name, 'period': period_name}
+            row.update(article)
+            self._file.write(json.dumps(row, ensure_ascii=False))
+            self._file.write('\n')
+        self.rows += 1
+
+    def write_period(self, company_name: str, period_name: str, period_data: Dict[str, Any]) -> int:
+        """
+        Write the articles of one period and flush them to disk.
+
+        Returns:
+            Number of articles written
+        """
+        articles = period_data.get('articles', [])
+        for article in articles:
+            self.write_article(company_name, period_name, article)
+        self.flush()
+        return len(articles)
+
+    def write_results(self, results: Dict[str, Any]) -> int:
+        """Write every period of a collector results dictionary. Returns the number of articles written."""
+        return sum(self.write_period(results['company_name'], period_name, period_data)
+                   for period_name, period_data in results['periods'].items())
+
+    def flush(self) -> None:
+        self._file.flush()
+        if self._compressor is not None:
+            import zstandard
+            # End the current zstd block so everything written so far can be decompressed
+            self._compressor.flush(zstandard.FLUSH_BLOCK)
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
+async def export_many(collector, companies: List[str], path: str, **collect_kwargs) -> int:
+    """
+    Collect news for many companies and stream every period straight to a file.
+
+    Args:
+        collector: CompanyNewsCollector (or NewsAggregator)
+        companies: Company names to search for
+        path: Output file (.jsonl or .csv, optionally .zst)
+        **collect_kwargs: Passed on to collector.collect_many
+
+    Returns:
+        Number of articles written
+    """
+    with ArticleWriter(path) as writer:
+        async for company, period_name, period_data in collector.collect_many(companies, **collect_kwargs):
+            if 'error' in period_data:
+                print(f"{company} / {period_name}: Error: {period_data['error']}")
+                continue
+            written = writer.write_period(company, period_name, period_data)
+            print(f"{company} / {period_name}: {written} articles")
+        return writer.rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect news for many companies and stream it to JSONL/CSV")
+    parser.add_argument('companies', nargs='+', help='Companies to search for')
+    parser.add_argument('--output', default='news.jsonl', help='.jsonl or .csv, optionally .zst (default: news.jsonl)')
+    parser.add_argument('--api-key', help='NewsAPI key (optional if NEWS_API_KEY env var is set)')
+    parser.add_argument('--base-url', help='Article search endpoint (e.g. stub_server.py)')
+    parser.add_argument('--max-articles', type=int, default=50, help='Maximum articles per time period (default: 50)')
+    args = parser.parse_args()
+
+    from top_n_news import CompanyNewsCollector, NEWSAPI_URL
+
+    try:
+        collector = CompanyNewsCollector(api_key=args.api_key, base_url=args.base_url or NEWSAPI_URL)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    written = asyncio.run(export_many(collector, args.companies, args.output,
+                                      max_articles_per_period=args.max_articles))
+    print(f"\n{written} articles written to {args.output}")
+    print(collector.stats.report())
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Local stub of the NewsAPI endpoints used by the news tools.
+
+Serves deterministic synthetic articles so the collector can be exercised
+without network access or API quota:
+
+- GET /v2/everything          (same parameters and response shape as NewsAPI)
+- POST /v1/chat/completions   (OpenAI chat completions; the "summary" is the
+                               context's first sentences that contain numbers)
+
+Usage:
+    python stub_server.py --port 8765 --latency 0.2
+    python stub_server.py --port 8765 --error-rate 0.3   # exercise retries
+    python top_n_news.py "Apple Inc" --api-key test --base-url http://127.0.0.1:8765/v2/everything
+    python summarizer.py palantir --api-key test --base-url http://127.0.0.1:8765/v1
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+SOURCES = ["Reuters", "Bloomberg", "TechCrunch", "CNBC", "Financial Times", "The Verge"]
+EVENTS = [
+    "reports quarterly revenue of ${n}M",
+    "raises ${n}M in new funding round",
+    "stock climbs {n}% after earnings beat",
+    "announces acquisition worth ${n}M",
+    "expands partnership, shares up {n}%",
+]
+DETAILS = [
+    "The deal was led by long-time backers and closes next month.",
+    "Executives pointed to demand from enterprise customers in Europe and Asia.",
+    "Management raised its full-year outlook on the back of strong bookings.",
+    "Regulators are expected to review the transaction later this year.",
+    "The company plans to hire several hundred engineers with the proceeds.",
+    "Margins improved as cloud infrastructure costs fell.",
+    "Competitors have struggled to match its pricing in the mid-market segment.",
+    "Investors welcomed the news after a volatile quarter for the sector.",
+    "Analysts at several brokerages lifted their price targets.",
+    "The board also approved a new share buyback programme.",
+    "Supply constraints that weighed on last year's results have eased.",
+    "A spokesperson declined to comment on future acquisitions.",
+]
+
+
+SENTENCE_RE = re.compile(r"[^.!?\n]+[.!?]")
+
+
+def _seed(*parts: Any) -> int:
+    return int(hashlib.md5("|".join(map(str, parts)).encode()).hexdigest()[:8], 16)
+
+
+def synthetic_articles(company: str, from_date: str, to_date: str, count: int, offset: int = 0) -> List[Dict[str, Any]]:
+    """Deterministic NewsAPI-shaped articles for a company and date window."""
+    start = datetime.fromisoformat(from_date.rstrip("Z"))
+    end = datetime.fromisoformat(to_date.rstrip("Z"))
+    span = max(int((end - start).total_seconds()), 1)
+    articles = []
+    for i in range(offset, offset + count):
+        seed = _seed(company, from_date, to_date, i)
+        source = SOURCES[seed % len(SOURCES)]
+        event = EVENTS[(seed >> 4) % len(EVENTS)].format(n=(seed >> 8) % 500 + 1)
+        published = end - timedelta(seconds=seed % span)
+        slug = re.sub(r"[^a-z0-9]+", "-", company.lower()).strip("-")
+        articles.append({
+            "source": {"id": source.lower().replace(" ", "-"), "name": source},
+            "author": f"Reporter {seed % 97}",
+            "title": f"{company} {event}",
+            "description": f"{company} {event}. {DETAILS[(seed >> 12) % len(DETAILS)]} "
+                           f"{DETAILS[(seed >> 16) % len(DETAILS)]}",
+            "url": f"https://{source.lower().replace(' ', '')}.example.com/{slug}/{from_date}/{i}",
+            "urlToImage": None,
+            "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "content": f"{company} {event}. Analysts expect further growth in the coming quarters. [+{seed % 4000} chars]",
+        })
+    return articles
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    total_results = 250
+    error_rate = 0.0  # fraction of requests answered with 429 + Retry-After
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up (e.g. a read timeout)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/v2/everything":
+            self._send_json(404, {"status": "error", "code": "notFound", "message": "Unknown endpoint"})
+            return
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            self._send_json(429, {"status": "error", "code": "rateLimited",
+                                  "message": "You have made too many requests recently."},
+                            headers={"Retry-After": "0"})
+            return
+        status, payload = self.everything({k: v[0] for k, v in parse_qs(url.query).items()})
+        self._send_json(status, payload)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/v1/chat/completions":
+            self._send_json(404, {"error": {"message": "Unknown endpoint", "type": "invalid_request_error"}})
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            self._send_json(429, {"error": {"message": "Rate limit reached", "type": "requests"}},
+                            headers={"Retry-After": "0"})
+            return
+        self._send_json(200, self.chat_completion(body))
+
+    def chat_completion(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        messages = body.get("messages", [])
+        prompt = messages[-1]["content"] if messages else ""
+        context = prompt.rsplit("Current time period context:", 1)[-1]
+        sentences = [s.strip() for s in SENTENCE_RE.findall(context)]
+        picked = [s for s in sentences if any(c.isdigit() for c in s)][:3] or sentences[:1]
+        summary = " ".join(picked) or "No relevant news in this period."
+        prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4 + 1
+        completion_tokens = len(summary) // 4 + 1
+        return {
+            "id": f"chatcmpl-stub-{_seed(prompt):08x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": summary}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    def everything(self, params: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        if not params.get("apiKey"):
+            return 401, {"status": "error", "code": "apiKeyMissing", "message": "Your API key is missing."}
+        # Batched and alias queries OR several quoted names; articles rotate through them
+        companies = re.findall(r'"([^"]+)"', params.get("q", "")) or [params.get("q", "")]
+        today = datetime.now().strftime("%Y-%m-%d")
+        from_date = params.get("from", today)
+        to_date = params.get("to", today)
+        page_size = min(int(params.get("pageSize", 100)), 100)
+        page = int(params.get("page", 1))
+        offset = (page - 1) * page_size
+        count = max(0, min(page_size, self.total_results - offset))
+        return 200, {
+            "status": "ok",
+            "totalResults": self.total_results,
+            "articles": [
+                synthetic_articles(companies[i % len(companies)], from_date, to_date, 1, i)[0]
+                for i in range(offset, offset + count)
+            ],
+        }
+
+
+class StubServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 resets connections under concurrent benchmarks
+    request_queue_size = 128
+
+
+def start_server(port: int = 0, latency: float = 0.0, handler: type = StubHandler,
+                 error_rate: float = 0.0) -> ThreadingHTTPServer:
+    """Start the stub in a background thread. Use port 0 to pick a free port."""
+    handler = type("ConfiguredStubHandler", (handler,), {"latency": latency, "error_rate": error_rate})
+    server = StubServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stub of the NewsAPI endpoints")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to delay each response")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of requests to answer with 429 Too Many Requests")
+    args = parser.parse_args()
+
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"latency": args.latency, "error_rate": args.error_rate})
+    server = StubServer(("127.0.0.1", args.port), handler)
+    print(f"Stub server listening on http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,102 +1,593 @@
-from openai import OpenAI
-import pandas as pd
+#!/usr/bin/env python3
+"""
+Summarize collected news per company and time period with an OpenAI chat model.
+
+Companies are summarized concurrently by a bounded pool of async workers,
+and each company's periods form a small dependency graph: by default every
+prompt quotes the last two summaries, so a period waits for the earlier ones.
+That edge is optional; with --parallel-windows it is dropped, every period is
+summarized at once without previous context, and a company takes one call's
+latency (plus a merge) instead of four. Every call goes through a
+per-model token/request rate limiter, so large batches stay under the
+account's limits instead of failing with 429s.
+
+Each period's articles are packed into a token budget first (see
+context_packer.py): near-duplicates are dropped, the rest ranked by
+relevance, and a period too large for one call is summarized in chunks whose
+summaries are then merged. Periods without articles cost no call. Summaries are cached by
+content (see news_cache.py), so a period whose articles and context have
+not changed since the last run costs no call.
+
+Articles are read from the article store when it exists, otherwise from
+newsdata/<company>_news.json, otherwise from newsdata/<company>_news.csv.
+
+Usage:
+    python summarizer.py palantir
+    python summarizer.py palantir apple tesla --concurrency 8 --tpm 40000
+    python summarizer.py palantir --base-url http://127.0.0.1:8765/v1 --api-key test   # stub_server.py
+    python summarizer.py palantir apple --extractive   # no API calls
+    python summarizer.py --benchmark 100
+"""
+
+import argparse
+import asyncio
+import json
 import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
 from dotenv import load_dotenv
-import csv
-import json
-from datetime import datetime
+from openai import AsyncOpenAI
 
+from context_packer import DEFAULT_MAX_CHUNKS, DEFAULT_WINDOW_BUDGET, ContextPacker, WindowPack, count_tokens
+from news_cache import DEFAULT_SUMMARY_CACHE_PATH, DiskCache, summary_cache_key
 
 # Load environment variables from .env file
 load_dotenv()
 
-#csv processing (current version is just testing it)
-# Check if JSON file exists, otherwise use CSV
-json_path = "newsdata/palantir_news.json"
-csv_path = "newsdata/palantir_news.csv"
-
-if os.path.exists(json_path):
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-elif os.path.exists(csv_path):
-    # If JSON doesn't exist, read CSV and convert to similar structure
-    df = pd.read_csv(csv_path)
-    data = {"periods": {}}
-    for period in df['period'].unique():
-        period_data = df[df['period'] == period]
-        data["periods"][period] = {
-            "articles": period_data.to_dict('records')
+DEFAULT_MODEL = "gpt-4"
+DEFAULT_DATA_DIR = "newsdata"
+DEFAULT_OUTPUT_DIR = os.path.join("newsdata", "summaries")
+
+# Model -> (tokens per minute, requests per minute); conservative tier-1 limits
+MODEL_LIMITS = {
+    "gpt-4": (10000, 500),
+    "gpt-4-turbo": (30000, 500),
+    "gpt-4o": (30000, 500),
+    "gpt-4o-mini": (200000, 500),
+    "gpt-3.5-turbo": (200000, 500),
+}
+
+# Rough completion size, counted against the token budget before the call
+EXPECTED_COMPLETION_TOKENS = 200
+
+SYSTEM_PROMPT = "Answer only using the provided context. Do not make up any information."
+
+PROMPT_TEMPLATE = (
+    "Summarize the most important news from all articles in the provided context, focusing only on "
+    "details that directly relate to {company}. Limit the summary to a maximum of 3 sentences. "
+    "Prioritize extracting and including all available numbers, statistics, and financial figures. "
+    "Ensure the summary is concise yet comprehensive. Avoid repeating information from previous "
+    "summaries unless it provides additional context, new details, or different perspectives."
+    "{previous_context}Current time period context: {context}"
+)
+
+MERGE_TEMPLATE = (
+    "The following are summaries of different sets of articles about {company} from the same time period. "
+    "Merge them into one summary of at most 3 sentences, keeping the most important news and all numbers, "
+    "statistics, and financial figures. Avoid repeating information from previous summaries unless it "
+    "provides additional context, new details, or different perspectives."
+    "{previous_context}Summaries to merge:\n{summaries}"
+)
+
+NO_ARTICLES = "No articles available for this time period."
+
+
+def load_company_data(company: str, data_dir: str = DEFAULT_DATA_DIR) -> Optional[Dict[str, Any]]:
+    """
+    Load a company's collected articles.
+
+    Prefers the article store, then the JSON file, otherwise the CSV export.
+
+    Returns:
+        Collector-style results dictionary, or None if nothing was collected
+    """
+    slug = company.lower().replace(' ', '_').replace('/', '_')
+    store_path = os.path.join(data_dir, "articles")
+    json_path = os.path.join(data_dir, f"{slug}_news.json")
+    csv_path = os.path.join(data_dir, f"{slug}_news.csv")
+
+    if os.path.isdir(store_path):
+        from article_store import ArticleStore
+        # Only this company's partitions are read
+        data = ArticleStore(store_path).to_results(company)
+        if data['periods']:
+            return data
+    if os.path.exists(json_path):
+        with open(json_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    if os.path.exists(csv_path):
+        # Convert the CSV to the same structure
+        df = pd.read_csv(csv_path).fillna("")
+        return {
+            "company_name": company,
+            "periods": {period: {"articles": df[df['period'] == period].to_dict('records')}
+                        for period in df['period'].unique()}
         }
-else:
-    print(f"Error: Neither {json_path} nor {csv_path} found!")
-    exit(1)
-
-
-window_mapping = {}
-for window_name, window in data["periods"].items():
-    parts = []
-    # Check if articles exist and handle cases where they might not
-    if "articles" in window and window["articles"]:
-        article_count = len(window["articles"])
-        print(f"Processing {window_name}: {article_count} articles")
-        for article in window["articles"]:
-            title = article.get("title", "")
-            desc = article.get("description", "")
-            content = article.get("content", "")
-            parts.append(" ".join([title, desc, content]).strip())
-        window_mapping[window_name] = "\n\n".join(parts).strip()
+    return None
+
+
+def previous_context(previous: Dict[str, str], max_previous: int = 2) -> str:
+    """The prompt section quoting the most recent earlier summaries ('' if there are none)."""
+    # Only the last few real summaries, to limit tokens
+    recent = [(period, summary) for period, summary in previous.items() if summary != NO_ARTICLES]
+    recent = recent[-max_previous:] if max_previous else []
+    if not recent:
+        return ""
+    previous_summaries = "\n".join(f"{period}: {summary}" for period, summary in recent)
+    return f"\n\nPrevious summaries for context:\n{previous_summaries}\n\n"
+
+
+def window_dependencies(periods: Sequence[str], parallel_windows: bool = False) -> Dict[str, List[str]]:
+    """
+    The summary graph of one company: period -> periods that must be summarized first.
+
+    Each prompt quotes earlier summaries, so by default a period depends on
+    every period before it. With parallel_windows that edge is dropped and
+    all periods are independent.
+    """
+    periods = list(periods)
+    return {period: [] if parallel_windows else periods[:i] for i, period in enumerate(periods)}
+
+
+def build_messages(company: str, context: str, previous: Dict[str, str], max_previous: int = 2) -> List[Dict[str, str]]:
+    """
+    Chat messages for one period.
+
+    Args:
+        company: Company name
+        context: The period's article text
+        previous: Summaries of the earlier periods, in order
+        max_previous: How many of the most recent earlier summaries to include
+    """
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": PROMPT_TEMPLATE.format(
+            company=company, previous_context=previous_context(previous, max_previous), context=context)},
+    ]
+
+
+def build_merge_messages(company: str, partials: List[str], previous: Dict[str, str],
+                         max_previous: int = 2) -> List[Dict[str, str]]:
+    """Chat messages that merge the chunk summaries of one period into its summary."""
+    summaries = "\n".join(f"- {partial}" for partial in partials)
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": MERGE_TEMPLATE.format(
+            company=company, previous_context=previous_context(previous, max_previous), summaries=summaries)},
+    ]
+
+
+class TokenRateLimiter:
+    """
+    Token-bucket limiter for one model's tokens and requests per minute.
+
+    Callers reserve an estimate before each call and settle the difference
+    with the actual usage afterwards.
+    """
+
+    def __init__(self, tokens_per_minute: Optional[int] = None, requests_per_minute: Optional[int] = None):
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        self._tokens = float(tokens_per_minute or 0)
+        self._requests = float(requests_per_minute or 0)
+        self._updated = time.monotonic()
+        # Created in the event loop that first acquires; see rebind()
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+
+    def rebind(self) -> None:
+        """Drop the lock bound to a previous event loop; the remaining budget carries over."""
+        self._lock = None
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until `tokens` tokens and one request fit in the budget, then reserve them."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.tokens_per_minute:
+                # A single call larger than the whole bucket would otherwise wait forever
+                tokens = min(tokens, self.tokens_per_minute)
+            while True:
+                self._refill()
+                waits = []
+                if self.tokens_per_minute and self._tokens < tokens:
+                    waits.append((tokens - self._tokens) * 60 / self.tokens_per_minute)
+                if self.requests_per_minute and self._requests < 1:
+                    waits.append((1 - self._requests) * 60 / self.requests_per_minute)
+                if not waits:
+                    break
+                await asyncio.sleep(max(waits))
+            self._tokens -= tokens
+            self._requests -= 1
+
+    def settle(self, reserved: int, used: int) -> None:
+        """Charge (or refund) the difference between the reservation and actual usage."""
+        if self.tokens_per_minute:
+            self._tokens -= used - min(reserved, self.tokens_per_minute)
+
+
+class Summarizer:
+    """Summarizes companies' news periods with a chat model."""
+
+    def __init__(self, model: str = DEFAULT_MODEL, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 concurrency: int = 8, tokens_per_minute: Optional[int] = None,
+                 requests_per_minute: Optional[int] = None, max_previous: int = 2,
+                 client: Optional[AsyncOpenAI] = None, cache: Optional[DiskCache] = None,
+                 refresh: bool = False, packer: Optional[ContextPacker] = None, parallel_windows: bool = False):
+        """
+        Args:
+            model: Chat model name
+            api_key: OpenAI key. If not provided, will try to get from OPENAI_API_KEY.
+            base_url: API base URL (override to point at stub_server.py)
+            concurrency: Maximum chat calls in flight (and companies in progress)
+            tokens_per_minute: Token budget for the model (default: MODEL_LIMITS, None there for no limit)
+            requests_per_minute: Request budget for the model (default: MODEL_LIMITS)
+            max_previous: Earlier summaries included as context in each prompt
+            client: Preconfigured AsyncOpenAI client
+            cache: Summary cache; None disables caching
+            refresh: Ignore cached summaries but still store fresh ones
+            packer: Packs each period's articles into the token budget (default: ContextPacker(model))
+            parallel_windows: Summarize a company's periods concurrently, without previous-summary context
+        """
+        self.model = model
+        self._client = client
+        self._owns_client = client is None
+        self._client_options = {"api_key": api_key or os.getenv("OPENAI_API_KEY"), "base_url": base_url}
+        self.concurrency = concurrency
+        self.max_previous = max_previous
+        default_tpm, default_rpm = MODEL_LIMITS.get(model, (None, None))
+        self._limits = (tokens_per_minute or default_tpm, requests_per_minute or default_rpm)
+        self._limiters: Dict[str, TokenRateLimiter] = {}
+        self.cache = cache
+        self.refresh = refresh
+        self.packer = packer or ContextPacker(model)
+        self.parallel_windows = parallel_windows
+        # Asyncio primitives belong to one event loop, and each run() has its
+        # own, so they are created for the running loop in _bind_loop()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.usage = {"calls": 0, "cached": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        # Company -> the same counters, for per-company cost
+        self.company_usage: Dict[str, Dict[str, int]] = {}
+        # Company -> seconds from its first to its last summary
+        self.company_seconds: Dict[str, float] = {}
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        """The API client, created on first use."""
+        if self._client is None:
+            self._client = AsyncOpenAI(**self._client_options)
+        return self._client
+
+    def limiter(self, model: str) -> TokenRateLimiter:
+        """The shared rate limiter for a model."""
+        if model not in self._limiters:
+            self._limiters[model] = TokenRateLimiter(*self._limits)
+        return self._limiters[model]
+
+    def _bind_loop(self) -> None:
+        """Set up the call slots, limiter locks and client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        self._loop = loop
+        self._slots = asyncio.Semaphore(self.concurrency)
+        for limiter in self._limiters.values():
+            limiter.rebind()
+        if self._owns_client and self._client is not None:
+            # Its connection pool belongs to the previous loop; runs close it
+            # with aclose(), so this only drops a client that was never closed
+            self._client = None
+
+    async def aclose(self) -> None:
+        """Close the client this summarizer created, releasing its connection pool."""
+        if self._owns_client and self._client is not None:
+            client, self._client = self._client, None
+            await client.close()
+
+    def _count(self, company: Optional[str], name: str, amount: int = 1) -> None:
+        self.usage[name] += amount
+        if company is not None:
+            counters = self.company_usage.setdefault(company, dict.fromkeys(self.usage, 0))
+            counters[name] += amount
+
+    async def complete(self, messages: List[Dict[str, str]], company: Optional[str] = None) -> str:
+        """One chat completion under the model's rate limits, counted against `company`."""
+        self._bind_loop()
+        limiter = self.limiter(self.model)
+        reserved = sum(count_tokens(m["content"], self.model) for m in messages) + EXPECTED_COMPLETION_TOKENS
+        async with self._slots:
+            await limiter.acquire(reserved)
+            try:
+                resp = await self.client.chat.completions.create(model=self.model, messages=messages)
+            except Exception:
+                limiter.settle(reserved, 0)
+                raise
+        usage = resp.usage
+        limiter.settle(reserved, usage.total_tokens if usage else reserved)
+        self._count(company, "calls")
+        if usage:
+            self._count(company, "prompt_tokens", usage.prompt_tokens)
+            self._count(company, "completion_tokens", usage.completion_tokens)
+        return resp.choices[0].message.content
+
+    async def summarize_company(self, company: str, data: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Summarize each period of one company, each as soon as the periods it depends on are done.
+
+        Returns:
+            Period name -> summary, in the data's period order
+        """
+        dependencies = window_dependencies(data["periods"], self.parallel_windows)
+        tasks: Dict[str, asyncio.Future] = {}
+
+        async def summarize(window_name: str) -> str:
+            previous = {dep: await tasks[dep] for dep in dependencies[window_name]}
+            articles = data["periods"][window_name].get("articles") or []
+            return await self.summarize_window(company, articles, previous)
+
+        # Period order is a topological order, so each dependency's task exists before it is awaited
+        for window_name in dependencies:
+            tasks[window_name] = asyncio.ensure_future(summarize(window_name))
+        try:
+            summaries = await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        return dict(zip(tasks, summaries))
+
+    def cache_key(self, company: str, articles: List[Dict[str, Any]], previous: Dict[str, str]) -> str:
+        """Content address of a period summary: model, prompt, article set and previous-summary context."""
+        prompt = "\x1f".join([SYSTEM_PROMPT, PROMPT_TEMPLATE, MERGE_TEMPLATE, company, self.packer.signature()])
+        return summary_cache_key(self.model, prompt, articles, previous_context(previous, self.max_previous))
+
+    async def summarize_window(self, company: str, articles: List[Dict[str, Any]],
+                               previous: Dict[str, str]) -> str:
+        """Summary of one period, from the cache when its inputs are unchanged."""
+        pack = self.packer.pack(company, articles)
+        if pack.empty:
+            return NO_ARTICLES
+        key = self.cache_key(company, articles, previous) if self.cache is not None else None
+        if key is not None and not self.refresh:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._count(company, "cached")
+                return cached
+        summary = await self.summarize_pack(company, pack, previous)
+        if key is not None:
+            self.cache.set(key, summary)
+        return summary
+
+    async def summarize_pack(self, company: str, pack: WindowPack, previous: Dict[str, str]) -> str:
+        """One call if the period fits in a single chunk, else summarize each chunk and merge (map-reduce)."""
+        if len(pack.chunks) == 1:
+            return await self.complete(build_messages(company, pack.chunks[0], previous, self.max_previous), company)
+        partials = await asyncio.gather(*(self.complete(build_messages(company, chunk, {}, 0), company)
+                                          for chunk in pack.chunks))
+        return await self.complete(build_merge_messages(company, partials, previous, self.max_previous), company)
+
+    async def summarize_many(self, companies: Dict[str, Dict[str, Any]]
+                             ) -> AsyncIterator[Tuple[str, Dict[str, str]]]:
+        """
+        Summarize many companies with a bounded worker pool.
+
+        Args:
+            companies: Company name -> collector results
+
+        Yields:
+            (company, summaries) as each company finishes; a failed company
+            yields {'error': message} instead
+        """
+        jobs: asyncio.Queue = asyncio.Queue()
+        done: asyncio.Queue = asyncio.Queue()
+        for item in companies.items():
+            jobs.put_nowait(item)
+
+        async def worker():
+            while True:
+                try:
+                    company, data = jobs.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                started = time.perf_counter()
+                try:
+                    result = await self.summarize_company(company, data)
+                except Exception as e:
+                    result = {"error": f"{type(e).__name__}: {e}"}
+                self.company_seconds[company] = time.perf_counter() - started
+                await done.put((company, result))
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.concurrency, len(companies)))]
+        try:
+            for _ in range(len(companies)):
+                yield await done.get()
+        finally:
+            for task in workers:
+                task.cancel()
+
+    def run(self, companies: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+        """Synchronous wrapper: summarize every company and return all summaries."""
+        async def collect():
+            try:
+                return {company: summaries async for company, summaries in self.summarize_many(companies)}
+            finally:
+                await self.aclose()
+        return asyncio.run(collect())
+
+
+def save_summaries(company: str, summaries: Dict[str, str], output_dir: str, model: str) -> str:
+    """Write one company's summaries to <output_dir>/<company>_summary.json and return the path."""
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"{company.lower().replace(' ', '_').replace('/', '_')}_summary.json")
+    output_data = {
+        "company": company,
+        "model": model,
+        "generated_at": datetime.now().isoformat(),
+        "summaries": summaries
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(output_data, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def benchmark(count: int, latency: float = 0.2, concurrency: int = 16, model: str = DEFAULT_MODEL) -> None:
+    """
+    Summarize `count` synthetic companies against stub_server.py, with and without --parallel-windows.
+
+    Args:
+        count: Number of companies (four periods of ten articles each)
+        latency: Seconds the stub takes per chat call
+        concurrency: Chat calls in flight
+        model: Model name sent to the stub
+    """
+    from providers import from_newsapi
+    from stub_server import start_server, synthetic_articles
+    from top_n_news import TIME_PERIODS
+
+    server = start_server(latency=latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    now = datetime.now()
+    companies = {}
+    for i in range(count):
+        company = f"Benchmark Corp {i:03d}"
+        periods = {}
+        for period_name, (start_days, end_days) in TIME_PERIODS.items():
+            from_date = (now - timedelta(days=end_days)).strftime('%Y-%m-%d')
+            to_date = (now - timedelta(days=start_days)).strftime('%Y-%m-%d')
+            raw = synthetic_articles(company, from_date, to_date, 10)
+            periods[period_name] = {"articles": [from_newsapi(article, "stub") for article in raw]}
+        companies[company] = {"company_name": company, "periods": periods}
+
+    try:
+        for parallel_windows in (False, True):
+            summarizer = Summarizer(model=model, api_key="test", base_url=base_url, concurrency=concurrency,
+                                    tokens_per_minute=10 ** 9, requests_per_minute=10 ** 9,
+                                    parallel_windows=parallel_windows)
+            start = time.perf_counter()
+            results = summarizer.run(companies)
+            elapsed = time.perf_counter() - start
+            failed = sum(1 for summaries in results.values() if "error" in summaries)
+            per_company = sorted(summarizer.company_seconds.values())
+            print(f"{'parallel windows' if parallel_windows else 'chained windows '}: {count} companies, "
+                  f"{summarizer.usage['calls']} calls in {elapsed:.2f}s "
+                  f"({summarizer.usage['calls'] / elapsed:.0f} calls/s), per company p50 "
+                  f"{per_company[len(per_company) // 2]:.2f}s / max {per_company[-1]:.2f}s, {failed} failed")
+    finally:
+        server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize collected news per company and time period")
+    parser.add_argument('companies', nargs='*', default=['palantir'], help='Companies to summarize (default: palantir)')
+    parser.add_argument('--model', default=DEFAULT_MODEL, help=f'Chat model (default: {DEFAULT_MODEL})')
+    parser.add_argument('--api-key', help='OpenAI key (optional if OPENAI_API_KEY env var is set)')
+    parser.add_argument('--base-url', help='API base URL, e.g. http://127.0.0.1:8765/v1 for stub_server.py')
+    parser.add_argument('--concurrency', type=int, default=8, help='Chat calls in flight (default: 8)')
+    parser.add_argument('--tpm', type=int, help='Tokens per minute for the model (default: built-in per-model limit)')
+    parser.add_argument('--rpm', type=int, help='Requests per minute for the model (default: built-in per-model limit)')
+    parser.add_argument('--extractive', action='store_true',
+                        help='Pick key sentences locally (extractive.py) instead of calling the model')
+    parser.add_argument('--parallel-windows', action='store_true',
+                        help="Summarize a company's periods concurrently, without earlier summaries as context")
+    parser.add_argument('--window-tokens', type=int, default=DEFAULT_WINDOW_BUDGET,
+                        help=f'Article tokens per call; larger periods are summarized in chunks '
+                             f'(default: {DEFAULT_WINDOW_BUDGET})')
+    parser.add_argument('--max-chunks', type=int, default=DEFAULT_MAX_CHUNKS,
+                        help=f'Chunks per period before the least relevant articles are dropped '
+                             f'(default: {DEFAULT_MAX_CHUNKS})')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help=f'Collected news (default: {DEFAULT_DATA_DIR})')
+    parser.add_argument('--no-cache', action='store_true', help='Neither read nor write the summary cache')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Re-summarize every period (fresh summaries are still cached)')
+    parser.add_argument('--cache-path', default=DEFAULT_SUMMARY_CACHE_PATH,
+                        help='Summary cache file (default: .cache/summaries.sqlite next to this script)')
+    parser.add_argument('--cache-max-mb', type=int, default=64,
+                        help='Evict least recently used summaries beyond this size (default: 64)')
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR,
+                        help=f'Where <company>_summary.json files go (default: {DEFAULT_OUTPUT_DIR})')
+    parser.add_argument('--benchmark', type=int, metavar='N',
+                        help='Time N synthetic companies against an in-process stub_server.py, then exit')
+    parser.add_argument('--stub-latency', type=float, default=0.2,
+                        help='Seconds per chat call for --benchmark (default: 0.2)')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark, args.stub_latency, args.concurrency, args.model)
+        return 0
+
+    companies = {}
+    for company in args.companies:
+        data = load_company_data(company, args.data_dir)
+        if data is None:
+            print(f"Error: no collected news for {company} in {args.data_dir}")
+            continue
+        companies[company] = data
+    if not companies:
+        return 1
+
+    cache = None if args.no_cache else DiskCache(args.cache_path, max_bytes=args.cache_max_mb * 1024 * 1024)
+    if args.extractive:
+        from extractive import ExtractiveSummarizer
+        summarizer = ExtractiveSummarizer(concurrency=args.concurrency, cache=cache, refresh=args.refresh,
+                                          parallel_windows=args.parallel_windows)
     else:
-        print(f"Warning: No articles found for period {window_name}")
-        window_mapping[window_name] = "No articles available for this time period."
-        
-        
-
-#OpenAI Model details
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-company = "palantir"
-summaries = {}
-
-for time in window_mapping:
-    # Create context with previous summaries (limit to last 2 to manage tokens)
-    previous_context = ""
-    if summaries:
-        # Get only the last 2 summaries to avoid token limits
-        recent_summaries = list(summaries.items())[-2:]
-        previous_summaries = "\n".join([f"{period}: {summary}" for period, summary in recent_summaries])
-        previous_context = f"\n\nPrevious summaries for context:\n{previous_summaries}\n\n"
-    
-    resp = client.chat.completions.create(
-        model="gpt-4",              # Use gpt-4 instead of gpt-5
-        messages=[
-            {
-                "role": "system",
-                "content": "Answer only using the provided context. Do not make up any information."
-            }, 
-            {
-                "role": "user",
-                "content": f"Summarize the most important news from all articles in the provided context, focusing only on details that directly relate to {company}. Limit the summary to a maximum of 3 sentences. Prioritize extracting and including all available numbers, statistics, and financial figures. Ensure the summary is concise yet comprehensive. Avoid repeating information from previous summaries unless it provides additional context, new details, or different perspectives.{previous_context}Current time period context: {window_mapping[time]}"
-            }
-        ]
-    )
-    
-    summary = resp.choices[0].message.content
-    summaries[time] = summary
-    
-    print(f"Time: {time}")
-    print(summary)
-    print("-"*100)
-
-# Export summaries to JSON file
-output_data = {
-    "company": company,
-    "generated_at": datetime.now().isoformat(),
-    "summaries": summaries
-}
+        summarizer = Summarizer(model=args.model, api_key=args.api_key, base_url=args.base_url,
+                                concurrency=args.concurrency, tokens_per_minute=args.tpm, requests_per_minute=args.rpm,
+                                cache=cache, refresh=args.refresh,
+                                packer=ContextPacker(args.model, budget=args.window_tokens, max_chunks=args.max_chunks),
+                                parallel_windows=args.parallel_windows)
 
-with open("output.json", "w", encoding="utf-8") as f:
-    json.dump(output_data, f, indent=2, ensure_ascii=False)
+    async def run():
+        failed = 0
+        try:
+            async for company, summaries in summarizer.summarize_many(companies):
+                if "error" in summaries:
+                    print(f"{company}: Error: {summaries['error']}")
+                    failed += 1
+                    continue
+                for period, summary in summaries.items():
+                    print(f"{company} / {period}:\n{summary}\n{'-' * 100}")
+                print(f"Summaries exported to: {save_summaries(company, summaries, args.output_dir, summarizer.model)}")
+        finally:
+            await summarizer.aclose()
+        return failed
 
-print(f"\nSummaries exported to: output.json")
+    start = time.perf_counter()
+    failed = asyncio.run(run())
+    for company, counters in sorted(summarizer.company_usage.items()):
+        print(f"{company}: {counters['calls']} calls, {counters['prompt_tokens']} prompt + "
+              f"{counters['completion_tokens']} completion tokens, {counters['cached']} cached periods")
+    usage = summarizer.usage
+    print(f"\n{len(companies)} companies, {usage['calls']} calls, {usage['prompt_tokens']} prompt + "
+          f"{usage['completion_tokens']} completion tokens in {time.perf_counter() - start:.1f}s")
+    if cache is not None:
+        stats = cache.stats()
+        print(f"Summary cache: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions, "
+              f"{stats['entries']} entries ({stats['bytes'] / 1024:.0f} KiB)")
+    return 1 if failed else 0
 
 
+if __name__ == "__main__":
+    exit(main())
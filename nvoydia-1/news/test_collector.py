@@ -0,0 +1,104 @@
+"""
+CompanyNewsCollector.collect_many against the local NewsAPI stub.
+
+The stub runs on an ephemeral port and records how many requests are in
+flight and when each one arrives, so the tests can check the concurrency
+cap and the rate limiter from the server's side.
+
+Usage:
+    python -m pytest test_collector.py
+"""
+
+import asyncio
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from query_planner import AliasRegistry
+from resilience import RetryPolicy
+from stub_server import StubHandler, start_server
+from top_n_news import TIME_PERIODS, CompanyNewsCollector
+
+COMPANIES = ["Slowpoke Robotics", "Quartz Analytics", "Meridian Foods", "Halcyon Bio", "Tessellate Labs"]
+SLOW_COMPANY = "Slowpoke Robotics"
+
+
+class RecordingHandler(StubHandler):
+    """Stub handler that delays one company's queries and records arrivals."""
+
+    recorder = None
+
+    def do_GET(self):
+        recorder = self.recorder
+        query = parse_qs(urlparse(self.path).query).get("q", [""])[0]
+        with recorder["lock"]:
+            recorder["arrivals"].append(time.monotonic())
+            recorder["active"] += 1
+            recorder["peak"] = max(recorder["peak"], recorder["active"])
+        try:
+            time.sleep(0.4 if SLOW_COMPANY in query else 0.03)
+            super().do_GET()
+        finally:
+            with recorder["lock"]:
+                recorder["active"] -= 1
+
+
+@pytest.fixture
+def stub():
+    recorder = {"lock": threading.Lock(), "arrivals": [], "active": 0, "peak": 0}
+    handler = type("Recording", (RecordingHandler,), {"recorder": recorder})
+    server = start_server(port=0, handler=handler)
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/v2/everything", recorder
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _collect(base_url, **kwargs):
+    collector = CompanyNewsCollector(api_key="test", base_url=base_url, aliases=AliasRegistry(),
+                                     retry=RetryPolicy(max_retries=0))
+
+    async def run():
+        return [result async for result in collector.collect_many(COMPANIES, **kwargs)]
+
+    return asyncio.run(run())
+
+
+def test_collect_many_yields_every_window_in_completion_order(stub):
+    base_url, recorder = stub
+    results = _collect(base_url, max_articles_per_period=10, concurrency=8, requests_per_second=1000)
+
+    pairs = [(company, period) for company, period, _ in results]
+    assert sorted(pairs) == sorted((company, period) for company in COMPANIES for period in TIME_PERIODS)
+    for _, _, period_data in results:
+        assert "error" not in period_data
+        assert period_data["articles_collected"] == 10
+    # The slow company is listed first but its windows finish last
+    assert {company for company, _ in pairs[-len(TIME_PERIODS):]} == {SLOW_COMPANY}
+    assert SLOW_COMPANY not in {company for company, _ in pairs[:-len(TIME_PERIODS)]}
+
+
+def test_collect_many_respects_concurrency_cap(stub):
+    base_url, recorder = stub
+    _collect(base_url, max_articles_per_period=10, concurrency=3, requests_per_second=1000)
+
+    assert len(recorder["arrivals"]) == len(COMPANIES) * len(TIME_PERIODS)
+    assert 1 < recorder["peak"] <= 3
+
+
+def test_collect_many_respects_rate_limit_and_quota(stub):
+    base_url, recorder = stub
+    results = _collect(base_url, max_articles_per_period=10, concurrency=8, requests_per_second=25,
+                       daily_quota=12)
+
+    arrivals = sorted(recorder["arrivals"])
+    assert len(arrivals) == 12
+    # Permits are spaced 40ms apart; allow for scheduling jitter on arrival
+    assert arrivals[-1] - arrivals[0] >= 11 * 0.04 * 0.8
+    errors = [period_data["error"] for _, _, period_data in results if "error" in period_data]
+    assert len(results) == len(COMPANIES) * len(TIME_PERIODS)
+    assert len(errors) == len(results) - 12
+    assert all("quota" in error for error in errors)
@@ -0,0 +1,126 @@
+"""
+Retries and circuit breaking in resilience.get and get_async.
+
+A local HTTP server answers each request with the next status of a script,
+so a half-open trial can be driven through retried 503s.
+
+Usage:
+    python -m pytest test_resilience.py
+"""
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+import requests
+
+from resilience import CircuitBreaker, CircuitOpenError, QuotaExhaustedError, RetryPolicy, get, get_async
+
+POLICY = RetryPolicy(max_retries=2, backoff_base=0.01, backoff_max=0.01)
+
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    """Answers with the statuses of `script` in turn, then 200; None stalls for a while first."""
+
+    script = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        status = self.script.pop(0) if self.script else 200
+        if status is None:
+            time.sleep(2.0)
+            status = 200
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+@pytest.fixture
+def server():
+    script = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), type("Scripted", (ScriptedHandler,), {"script": script}))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/", script
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _half_open_breaker():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=60.0)
+    breaker.record_failure()
+    breaker.opened_at = time.monotonic() - breaker.reset_timeout
+    assert breaker.state == "half-open"
+    return breaker
+
+
+def _get_async(url, breaker, **kwargs):
+    async def run():
+        async with httpx.AsyncClient() as client:
+            return await get_async(client, url, {}, POLICY, breaker, **kwargs)
+
+    return asyncio.run(run())
+
+
+def test_half_open_trial_closes_after_retried_503(server):
+    url, script = server
+    breaker = _half_open_breaker()
+    script.extend([503, 503])
+    assert _get_async(url, breaker).status_code == 200
+    assert breaker.state == "closed"
+
+    breaker = _half_open_breaker()
+    script.extend([503, 503])
+    with requests.Session() as session:
+        assert get(session, url, {}, (1.0, 1.0), POLICY, breaker).status_code == 200
+    assert breaker.state == "closed"
+
+
+def test_half_open_trial_reopens_when_retries_run_out(server):
+    url, script = server
+    breaker = _half_open_breaker()
+    script.extend([503, 503, 503])
+    assert _get_async(url, breaker).status_code == 503
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    breaker = _half_open_breaker()
+    script.extend([503, 503, 503])
+    with requests.Session() as session:
+        assert get(session, url, {}, (1.0, 1.0), POLICY, breaker).status_code == 503
+    assert breaker.state == "open"
+
+
+def test_half_open_trial_is_released_without_an_outcome(server):
+    url, script = server
+
+    class Exhausted:
+        async def acquire(self):
+            return False
+
+    breaker = _half_open_breaker()
+    with pytest.raises(QuotaExhaustedError):
+        _get_async(url, breaker, limiter=Exhausted())
+    assert breaker.before_request() is True
+
+    breaker = _half_open_breaker()
+    script.extend([503, None])
+
+    async def cancelled():
+        async with httpx.AsyncClient() as client:
+            # Cancelled while the retry is in flight
+            task = asyncio.create_task(get_async(client, url, {}, POLICY, breaker))
+            await asyncio.sleep(0.5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    asyncio.run(cancelled())
+    assert breaker.before_request() is True
@@ -0,0 +1,64 @@
+"""
+ArticleWriter keeps memory flat however many articles it streams.
+
+A million MockProvider articles are written to a zstd-compressed JSONL file
+one period at a time, as the collector delivers them, while the resident
+set size is sampled after every period.
+
+Usage:
+    python -m pytest test_stream_export.py
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from providers import MockProvider
+from stream_export import ArticleWriter
+
+ARTICLES = 1_000_000
+PERIOD_SIZE = 10_000
+MAX_GROWTH_MB = 32.0
+
+
+def _rss_mb() -> float:
+    # Current (not peak) RSS, so earlier tests in the session do not mask growth
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="needs /proc to read RSS")
+def test_streaming_a_million_articles_keeps_rss_flat(tmp_path):
+    pytest.importorskip("zstandard")
+    provider = MockProvider(total_results=ARTICLES)
+    to_date = datetime.now().strftime("%Y-%m-%d")
+    from_date = (datetime.now() - timedelta(365)).strftime("%Y-%m-%d")
+    path = str(tmp_path / "articles.jsonl.zst")
+
+    with ArticleWriter(path) as writer:
+        # Warm up so imports and buffers are already in the baseline
+        warmup = list(provider.iter_articles("Warmup Corp", from_date, to_date, PERIOD_SIZE))
+        writer.write_period("Warmup Corp", "warmup", {"articles": warmup})
+        del warmup
+        baseline = peak = _rss_mb()
+
+        articles = provider.iter_articles("Benchmark Corp", from_date, to_date)
+        while True:
+            period = [article for _, article in zip(range(PERIOD_SIZE), articles)]
+            if not period:
+                break
+            writer.write_period("Benchmark Corp", "benchmark", {"articles": period})
+            del period
+            peak = max(peak, _rss_mb())
+        rows = writer.rows
+
+    assert rows == ARTICLES + PERIOD_SIZE
+    assert peak - baseline < MAX_GROWTH_MB, f"RSS grew from {baseline:.0f} to {peak:.0f} MiB"
+
+    import zstandard
+    with open(path, "rb") as f, zstandard.ZstdDecompressor().stream_reader(f) as reader:
+        first = json.loads(reader.read(4096).split(b"\n", 1)[0])
+    assert first["company_name"] == "Warmup Corp"
+    assert first["period"] == "warmup"
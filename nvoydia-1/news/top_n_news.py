@@ -11,30 +11,103 @@ This script collects prominent news articles about a company across different ti
 Usage:
     python top_n_news.py "Apple Inc"
     python top_n_news.py "Tesla" --api-key YOUR_API_KEY
-    python top_n_news.py "Microsoft" --output microsoft_news.json
+    python top_n_news.py "Microsoft" --output microsoft_news.csv.zst
+    python top_n_news.py "Nvidia" --max-articles 300 --max-pages 3
+    python top_n_news.py "Nvidia" --output nvidia_news.json --incremental
+    python top_n_news.py "Nvidia" --store newsdata/articles --incremental
+    python top_n_news.py "Nvidia" --max-articles 200 --top 20
 """
 
 import os
 import json
+import tempfile
+import time
+import asyncio
 import argparse
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
-import pandas as pd
+
+from article_store import ArticleStore
+from dedup import LSHIndex, article_text, dedupe_results, minhash_signatures
+from ranking import EXCLUDED_DOMAINS, rank_results
+from stream_export import ArticleWriter
+from news_cache import DEFAULT_CACHE_PATH, DiskCache, request_cache_key, response_ttl
+from query_planner import DEFAULT_ALIASES_PATH, AliasRegistry, CompanyMatcher, QueryPlan, QueryPlanner
+from resilience import (CircuitBreaker, CircuitOpenError, QuotaExhaustedError, RequestStats, RetryPolicy,
+                        get, get_async)
 
 # Load environment variables
 load_dotenv()
 
+NEWSAPI_URL = "https://newsapi.org/v2/everything"
+
+# Period name -> (days back for the end of the window, days back for the start)
+TIME_PERIODS = {
+    'present_to_2weeks': (0, 14),
+    '2weeks_to_1month': (14, 30),
+    '1month_to_1quarter': (30, 90),
+    '1quarter_to_1year': (90, 365)
+}
+
+# NewsAPI returns at most 100 articles per page
+MAX_PAGE_SIZE = 100
+DEFAULT_MAX_PAGES = 5
+
+
+class QuotaRateLimiter:
+    """
+    Async rate limiter for NewsAPI requests.
+    
+    Spaces requests to at most `requests_per_second` and stops handing out
+    permits once the daily request quota is used up.
+    """
+    
+    def __init__(self, requests_per_second: float = 5.0, daily_quota: Optional[int] = 1000):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self.daily_quota = daily_quota
+        self.used = 0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self) -> bool:
+        """Wait for a request slot. Returns False if the daily quota is exhausted."""
+        async with self._lock:
+            if self.daily_quota is not None and self.used >= self.daily_quota:
+                return False
+            self.used += 1
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return True
+
+
 class CompanyNewsCollector:
     """Collects news articles about companies using NewsAPI."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, base_url: str = NEWSAPI_URL,
+                 cache: Optional[DiskCache] = None, refresh: bool = False,
+                 aliases: Optional[AliasRegistry] = None, timeout: Tuple[float, float] = (5.0, 30.0),
+                 retry: Optional[RetryPolicy] = None, breaker: Optional[CircuitBreaker] = None,
+                 pool_size: int = 16):
         """
         Initialize the news collector.
         
         Args:
             api_key: NewsAPI key. If not provided, will try to get from environment.
+            base_url: Endpoint for article searches (override to point at a stub server).
+            cache: Response cache; None disables caching.
+            refresh: Ignore cached responses but still store fresh ones.
+            aliases: Company alias registry (defaults to company_aliases.json).
+            timeout: (connect, read) timeouts in seconds.
+            retry: Retry and backoff policy for failed requests.
+            breaker: Circuit breaker that pauses NewsAPI requests after repeated failures.
+            pool_size: Connections kept open to the API host.
         """
         self.api_key = api_key or os.getenv('NEWS_API_KEY')
         if not self.api_key:
@@ -43,8 +116,20 @@ class CompanyNewsCollector:
                 "or pass it as a parameter."
             )
         
-        self.base_url = "https://newsapi.org/v2/everything"
+        self.base_url = base_url
         self.session = requests.Session()
+        # Retries are handled by resilience.get, which also honors Retry-After
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.timeout = timeout
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker('NewsAPI')
+        self.stats = RequestStats()
+        self.cache = cache
+        self.refresh = refresh
+        self.aliases = aliases if aliases is not None else AliasRegistry.load()
+        self.planner = QueryPlanner(self.aliases)
     
     def _calculate_date_range(self, days_back1: int, days_back2: int) -> tuple[str, str]:
         """
@@ -62,117 +147,407 @@ class CompanyNewsCollector:
         
         return start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
     
-    def _make_api_request(self, company_name: str, from_date: str, to_date: str, 
-                         page_size: int = 100, sort_by: str = 'popularity') -> Dict[str, Any]:
+    def _build_params(self, company_name: str, from_date: str, to_date: str,
+                      page_size: int = 100, sort_by: str = 'popularity', page: int = 1,
+                      query: Optional[str] = None) -> Dict[str, Any]:
         """
-        Make a request to NewsAPI.
+        Build the NewsAPI query parameters.
         
         Args:
             company_name: Name of the company to search for
-            from_date: Start date in YYYY-MM-DD format
+            from_date: Start date in YYYY-MM-DD format (or an ISO timestamp)
             to_date: End date in YYYY-MM-DD format
             page_size: Number of results per page (max 100)
             sort_by: Sort order ('relevancy', 'popularity', 'publishedAt')
+            page: 1-based page number
+            query: Prebuilt `q` (e.g. a batched query plan); defaults to the company's own query
             
         Returns:
-            API response as dictionary
+            Query parameters as dictionary
         """
-        params = {
-            'q': f'+"{company_name}" AND (earnings OR revenue OR stock OR financial OR merger OR acquisition OR IPO OR funding OR VC OR investment OR investment round)',  # Must include company name and some financial terms
+        return {
+            'q': query or self.planner.query(company_name),  # Company name or an alias, and some financial terms
             'from': from_date,
             'to': to_date,
             'sortBy': sort_by,
             'pageSize': page_size,
+            'page': page,
             'language': 'en',  # English articles only
             'apiKey': self.api_key,
-            'excludeDomains': (
-                "theonion.com,babylonbee.com,clickhole.com,thedailymash.co.uk,"
-                "reductress.com,thegatewaypundit.com,globalresearch.ca,"
-                "libertywritersnews.com,realtruenews.com,70news.com,huzlers.com,"
-                "nytimesofficial.com,cnnworldtoday.com,bbcnewstoday.com,news-pravda.com"
-            )
+            'excludeDomains': ",".join(EXCLUDED_DOMAINS)
             #FOR EMO: u can add a 'domains' and an 'excludeDomains' parameter to the params dict to filter by specific domains
         }
+    
+    def _make_api_request(self, company_name: str, from_date: str, to_date: str, 
+                         page_size: int = 100, sort_by: str = 'popularity', page: int = 1) -> Dict[str, Any]:
+        """
+        Make a request to NewsAPI.
+        
+        Args:
+            company_name: Name of the company to search for
+            from_date: Start date in YYYY-MM-DD format (or an ISO timestamp)
+            to_date: End date in YYYY-MM-DD format
+            page_size: Number of results per page (max 100)
+            sort_by: Sort order ('relevancy', 'popularity', 'publishedAt')
+            page: 1-based page number
+            
+        Returns:
+            API response as dictionary
+        """
+        params = self._build_params(company_name, from_date, to_date, page_size, sort_by, page)
+        cached = self._cached_response(params)
+        if cached is not None:
+            return cached
         
         try:
-            response = self.session.get(self.base_url, params=params)
+            response = get(self.session, self.base_url, params, self.timeout, self.retry, self.breaker, self.stats)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            data = response.json()
+        except (requests.exceptions.RequestException, CircuitOpenError) as e:
             print(f"Error making API request: {e}")
             return {'status': 'error', 'message': str(e)}
+        
+        self._store_response(params, data)
+        return data
     
-    def collect_news(self, company_name: str, max_articles_per_period: int = 50) -> Dict[str, Any]:
+    def _cached_response(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return a cached response for these parameters, unless caching is off or refreshing."""
+        if self.cache is None or self.refresh:
+            return None
+        return self.cache.get(request_cache_key(params))
+    
+    def _store_response(self, params: Dict[str, Any], data: Dict[str, Any]) -> None:
+        """Cache successful responses; errors are never cached."""
+        if self.cache is not None and data.get('status') == 'ok':
+            self.cache.set(request_cache_key(params), data, ttl=response_ttl(params['to']))
+    
+    def collect_news(self, company_name: str, max_articles_per_period: int = 50,
+                     max_pages: int = DEFAULT_MAX_PAGES, since: Optional[str] = None,
+                     dedupe: bool = True, top_n: Optional[int] = None) -> Dict[str, Any]:
         """
         Collect news articles for different time periods.
         
         Args:
             company_name: Name of the company to search for
             max_articles_per_period: Maximum number of articles to collect per period
+            max_pages: Maximum number of pages to request per period
+            since: publishedAt high-water mark; only newer articles are fetched
+            dedupe: Collapse syndicated near-duplicates across periods
+            top_n: Keep only the n best articles per period by local relevance score
             
         Returns:
             Dictionary containing news articles organized by time period
         """
-        time_periods = {
-            'present_to_2weeks': (0, 14),
-            '2weeks_to_1month': (14, 30),
-            '1month_to_1quarter': (30, 90),
-            '1quarter_to_1year': (90, 365)
-        }
-        
-        results = {
-            'company_name': company_name,
-            'collected_at': datetime.now().isoformat(),
-            'periods': {}
-        }
+        results = self.new_results(company_name)
         
         print(f"Collecting news for '{company_name}'...")
         
-        for period_name, (start_days, end_days) in time_periods.items():
+        for period_name, (start_days, end_days) in TIME_PERIODS.items():
             print(f"  - {period_name.replace('_', ' ')}: ", end='')
             
             from_date, to_date = self._calculate_date_range(start_days, end_days)
+            query_from = self._incremental_start(from_date, to_date, since)
+            
+            if query_from is None:
+                response = {'status': 'ok', 'totalResults': 0, 'articles': []}
+            else:
+                response = self._fetch_pages(company_name, query_from, to_date,
+                                             max_articles_per_period, max_pages)
+            
+            period_data = self._build_period_result(response, from_date, to_date, since)
+            results['periods'][period_name] = period_data
+            print(self.describe_period(period_data))
+        
+        results['high_water_mark'] = self.high_water_mark(results, since)
+        if dedupe:
+            removed = dedupe_results(results)
+            if removed:
+                print(f"  Collapsed {removed} near-duplicate articles")
+        if top_n:
+            rank_results(results, top_n)
+        return results
+    
+    def _fetch_pages(self, company_name: str, from_date: str, to_date: str,
+                     max_articles: int, max_pages: int) -> Dict[str, Any]:
+        """
+        Page through one window until max_articles, max_pages or totalResults is reached.
+        
+        Args:
+            company_name: Name of the company to search for
+            from_date: Start of the window (date or ISO timestamp)
+            to_date: End date of the window
+            max_articles: Maximum number of articles to collect
+            max_pages: Maximum number of pages to request
             
-            # Make API request
+        Returns:
+            A single NewsAPI-shaped response with the articles of all pages
+        """
+        page_size = min(max_articles, MAX_PAGE_SIZE)
+        articles: List[Dict[str, Any]] = []
+        total_results = 0
+        
+        for page in range(1, max_pages + 1):
             response = self._make_api_request(
                 company_name=company_name,
                 from_date=from_date,
                 to_date=to_date,
-                page_size=min(max_articles_per_period, 100),
-                sort_by='relevancy'  # Get most relevant articles first
+                page_size=page_size,
+                sort_by='relevancy',  # Get most relevant articles first
+                page=page
             )
+            if response.get('status') != 'ok':
+                # Later pages can fail on plan limits; keep what we already have
+                if articles:
+                    break
+                return response
             
-            if response.get('status') == 'ok':
-                articles = response.get('articles', [])
-                total_results = response.get('totalResults', 0)
-                
-                # Process and clean articles
-                processed_articles = self._process_articles(articles)
-                
-                results['periods'][period_name] = {
-                    'date_range': {
-                        'from': from_date,
-                        'to': to_date
-                    },
-                    'total_results': total_results,
-                    'articles_collected': len(processed_articles),
-                    'articles': processed_articles
-                }
-                
-                print(f"{len(processed_articles)} articles (total available: {total_results})")
-            else:
-                error_msg = response.get('message', 'Unknown error')
-                # Sanitize error message to remove API key
-                if 'apiKey=' in error_msg:
-                    error_msg = error_msg.split('apiKey=')[0] + 'apiKey=***HIDDEN***'
-                print(f"Error: {error_msg}")
-                results['periods'][period_name] = {
-                    'error': error_msg,
-                    'date_range': {'from': from_date, 'to': to_date}
-                }
+            batch = response.get('articles', [])
+            total_results = response.get('totalResults', 0)
+            articles.extend(batch)
+            if len(batch) < page_size or len(articles) >= min(total_results, max_articles):
+                break
+        
+        return {'status': 'ok', 'totalResults': total_results, 'articles': articles[:max_articles]}
+    
+    def _incremental_start(self, from_date: str, to_date: str, since: Optional[str]) -> Optional[str]:
+        """
+        Start of the part of a window that is newer than the high-water mark.
+        
+        Args:
+            from_date: Start date of the window
+            to_date: End date of the window
+            since: publishedAt high-water mark, or None for a full fetch
+            
+        Returns:
+            The query start (a date or ISO timestamp), or None if the whole window is older
+        """
+        if not since:
+            return from_date
+        since = since.rstrip('Z')[:19]
+        if since[:10] > to_date:
+            return None
+        # ISO dates and timestamps compare correctly as strings
+        return max(from_date, since)
+    
+    def _build_period_result(self, response: Dict[str, Any], from_date: str, to_date: str,
+                             since: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Turn an API response into the stored per-period structure.
+        
+        Args:
+            response: NewsAPI response (or error dictionary)
+            from_date: Start date of the period
+            to_date: End date of the period
+            since: Drop articles published at or before this high-water mark
+            
+        Returns:
+            Period dictionary with articles, or with an 'error' entry
+        """
+        if response.get('status') == 'ok':
+            articles = response.get('articles', [])
+            
+            # Process and clean articles
+            processed_articles = self._process_articles(articles)
+            if since:
+                # The API's 'from' is inclusive, so the newest stored article comes back again
+                processed_articles = [a for a in processed_articles if a['published_at'] > since]
+            
+            return {
+                'date_range': {
+                    'from': from_date,
+                    'to': to_date
+                },
+                'total_results': response.get('totalResults', 0),
+                'articles_collected': len(processed_articles),
+                'articles': processed_articles
+            }
+        
+        error_msg = response.get('message', 'Unknown error')
+        # Sanitize error message to remove API key
+        if 'apiKey=' in error_msg:
+            error_msg = error_msg.split('apiKey=')[0] + 'apiKey=***HIDDEN***'
+        return {
+            'error': error_msg,
+            'date_range': {'from': from_date, 'to': to_date}
+        }
+    
+    def describe_period(self, period_data: Dict[str, Any]) -> str:
+        """One-line description of a period result for progress output."""
+        if 'error' in period_data:
+            return f"Error: {period_data['error']}"
+        return f"{period_data['articles_collected']} articles (total available: {period_data['total_results']})"
+    
+    async def _request_async(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                             limiter: QuotaRateLimiter, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Issue one request under the concurrency cap and rate limiter, via the cache, with retries."""
+        response = self._cached_response(params)
+        if response is not None:
+            return response
+        try:
+            http_response = await get_async(client, self.base_url, params, self.retry, self.breaker, self.stats,
+                                            semaphore, limiter)
+            http_response.raise_for_status()
+            response = http_response.json()
+        except QuotaExhaustedError:
+            return {'status': 'error', 'message': 'Daily NewsAPI request quota exhausted'}
+        except (httpx.HTTPError, CircuitOpenError) as e:
+            return {'status': 'error', 'message': str(e)}
+        self._store_response(params, response)
+        return response
+    
+    async def _fetch_window(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                            limiter: QuotaRateLimiter, company_name: str, from_date: str, to_date: str,
+                            max_articles: int, max_pages: int = DEFAULT_MAX_PAGES,
+                            query: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Page through one window asynchronously, as _fetch_pages does synchronously.
         
+        Returns:
+            A single NewsAPI-shaped response with the raw articles of all pages
+        """
+        page_size = min(max_articles, MAX_PAGE_SIZE)
+        articles: List[Dict[str, Any]] = []
+        total_results = 0
+        
+        for page in range(1, max_pages + 1):
+            params = self._build_params(company_name, from_date, to_date, page_size,
+                                        sort_by='relevancy', page=page, query=query)
+            response = await self._request_async(client, semaphore, limiter, params)
+            if response.get('status') != 'ok':
+                if articles:
+                    break
+                return response
+            batch = response.get('articles', [])
+            total_results = response.get('totalResults', 0)
+            articles.extend(batch)
+            if len(batch) < page_size or len(articles) >= min(total_results, max_articles):
+                break
+        
+        return {'status': 'ok', 'totalResults': total_results, 'articles': articles[:max_articles]}
+    
+    async def _fetch_period(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                            limiter: QuotaRateLimiter, plan: QueryPlan, period_name: str,
+                            max_articles: int, max_pages: int = DEFAULT_MAX_PAGES,
+                            since: Optional[Dict[str, str]] = None,
+                            matcher: Optional[CompanyMatcher] = None
+                            ) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Fetch one query plan/period window and split it by company.
+        
+        Args:
+            client, semaphore, limiter: Shared by all requests of collect_many
+            plan: Query and the companies it covers
+            period_name: Key of TIME_PERIODS
+            max_articles: Maximum number of articles per company
+            max_pages: Maximum number of pages to request
+            since: Company name -> publishedAt high-water mark
+            matcher: Splits a batched query's articles by company (None gives
+                every company all articles)
+            
+        Returns:
+            One (company_name, period_name, period_data) tuple per company of the plan
+        """
+        since = since or {}
+        start_days, end_days = TIME_PERIODS[period_name]
+        from_date, to_date = self._calculate_date_range(start_days, end_days)
+        marks = [since.get(company) for company in plan.companies]
+        # A shared query can only skip what every company in it already has
+        query_from = self._incremental_start(from_date, to_date, None if None in marks else min(marks))
+        max_total = max_articles * len(plan.companies) if matcher is not None else max_articles
+        if query_from is None:
+            response = {'status': 'ok', 'totalResults': 0, 'articles': []}
+        else:
+            response = await self._fetch_window(client, semaphore, limiter, plan.companies[0], query_from,
+                                                to_date, max_total, max_pages, query=plan.query)
+        
+        if response.get('status') != 'ok':
+            return [(company, period_name, self._build_period_result(response, from_date, to_date))
+                    for company in plan.companies]
+        
+        articles = response['articles']
+        total_results = response['totalResults']
+        assigned = matcher.demultiplex(articles) if matcher is not None else {}
+        results = []
+        for company in plan.companies:
+            company_response = {'status': 'ok', 'totalResults': total_results,
+                                'articles': assigned.get(company, articles)[:max_articles]}
+            results.append((company, period_name,
+                            self._build_period_result(company_response, from_date, to_date, since.get(company))))
         return results
     
+    async def collect_many(self, companies: List[str], max_articles_per_period: int = 50,
+                           concurrency: int = 8, requests_per_second: float = 5.0,
+                           daily_quota: Optional[int] = 1000, max_pages: int = DEFAULT_MAX_PAGES,
+                           since: Optional[Dict[str, str]] = None, batch_queries: bool = False,
+                           max_batch: Optional[int] = None
+                           ) -> AsyncIterator[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Collect news for many companies concurrently.
+        
+        Every query x period window is fetched at once, bounded by a global
+        concurrency cap and a quota-aware rate limiter; pages within a window
+        are requested in turn. Results are yielded as they arrive, in
+        completion order.
+        
+        Companies whose queries are identical (different spellings of one
+        registered company) share a single fetch. With batch_queries, related
+        companies are also packed into OR queries up to NewsAPI's `q` length
+        limit, and the articles are assigned back to companies by the names,
+        aliases and tickers they mention. That saves quota when each company
+        has fewer articles than a page holds; totalResults is then the
+        batch's total, not the company's.
+        
+        Args:
+            companies: Company names to search for
+            max_articles_per_period: Maximum number of articles to collect per period
+            concurrency: Maximum number of requests in flight
+            requests_per_second: Request rate ceiling
+            daily_quota: Remaining NewsAPI requests for today (None for unlimited)
+            max_pages: Maximum number of pages to request per period
+            since: Company name -> publishedAt high-water mark for incremental fetches
+            batch_queries: Pack several companies into each query
+            max_batch: Maximum companies per batched query (None for no cap)
+            
+        Yields:
+            (company_name, period_name, period_data) tuples
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        limiter = QuotaRateLimiter(requests_per_second, daily_quota)
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency,
+                              keepalive_expiry=30.0)
+        plans = self.planner.plan(companies, batch=batch_queries, max_companies=max_batch)
+        matchers = {
+            id(plan): CompanyMatcher(plan.companies, self.aliases)
+            for plan in plans
+            if len({self.planner.company_clause(company) for company in plan.companies}) > 1
+        }
+        
+        timeout = httpx.Timeout(self.timeout[1], connect=self.timeout[0])
+        async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+            tasks = [
+                asyncio.create_task(
+                    self._fetch_period(client, semaphore, limiter, plan, period_name,
+                                       max_articles_per_period, max_pages, since, matchers.get(id(plan)))
+                )
+                for plan in plans
+                for period_name in TIME_PERIODS
+            ]
+            try:
+                for finished in asyncio.as_completed(tasks):
+                    for result in await finished:
+                        yield result
+            finally:
+                for task in tasks:
+                    task.cancel()
+    
+    def new_results(self, company_name: str) -> Dict[str, Any]:
+        """Empty results dictionary for a company, filled in period by period."""
+        return {
+            'company_name': company_name,
+            'collected_at': datetime.now().isoformat(),
+            'periods': {}
+        }
+    
     def _process_articles(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Process and clean articles from API response.
@@ -211,17 +586,114 @@ class CompanyNewsCollector:
         """
         Save results to a JSON file.
         
+        The file is written to a temporary sibling and renamed into place, so an
+        interrupted run never leaves a truncated store behind.
+        
         Args:
             results: Results dictionary
             output_file: Output file path
         """
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(results, f, indent=2, ensure_ascii=False)
+            directory = os.path.dirname(os.path.abspath(output_file))
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(results, f, indent=2, ensure_ascii=False)
+                os.replace(tmp_path, output_file)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
             print(f"\nResults saved to: {output_file}")
         except Exception as e:
             print(f"Error saving results: {e}")
     
+    def load_results(self, input_file: str) -> Optional[Dict[str, Any]]:
+        """Load a previously saved results file, or None if there is none yet."""
+        if not os.path.exists(input_file):
+            return None
+        with open(input_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def high_water_mark(self, results: Optional[Dict[str, Any]], since: Optional[str] = None) -> Optional[str]:
+        """
+        Newest publishedAt across a results dictionary.
+        
+        Args:
+            results: Results dictionary (or None)
+            since: Previous high-water mark, kept if nothing newer was collected
+            
+        Returns:
+            ISO timestamp, or None if there are no articles
+        """
+        marks = [since] if since else []
+        if results:
+            if results.get('high_water_mark'):
+                marks.append(results['high_water_mark'])
+            for period_data in results.get('periods', {}).values():
+                marks.extend(a['published_at'] for a in period_data.get('articles', []) if a.get('published_at'))
+        return max(marks) if marks else None
+    
+    def merge_results(self, results: Dict[str, Any], output_file: str) -> int:
+        """
+        Merge newly collected articles into an existing results file.
+        
+        Articles already in the store (by URL), or near-duplicates of stored
+        ones, are skipped; new ones are added to the front of their period. Periods that failed this run keep their
+        stored articles. The merged store is written atomically.
+        
+        Args:
+            results: Results dictionary from this run
+            output_file: Existing (or new) results file
+            
+        Returns:
+            Number of articles added
+        """
+        stored = self.load_results(output_file)
+        if stored is None:
+            self.save_results(results, output_file)
+            return sum(len(p.get('articles', [])) for p in results['periods'].values())
+        
+        stored_articles = [a for p in stored['periods'].values() for a in p.get('articles', [])]
+        seen = {a['url'] for a in stored_articles}
+        index = LSHIndex()
+        for signature in (minhash_signatures([article_text(a) for a in stored_articles]) if stored_articles else []):
+            index.add(signature)
+        added = 0
+        for period_name, period_data in results['periods'].items():
+            if 'error' in period_data:
+                stored['periods'].setdefault(period_name, period_data)
+                continue
+            
+            new_articles = []
+            candidates = [a for a in period_data['articles'] if a['url'] not in seen]
+            signatures = minhash_signatures([article_text(a) for a in candidates]) if candidates else []
+            for article, signature in zip(candidates, signatures):
+                match = index.find(signature)
+                if match is not None:
+                    if match < len(stored_articles):
+                        canonical = stored_articles[match]
+                        canonical['duplicates'] = canonical.get('duplicates', 0) + 1 + article.get('duplicates', 0)
+                    continue
+                seen.add(article['url'])
+                index.add(signature)
+                new_articles.append(article)
+            
+            target = stored['periods'].get(period_name, {})
+            target.pop('error', None)
+            articles = new_articles + target.get('articles', [])
+            stored['periods'][period_name] = {
+                'date_range': period_data['date_range'],
+                'total_results': max(period_data['total_results'], target.get('total_results', 0)),
+                'articles_collected': len(articles),
+                'articles': articles
+            }
+            added += len(new_articles)
+        
+        stored['collected_at'] = results['collected_at']
+        stored['high_water_mark'] = self.high_water_mark(stored, results.get('high_water_mark'))
+        self.save_results(stored, output_file)
+        return added
+    
     def create_summary_report(self, results: Dict[str, Any]) -> str:
         """
         Create a summary report of the collected news.
@@ -271,33 +743,29 @@ PERIOD SUMMARY:
         """
         Export results to CSV format for easy analysis.
         
+        Rows are streamed period by period; a .zst suffix compresses the file.
+        
         Args:
             results: Results dictionary
             output_file: Output CSV file path
         """
-        all_articles = []
+        self.export_rows(results, output_file, fmt='csv')
+    
+    def export_rows(self, results: Dict[str, Any], output_file: str, fmt: Optional[str] = None) -> None:
+        """
+        Export results as one row per article (JSONL or CSV, optionally zstd-compressed).
         
-        for period_name, period_data in results['periods'].items():
-            if 'articles' in period_data:
-                for article in period_data['articles']:
-                    article_row = {
-                        'period': period_name,
-                        'title': article['title'],
-                        'description': article['description'],
-                        'url': article['url'],
-                        'published_at': article['published_at'],
-                        'source_name': article['source']['name'],
-                        'author': article['author'],
-                        'url_to_image': article['url_to_image']
-                    }
-                    all_articles.append(article_row)
-        
-        if all_articles:
-            df = pd.DataFrame(all_articles)
-            df.to_csv(output_file, index=False, encoding='utf-8')
-            print(f"CSV export saved to: {output_file}")
+        Args:
+            results: Results dictionary
+            output_file: Output file path (.jsonl or .csv, optionally .zst)
+            fmt: 'jsonl' or 'csv' (default: from the file extension)
+        """
+        with ArticleWriter(output_file, fmt=fmt) as writer:
+            written = writer.write_results(results)
+        if written:
+            print(f"{writer.format.upper()} export saved to: {output_file}")
         else:
-            print("No articles to export to CSV")
+            print(f"No articles to export to {writer.format.upper()}")
 
 
 def main():
@@ -315,8 +783,9 @@ def main():
     )
     parser.add_argument(
         '--output',
-        default='company_news.json',
-        help='Output JSON file path (default: company_news.json)'
+        default='company_news.jsonl',
+        help='Output file: .jsonl or .csv (optionally .zst) streams one row per article; .json writes '
+             'the nested results file that --incremental and the other tools read (default: company_news.jsonl)'
     )
     parser.add_argument(
         '--output-dir',
@@ -325,7 +794,11 @@ def main():
     )
     parser.add_argument(
         '--csv',
-        help='Also export to CSV file'
+        help='Also export to CSV file (.csv.zst for zstd compression)'
+    )
+    parser.add_argument(
+        '--jsonl',
+        help='Also export one JSON object per article to this file (.jsonl.zst for zstd compression)'
     )
     parser.add_argument(
         '--max-articles',
@@ -333,42 +806,154 @@ def main():
         default=50,
         help='Maximum articles per time period (default: 50)'
     )
+    parser.add_argument(
+        '--max-pages',
+        type=int,
+        default=DEFAULT_MAX_PAGES,
+        help=f'Maximum pages of up to {MAX_PAGE_SIZE} articles per time period (default: {DEFAULT_MAX_PAGES})'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only fetch articles newer than those already in the output file, and merge them into it'
+    )
+    parser.add_argument(
+        '--top',
+        type=int,
+        help='Rank articles locally and keep the N most relevant per period '
+             '(fetch more with --max-articles to choose from)'
+    )
+    parser.add_argument(
+        '--no-dedupe',
+        action='store_true',
+        help='Keep syndicated near-duplicate articles'
+    )
+    parser.add_argument(
+        '--aliases',
+        default=DEFAULT_ALIASES_PATH,
+        help='Company alias registry; aliases and tickers are searched too (default: company_aliases.json)'
+    )
+    parser.add_argument(
+        '--store',
+        help='Append to this partitioned Parquet article store instead of writing the JSON file'
+    )
     parser.add_argument(
         '--summary-only',
         action='store_true',
         help='Only print summary report, don\'t save files'
     )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Neither read nor write the on-disk response cache'
+    )
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='Ignore cached responses and re-fetch (fresh responses are still cached)'
+    )
+    parser.add_argument(
+        '--cache-path',
+        default=DEFAULT_CACHE_PATH,
+        help='Response cache file (default: .cache/newsapi.sqlite next to this script)'
+    )
+    parser.add_argument(
+        '--cache-max-mb',
+        type=int,
+        default=256,
+        help='Evict least recently used responses beyond this size (default: 256)'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        nargs=2,
+        default=(5.0, 30.0),
+        metavar=('CONNECT', 'READ'),
+        help='Connect and read timeouts in seconds (default: 5 30)'
+    )
+    parser.add_argument(
+        '--retries',
+        type=int,
+        default=3,
+        help='Retries for timeouts, connection errors, 429 and 5xx responses (default: 3)'
+    )
+    parser.add_argument(
+        '--base-url',
+        default=NEWSAPI_URL,
+        help='Article search endpoint (default: NewsAPI; point at stub_server.py for local runs)'
+    )
     
     args = parser.parse_args()
+    nested_output = args.output.endswith('.json')
+    if args.incremental and not (nested_output or args.store):
+        parser.error('--incremental needs a .json --output or --store')
     
     try:
         # Initialize collector
-        collector = CompanyNewsCollector(api_key=args.api_key)
+        cache = None if args.no_cache else DiskCache(args.cache_path, max_bytes=args.cache_max_mb * 1024 * 1024)
+        collector = CompanyNewsCollector(
+            api_key=args.api_key,
+            base_url=args.base_url,
+            cache=cache,
+            refresh=args.refresh,
+            aliases=AliasRegistry.load(args.aliases),
+            timeout=tuple(args.timeout),
+            retry=RetryPolicy(max_retries=args.retries)
+        )
+        
+        output_path = os.path.join(args.output_dir, args.output)
+        store = ArticleStore(args.store) if args.store else None
+        since = None
+        if args.incremental:
+            if store is not None:
+                since = store.high_water_mark(args.company_name)
+            else:
+                since = collector.high_water_mark(collector.load_results(output_path))
+            print(f"Incremental fetch since {since}" if since else "No existing results, fetching everything")
         
         # Collect news
         results = collector.collect_news(
             company_name=args.company_name,
-            max_articles_per_period=args.max_articles
+            max_articles_per_period=args.max_articles,
+            max_pages=args.max_pages,
+            since=since,
+            dedupe=not args.no_dedupe,
+            top_n=args.top
         )
         
         # Print summary
         summary = collector.create_summary_report(results)
         print(summary)
         
+        if cache is not None:
+            stats = cache.stats()
+            print(f"Response cache: {stats['hits']} hits, {stats['misses']} misses, "
+                  f"{stats['entries']} entries ({stats['bytes'] / 1024:.0f} KiB)")
+        print(collector.stats.report())
+        
         # Save results if not summary-only
         if not args.summary_only:
             # Create output directory if it doesn't exist
-            import os
             os.makedirs(args.output_dir, exist_ok=True)
             
-            # Save JSON
-            json_path = os.path.join(args.output_dir, args.output)
-            collector.save_results(results, json_path)
+            # Save to the article store, the nested JSON file, or one row per article
+            if store is not None:
+                added = store.append_results(results)
+                print(f"\nAdded {added} new articles to {args.store}")
+            elif args.incremental:
+                added = collector.merge_results(results, output_path)
+                print(f"Added {added} new articles")
+            elif nested_output:
+                collector.save_results(results, output_path)
+            else:
+                collector.export_rows(results, output_path)
             
-            # Save CSV if requested
+            # Save row exports if requested
             if args.csv:
                 csv_path = os.path.join(args.output_dir, args.csv)
                 collector.export_to_csv(results, csv_path)
+            if args.jsonl:
+                collector.export_rows(results, os.path.join(args.output_dir, args.jsonl), fmt='jsonl')
         
     except Exception as e:
         print(f"Error: {e}")
@@ -1,3 +1,14 @@
+// Display categories for the backend's news event types (tagging.py)
+const EVENT_CATEGORIES = {
+    funding: 'Funding',
+    acquisition: 'M&A',
+    earnings: 'Earnings',
+    layoffs: 'Layoffs',
+    partnership: 'Partnership',
+    product: 'Product',
+    regulatory: 'Regulatory'
+};
+
 class DataService {
     constructor() {
         this.baseUrl = 'http://localhost:1000';
@@ -84,7 +95,8 @@ class DataService {
                 url: n.url || '#',
                 source: n.source || 'Unknown Source',
                 published_at: n.published_at || new Date().toISOString(),
-                category: n.category || 'General',
+                category: n.category || EVENT_CATEGORIES[n.event_type] || 'General',
+                sentiment: n.sentiment || 'neutral',
                 company_id: n.company_id || 1,
                 read_time: n.read_time || '5 min read'
             }));
@@ -3629,11 +3641,24 @@ class DataService {
         });
     }
 
-    // Summarize news (placeholder implementation)
+    // Summarize news: stored summary from the backend, generic text if it is unavailable
     async summarizeNews(newsUrl) {
+        const item = this.news.find(n => n.url === newsUrl);
+        if (item && item.id != null) {
+            try {
+                for (let attempt = 0; attempt < 3; attempt++) {
+                    const response = await fetch(`${this.baseUrl}/news/${item.id}/summary`);
+                    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                    const data = await response.json();
+                    if (data.summary) return data.summary;
+                    // 202: the summary is still being generated
+                    await new Promise(resolve => setTimeout(resolve, 1000));
+                }
+            } catch (error) {
+                console.warn('Backend summary unavailable:', error.message);
+            }
+        }
         try {
-            // Placeholder implementation - in a real app, this would call an AI service
-            // For now, return a generic summary based on the URL
             const urlParts = newsUrl.split('/');
             const domain = urlParts[2] || 'news source';
             
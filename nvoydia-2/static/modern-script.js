@@ -1197,7 +1197,7 @@ class ModernDigitalNativesPlatform {
                 return;
             }
             
-            // Placeholder implementation - in real app would call AI service
+            // Extractive summary from the backend; generic text if it is unavailable
             const summary = await this.dataService.summarizeNews?.(newsUrl) || 
                 'This is a placeholder summary. In a real implementation, this would call an AI service to summarize the news article.';
             